@@ -1,5 +1,7 @@
 import os
 import json
+import fnmatch
+import struct
 import hashlib
 
 # ----------------------
@@ -13,9 +15,48 @@ IGNORE_DIRS = {
     ".git",
     "__pycache__",
     "OLD",
-    "UPDATE"
+    "UPDATE",
+    "host",   # CPython-only tooling, never shipped to the device
 }
 
+# Image assets: RGB888 sources are packed into the bundle below for the device
+ASSET_DIR = "Images"
+SOURCE_EXT = ".rgb"
+
+# Raw .rgb files carry no header; anything not listed here is square
+ASSET_SIZES = {
+    "Images/BeeBox.rgb": (96, 64),
+}
+DIGIT_DIR = "Images/numbers/"
+DIGIT_SIZE = (8, 16)
+DIGIT_SIZE_EXCEPTIONS = {"Images/numbers/minus.rgb"}
+
+# Every asset is packed into one bundle. Layout:
+#   magic, entry count (u16 BE), then per entry:
+#   name length (u8), name, payload offset (u32 BE), payload size (u32 BE)
+# followed by the payloads. Names are paths under Images/ without extension.
+BUNDLE_FILE = "Images/assets.bin"
+BUNDLE_MAGIC = b"BBX1"
+
+# Bundled sprites are palette-indexed where their RGB565 colours fit, so
+# every pixel comes out exactly as the RGB565 conversion would draw it:
+#   b"P4": GS4_HMSB, up to 16 colours (even widths only)
+#   b"P8": GS8, up to 256 colours
+#   b"R5": big-endian RGB565, for anything else
+# Palette payloads: magic, width, height, colour count (u16 BE),
+# colours as RGB565 BE, then the packed pixel indices.
+PACKED_MAGIC = b"R5"   # header: magic, width (u16 BE), height (u16 BE)
+PALETTE4_MAGIC = b"P4"
+PALETTE8_MAGIC = b"P8"
+
+# Sprites outside DIGIT_DIR are only ever streamed to the screen, so they may
+# be run-length coded instead when that is smaller (lossless RGB565):
+#   b"RL": header, then packets of a count byte n and BE pixels:
+#          n & 0x80 -> one pixel repeated (n & 0x7F) + 1 times
+#          else     -> n + 1 literal pixels
+RLE_MAGIC = b"RL"
+RLE_MAX_RUN = 128
+
 IGNORE_FILES = {
     OUTPUT_FILE,
     CONFIG_FILE,
@@ -23,8 +64,16 @@ IGNORE_FILES = {
     "secret_config.json",
     "wifi_config.bin",
     "README.md",
+    ".gitignore",
+    "requests.jsonl",
+    "FEATURE_REQUESTS.md",
+    "test_output.txt",
+    "bench_output.txt",
 }
 
+# Working files that must never reach a device (review diffs, bytecode, ...)
+IGNORE_PATTERNS = ("*.patch", "*.diff", "*.orig", "*.rej", "*.jsonl", "*.py[cod]")
+
 # ----------------------
 # Hash helpers
 # ----------------------
@@ -51,6 +100,149 @@ def sha256_config_canonical(path):
 
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
+# ----------------------
+# Asset helpers
+# ----------------------
+def asset_size(rel_path, nbytes):
+    """
+    Width/height of an RGB888 source, matching the sizes the device draws at
+    """
+    if rel_path in ASSET_SIZES:
+        return ASSET_SIZES[rel_path]
+    if rel_path.startswith(DIGIT_DIR) and rel_path not in DIGIT_SIZE_EXCEPTIONS:
+        return DIGIT_SIZE
+
+    side = int(round((nbytes // 3) ** 0.5))
+    if side * side * 3 != nbytes:
+        raise RuntimeError(f"Unknown image size for {rel_path} ({nbytes} bytes)")
+    return side, side
+
+def rgb888_to_rgb565(data):
+    """
+    Same conversion lcd_display.load_rgb_image does at runtime
+    """
+    out = bytearray(len(data) // 3 * 2)
+    for i in range(len(data) // 3):
+        r, g, b = data[i * 3], data[i * 3 + 1], data[i * 3 + 2]
+        rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        out[i * 2] = rgb565 >> 8
+        out[i * 2 + 1] = rgb565 & 0xFF
+    return out
+
+def rgb565(r, g, b):
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+def encode_sprite(data, width, height):
+    """
+    Smallest lossless payload for a bundled sprite: (magic, palette, body)
+    """
+    pixels = [rgb565(*data[i:i + 3]) for i in range(0, width * height * 3, 3)]
+    colours = sorted(set(pixels))
+    index = {c: i for i, c in enumerate(colours)}
+
+    if len(colours) <= 16 and width % 2 == 0:
+        body = bytearray(width * height // 2)
+        for i, c in enumerate(pixels):
+            body[i // 2] |= index[c] << (0 if i % 2 else 4)
+        return PALETTE4_MAGIC, colours, body
+
+    if len(colours) <= 256:
+        body = bytes(index[c] for c in pixels)
+        return PALETTE8_MAGIC, colours, body
+
+    return PACKED_MAGIC, None, rgb888_to_rgb565(data[:width * height * 3])
+
+def rle_encode(data, width, height):
+    """
+    RGB888 -> b"RL" packet stream, as lcd_display._decode_rle reads it
+    """
+    pixels = [rgb565(*data[i:i + 3]) for i in range(0, width * height * 3, 3)]
+    out = bytearray()
+    literals = []
+
+    def flush():
+        while literals:
+            block = literals[:RLE_MAX_RUN]
+            del literals[:RLE_MAX_RUN]
+            out.append(len(block) - 1)
+            for p in block:
+                out.extend(struct.pack(">H", p))
+
+    i = 0
+    while i < len(pixels):
+        j = i
+        while j < len(pixels) and pixels[j] == pixels[i] and j - i < RLE_MAX_RUN:
+            j += 1
+        if j - i >= 2:
+            flush()
+            out.append(0x80 | (j - i - 1))
+            out += struct.pack(">H", pixels[i])
+            i = j
+        else:
+            literals.append(pixels[i])
+            i += 1
+    flush()
+    return out
+
+def find_assets():
+    """
+    RGB888 sources under ASSET_DIR -> [(src, width, height)]
+    """
+    found = []
+    for root, dirs, files in os.walk(ASSET_DIR):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.endswith(SOURCE_EXT):
+                continue
+
+            src = os.path.join(root, filename).replace("\\", "/")
+            width, height = asset_size(src, os.path.getsize(src))
+            found.append((src, width, height))
+    return found
+
+def build_bundle(assets):
+    entries = []
+    total_rgb565 = 0
+    for src, width, height in assets:
+        name = src[len(ASSET_DIR) + 1:-len(SOURCE_EXT)]
+        with open(src, "rb") as f:
+            data = f.read()
+        magic, colours, body = encode_sprite(data, width, height)
+
+        payload = struct.pack(">2sHH", magic, width, height)
+        if colours is not None:
+            payload += struct.pack(">H", len(colours))
+            payload += b"".join(struct.pack(">H", c) for c in colours)
+        payload += body
+
+        if not src.startswith(DIGIT_DIR):
+            rle = struct.pack(">2sHH", RLE_MAGIC, width, height) + rle_encode(data, width, height)
+            if len(rle) < len(payload):
+                magic, payload = RLE_MAGIC, rle
+        entries.append((name.encode("ascii"), payload))
+
+        rgb565_size = 6 + width * height * 2
+        total_rgb565 += rgb565_size
+        print(f"[BUILD]   {name}: {magic.decode()} {len(payload)} bytes "
+              f"({rgb565_size / len(payload):.1f}x smaller than RGB565)")
+
+    total = sum(len(data) for _, data in entries)
+    print(f"[BUILD] Sprites: {total} bytes vs {total_rgb565} as RGB565 "
+          f"({total_rgb565 / total:.1f}x)")
+
+    offset = len(BUNDLE_MAGIC) + 2 + sum(1 + len(name) + 8 for name, _ in entries)
+    with open(BUNDLE_FILE, "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(struct.pack(">H", len(entries)))
+        for name, data in entries:
+            f.write(struct.pack(">B", len(name)) + name)
+            f.write(struct.pack(">II", offset, len(data)))
+            offset += len(data)
+        for _, data in entries:
+            f.write(data)
+
+    print(f"[BUILD] {BUNDLE_FILE}: {len(entries)} sprites, {offset} bytes")
+
 # ----------------------
 # Load version
 # ----------------------
@@ -64,6 +256,15 @@ version = config["version"]
 
 print(f"[BUILD] Generating file_list.json for version {version}")
 
+# ----------------------
+# Pack image assets
+# ----------------------
+assets = find_assets()
+build_bundle(assets)
+
+# Bundled sprites ship inside BUNDLE_FILE only
+bundled = {src for src, _, _ in assets}
+
 # ----------------------
 # Walk project & hash files
 # ----------------------
@@ -76,6 +277,8 @@ for root, dirs, files in os.walk(PROJECT_FOLDER):
     for filename in files:
         if filename in IGNORE_FILES:
             continue
+        if any(fnmatch.fnmatch(filename, p) for p in IGNORE_PATTERNS):
+            continue
 
         abs_path = os.path.join(root, filename)
 
@@ -86,6 +289,9 @@ for root, dirs, files in os.walk(PROJECT_FOLDER):
         rel_path = os.path.relpath(abs_path, PROJECT_FOLDER)
         rel_path = rel_path.replace("\\", "/")  # Windows safety
 
+        if rel_path in bundled:
+            continue
+
         if rel_path == CONFIG_FILE:
             sha = sha256_config_canonical(abs_path)
         else:
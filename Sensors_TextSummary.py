@@ -3,9 +3,13 @@ from lcd_display import lcd, colour
 
 def display_on_lcd(hive_id, temperatures, humidities, weight):
     """Display hive data (temperatures, humidities, weight) on LCD."""
-    lcd.fill(colour(0, 0, 0))
+    draw_summary(hive_id, temperatures, humidities, weight)
     lcd.show()
 
+def draw_summary(hive_id, temperatures, humidities, weight):
+    """Compose the summary screen into the LCD buffer without flushing it."""
+    lcd.fill(colour(0, 0, 0))
+
     y = 5
     # Display Hive ID
     lcd.text(f"Hive {hive_id}", 5, y, colour(255, 255, 0))
@@ -29,5 +33,3 @@ def display_on_lcd(hive_id, temperatures, humidities, weight):
     lcd.text("Weight:", 5, y, colour(255, 255, 255))
     y += 10
     lcd.text(f"{weight} kg", 5, y, colour(255, 255, 0))
-
-    lcd.show()
@@ -0,0 +1,244 @@
+# ===== beebox_async.py =====
+# Optional uasyncio runtime, enabled with the "async_runtime" setting.
+#
+# The default runtime runs the fetcher on core1 with _thread and the UI as
+# blocking polling loops on core0, coordinated through globals. Here the
+# same work runs as cooperative tasks on core0:
+#
+#   buttons    samples the buttons every BUTTON_POLL_MS, wakes the screen
+#   power      steps the screen power state machine
+#   fetch      fetches the due dashboards (beebox_sources) concurrently
+#              over non-blocking sockets
+#   ota        the periodic OTA check, once data has been fetched
+#   dashboard  shows the hives, waiting on input instead of sleeping
+#
+# A slow fetch only ever holds the scheduler for one chunk, so input stays
+# responsive, and core1 is left free for the LCD's double-buffer flusher.
+# Only the dashboard task draws. The menus stay modal: opening one cancels
+# the network tasks (their sockets are closed on the way out) and they are
+# restarted when it closes, as the thread runtime pauses fetching while
+# menu_active.
+import uasyncio as asyncio
+import utime
+import lcd_display
+import wifi_utils
+import beebox_http
+import beebox_metrics
+import ota
+import beebox_sources
+from beebox_display_helpers import render_hive, prerender, drop_hives, draw_stale_badge
+from beebox_power import power
+
+BUTTON_POLL_MS = 20
+POWER_CHECK_MS = 1000
+HIVE_SHOW_MS = 5000
+
+TASKS = ("buttons", "power", "fetch", "ota", "dashboard")
+NETWORK_TASKS = ("fetch", "ota")
+
+class Runtime:
+    def __init__(self, pins, settings, check_power, menu, reboot_check, mode,
+                 sources=None):
+        """pins: {"up", "down", "select", "back"} -> Pin. The callables come
+        from main: settings() returns a copy of the settings, check_power()
+        feeds them to the power manager, menu() runs the modal main menu,
+        reboot_check() applies a staged update, mode() is the dashboard mode
+        to show. sources defaults to beebox_sources.load()."""
+        self.pins = pins
+        self.settings = settings
+        self.check_power = check_power
+        self.menu = menu
+        self.reboot_check = reboot_check
+        self.mode = mode
+        self.sources = sources or beebox_sources.load()
+        self.hives = []
+        self.removed = []
+        self.stale = []                  # beebox_sources.stale() names
+        self.fetched = asyncio.Event()   # first hive data is in
+        self.input = asyncio.Event()     # a press, or the screen power changed
+        self.presses = []                # pins pressed, oldest first
+        self.ota_at = 0                  # utime.time() of the next OTA check
+        self.tasks = {}
+
+    # ----- task control -----
+    def start(self, name):
+        self.tasks[name] = asyncio.create_task(getattr(self, name)())
+
+    def cancel(self, names):
+        for name in names:
+            task = self.tasks.pop(name, None)
+            if task is not None:
+                task.cancel()
+
+    async def main(self):
+        if lcd_display.lcd.enable_double_buffer():
+            print("[ASYNC] Double-buffered flushing on core1")
+        for name in TASKS:
+            self.start(name)
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            self.cancel(list(self.tasks))
+            beebox_http.aclose_all()
+
+    # ----- input -----
+    async def buttons(self):
+        pins = list(self.pins.values())
+        up = [True] * len(pins)
+        while True:
+            for i, pin in enumerate(pins):
+                released = pin.value() == 1
+                if up[i] and not released:
+                    power.activity()
+                    self.presses.append(pin)
+                    self.input.set()
+                up[i] = released
+            await asyncio.sleep_ms(BUTTON_POLL_MS)
+
+    async def next_press(self, ms):
+        """The next button pressed within ms, or None if none was, or the
+        screen power changed meanwhile."""
+        if not self.presses:
+            self.input.clear()
+            try:
+                await asyncio.wait_for_ms(self.input.wait(), ms)
+            except asyncio.TimeoutError:
+                return None
+        return self.presses.pop(0) if self.presses else None
+
+    async def power(self):
+        while True:
+            rendering = power.rendering
+            self.check_power()
+            if power.rendering != rendering:
+                self.input.set()
+            await asyncio.sleep_ms(POWER_CHECK_MS)
+
+    # ----- network -----
+    async def fetch(self):
+        sources = self.sources
+        while True:
+            # Re-evaluated every second, so a new update_period or the
+            # screen waking up takes effect during the wait
+            period = self.settings().get("update_period", 300)
+            fetching = beebox_sources.due(sources, period, power.state)
+            # A failing source's hives stay on show, badged once stale
+            self.stale = beebox_sources.stale(sources, power.state)
+            if not fetching:
+                await asyncio.sleep(1)
+                continue
+
+            changes = await beebox_sources.afetch(fetching)
+            failed = [s for s in fetching if s.schedule.failures]
+            for s in failed:
+                beebox_metrics.retry("fetch")
+            if len(failed) < len(fetching):
+                if changes is not None or not self.fetched.is_set():
+                    self.hives = beebox_sources.merged(sources)
+                    if changes:
+                        self.removed.extend(changes[1])
+                    print("[ASYNC] Hive data changed:", changes[0] if changes else "all")
+                else:
+                    print("[ASYNC] Hive data unchanged")
+                wifi_utils.WIFI_STATE["healthy"] = True
+                wifi_utils.WIFI_STATE["failures"] = 0
+                self.fetched.set()
+            if failed and len(failed) == len(fetching):
+                await wifi_utils.anote_fetch_failure()
+
+    async def ota(self):
+        await self.fetched.wait()
+        while True:
+            wait = self.ota_at - utime.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                interval_hours = ota.load_config().get("check_interval_hours", 24)
+            except (OSError, ValueError):
+                interval_hours = 24
+            print("[ASYNC] OTA check triggered")
+            t = beebox_metrics.start()
+            await ota.asafe_ota()
+            beebox_metrics.stop("ota", t)
+            self.ota_at = utime.time() + max(3600, interval_hours * 3600)
+
+    # ----- display -----
+    def _message(self, text, colour):
+        lcd = lcd_display.lcd
+        lcd.fill(lcd_display.colour(0, 0, 0))
+        lcd.text(text, 20, 60, colour)
+        lcd.show()
+
+    async def dashboard(self):
+        while True:
+            await self.show(self.mode())
+            await self.open_menu()
+
+    async def show(self, mode):
+        """The dashboard for mode; returns when BACK is pressed."""
+        print("[ASYNC] Displaying", mode)
+        while not self.fetched.is_set():
+            self.reboot_check()
+            self._message("Connecting...", lcd_display.colour(200, 200, 200))
+            if await self.next_press(1000) is self.pins["back"]:
+                return
+
+        while True:
+            self.reboot_check()
+            if not power.rendering:
+                # Screen off: nothing is composed; a press wakes it
+                await self.next_press(HIVE_SHOW_MS)
+                continue
+
+            hives = self.hives
+            if self.removed:
+                removed, self.removed = self.removed, []
+                drop_hives(removed)
+            if not hives:
+                self._message("No data", lcd_display.colour(255, 0, 0))
+                if await self.next_press(3000) is self.pins["back"]:
+                    return
+                continue
+
+            settings = self.settings()
+            units = settings.get("units", "C")
+            autoscroll = settings.get("autoscroll", True)
+            transitions = settings.get("transitions", True) and len(hives) > 1
+            t = utime.ticks_us()
+            prerender(mode, hives, units)
+            power.charge(utime.ticks_diff(utime.ticks_us(), t))
+
+            for hive in hives:
+                if not power.rendering:
+                    break
+                t = utime.ticks_us()
+                render_hive(mode, hive, units, transitions)
+                power.charge(utime.ticks_diff(utime.ticks_us(), t))
+                if hive.get("source") in self.stale:
+                    draw_stale_badge()
+
+                # Show it for HIVE_SHOW_MS; UP/DOWN step on when not autoscrolling
+                deadline = utime.ticks_add(utime.ticks_ms(), HIVE_SHOW_MS)
+                while power.rendering:
+                    left = utime.ticks_diff(deadline, utime.ticks_ms())
+                    if left <= 0:
+                        break
+                    pin = await self.next_press(left)
+                    if pin is self.pins["back"]:
+                        return
+                    if not autoscroll and pin in (self.pins["up"], self.pins["down"]):
+                        break
+
+    async def open_menu(self):
+        self.cancel(NETWORK_TASKS)
+        await asyncio.sleep_ms(0)   # let the cancelled tasks unwind
+        beebox_http.aclose_all()
+        self.menu()                 # modal; blocks the loop until it returns
+        self.presses.clear()
+        for name in NETWORK_TASKS:
+            self.start(name)
+
+def run(pins, settings, check_power, menu, reboot_check, mode):
+    asyncio.run(Runtime(pins, settings, check_power, menu, reboot_check,
+                        mode).main())
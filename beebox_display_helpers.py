@@ -1,173 +1,367 @@
+import lcd_display
 from lcd_display import lcd, colour, display_rgb_image, draw_number
-
-import framebuf
-
-# ================= TEMPERATURE QUADRANTS =================
-def display_temp_quadrants(hive_id, temps, image_path="Images/temperature.rgb"):
-    lcd.fill(colour(0, 0, 0))
-
-    screen_width = 128
-    screen_height = 128
-    title_height = 14
-    bottom_margin = 2
-    grid_top = title_height + 2
-    grid_bottom = screen_height - bottom_margin
-    grid_height = grid_bottom - grid_top
-
-    title_bg = colour(40, 40, 40)
-    text_colour = colour(255, 255, 255)
-
-    lcd.fill_rect(0, 0, screen_width, title_height, title_bg)
-    title = f"Hive {hive_id}"
-    text_x = (screen_width - len(title) * 8) // 2
-    lcd.text(title, text_x, 4, text_colour)
-
-    quadrant_height = grid_height // 2
-    centers = [
-        (screen_width // 4, grid_top + quadrant_height // 2),
-        (3 * screen_width // 4, grid_top + quadrant_height // 2),
-        (screen_width // 4, grid_top + quadrant_height + quadrant_height // 2),
-        (3 * screen_width // 4, grid_top + quadrant_height + quadrant_height // 2)
+from Sensors_TextSummary import draw_summary
+
+# ================= Screen Layout Engine =================
+# Each sensor screen is a declarative template. At import every template is
+# compiled into a flat draw list with all coordinates worked out, so drawing
+# a hive is a single pass that only fills in the title and value slots.
+
+SCREEN_WIDTH = 128
+SCREEN_HEIGHT = 128
+TITLE_HEIGHT = 14
+GRID_TOP = TITLE_HEIGHT + 2
+GRID_BOTTOM = SCREEN_HEIGHT - 2
+GRID_HEIGHT = GRID_BOTTOM - GRID_TOP
+
+CHAR_W = 8
+DIGIT_W = 8
+DIGIT_H = 16
+
+BACKGROUND = colour(0, 0, 0)
+TITLE_BG = colour(40, 40, 40)
+TEXT_COLOUR = colour(255, 255, 255)
+GRID_COLOUR = colour(60, 60, 60)
+
+def one_decimal(value):
+    return str(round(float(value), 1))
+
+# ================= Templates =================
+#   source: key of the hive dict holding the readings
+#   grid:   (columns, rows) the area under the title bar is split into
+#   slots:  one per cell, in reading order:
+#           (label, label position "top" / "bottom" / None, value x or None
+#            [, formatter])
+#           A value x left-aligns the number there, otherwise it is centred.
+#           A formatter turns the reading into the digits drawn (default str).
+#   icon:   (image path, x, y below GRID_TOP)
+TEMPLATES = {
+    "sensor_temp": {
+        "source": "temperature",
+        "grid": (2, 2),
+        "slots": (
+            ("Brood", "top", None),
+            ("Super", "top", None),
+            ("Roof", "bottom", None),
+            ("Outside", "bottom", None),
+        ),
+        "icon": ("Images/temperature.rgb", 50, 35),
+    },
+    "sensor_humidity": {
+        "source": "humidity",
+        "grid": (2, 1),
+        "slots": (
+            ("Inside", "bottom", None),
+            ("Outside", "bottom", None),
+        ),
+        "icon": ("Images/humidity.rgb", 48, 8),
+    },
+    "sensor_weight": {
+        "source": "weight",
+        "grid": (1, 1),
+        "slots": (
+            ("Weight", None, 48, one_decimal),
+        ),
+        "icon": ("Images/weight.rgb", 8, 39),
+    },
+}
+
+# ================= Draw List =================
+OP_FILL = 0     # colour
+OP_RECT = 1     # x, y, w, h, colour
+OP_HLINE = 2    # x, y, length, colour
+OP_VLINE = 3    # x, y, length, colour
+OP_TEXT = 4     # text, x, y, colour
+OP_ICON = 5     # path, x, y, w, h
+OP_TITLE = 6    # y, colour                     (hive id)
+OP_VALUE = 7    # key, x, y, centred, formatter (reading)
+
+def compile_template(template):
+    cols, rows = template["grid"]
+    cell_w = SCREEN_WIDTH // cols
+    cell_h = GRID_HEIGHT // rows
+
+    static = [
+        (OP_FILL, BACKGROUND),
+        (OP_RECT, 0, 0, SCREEN_WIDTH, TITLE_HEIGHT, TITLE_BG),
     ]
-
-    lcd.hline(0, grid_top + quadrant_height, screen_width, colour(60, 60, 60))
-    lcd.vline(screen_width // 2, grid_top, grid_height, colour(60, 60, 60))
-
-    labels = ["Brood", "Super", "Roof", "Outside"]
-    labels_coords = [
-        (centers[0][0], grid_top + 2),
-        (centers[1][0], grid_top + 2),
-        (centers[2][0], grid_bottom - 10),
-        (centers[3][0], grid_bottom - 10)
-    ]
-
-    for i, temp_label in enumerate(labels):
-        value = "--"
-        for k, v in temps:
-            if k.lower() == temp_label.lower():
-                value = v
-                break
-
-        num_str = str(value)
-        digit_width = 8
-        digit_height = 16
-        total_width = len(num_str) * digit_width
-        draw_x = centers[i][0] - total_width // 2
-        draw_y = centers[i][1] - digit_height // 2
-        draw_number(lcd, num_str, draw_x, draw_y, digit_width, digit_height)
-
-        lx, ly = labels_coords[i]
-        label_width = len(temp_label) * 8
-        lcd.text(temp_label, lx - label_width // 2, ly, text_colour)
-
-    try:
-        display_rgb_image(lcd, image_path, 50, grid_top + (quadrant_height//2) + 8, 32, 32)
-    except Exception as e:
-        print("Could not load image:", e)
-
+    for r in range(1, rows):
+        static.append((OP_HLINE, 0, GRID_TOP + r * cell_h, SCREEN_WIDTH, GRID_COLOUR))
+    for c in range(1, cols):
+        static.append((OP_VLINE, c * cell_w, GRID_TOP, GRID_HEIGHT, GRID_COLOUR))
+
+    dynamic = [(OP_TITLE, 4, TEXT_COLOUR)]
+    for i, slot in enumerate(template["slots"]):
+        label, label_pos, value_x = slot[:3]
+        fmt = slot[3] if len(slot) > 3 else str
+        col = i % cols
+        row = i // cols
+        cx = col * cell_w + cell_w // 2
+        cell_top = GRID_TOP + row * cell_h
+        cy = cell_top + cell_h // 2
+
+        if value_x is None:
+            dynamic.append((OP_VALUE, label.lower(), cx, cy - DIGIT_H // 2, True, fmt))
+        else:
+            dynamic.append((OP_VALUE, label.lower(), value_x, cy - DIGIT_H // 2, False, fmt))
+
+        if label_pos == "top":
+            static.append((OP_TEXT, label, cx - len(label) * CHAR_W // 2, cell_top + 2, TEXT_COLOUR))
+        elif label_pos == "bottom":
+            static.append((OP_TEXT, label, cx - len(label) * CHAR_W // 2, cell_top + cell_h - 10, TEXT_COLOUR))
+
+    path, icon_x, icon_y = template["icon"]
+    static.append((OP_ICON, path, icon_x, GRID_TOP + icon_y, 32, 32))
+
+    return static, dynamic
+
+LAYOUTS = {mode: compile_template(t) for mode, t in TEMPLATES.items()}
+
+# ================= Background Cache =================
+# The static part of a mode (title bar, grid, labels, icon) is the same for
+# every hive, so it is rendered once into a full-screen buffer and each hive
+# frame starts as a copy of it. One slot is kept (32 KB); it is rebuilt when
+# the mode changes or lcd_display.invalidate_assets() runs after an OTA.
+_bg = {"mode": None, "generation": -1, "buf": None}
+
+def background(mode):
+    if _bg["mode"] == mode and _bg["generation"] == lcd_display.asset_generation:
+        return _bg["buf"]
+    if _bg["buf"] is None:
+        _bg["buf"] = bytearray(len(lcd.buffer))
+    run_ops(LAYOUTS[mode][0], None, ())
+    lcd.save_frame(_bg["buf"])
+    _bg["mode"] = mode
+    _bg["generation"] = lcd_display.asset_generation
+    return _bg["buf"]
+
+# ================= Frame Skip =================
+# A frame's content key is built from everything that affects its pixels.
+# lcd.content_key holds the key of what is on the panel (any other drawing
+# clears it), so an identical frame is neither composed nor flushed again.
+FRAME_STATS = {"rendered": 0, "skipped": 0}
+
+def _unchanged(key):
+    if key == lcd.content_key:
+        FRAME_STATS["skipped"] += 1
+        return True
+    FRAME_STATS["rendered"] += 1
+    return False
+
+# ================= Rendering =================
+def values_by_label(readings):
+    """[(label, value), ...] -> {label.lower(): value}"""
+    return {k.lower(): v for k, v in readings}
+
+def run_ops(ops, hive_id, texts):
+    slot = 0
+    for op in ops:
+        kind = op[0]
+        if kind == OP_VALUE:
+            num_str = texts[slot]
+            slot += 1
+            x = op[2] - len(num_str) * DIGIT_W // 2 if op[4] else op[2]
+            draw_number(lcd, num_str, x, op[3], DIGIT_W, DIGIT_H)
+        elif kind == OP_TEXT:
+            lcd.text(op[1], op[2], op[3], op[4])
+        elif kind == OP_TITLE:
+            title = f"Hive {hive_id}"
+            lcd.text(title, (SCREEN_WIDTH - len(title) * CHAR_W) // 2, op[1], op[2])
+        elif kind == OP_RECT:
+            lcd.fill_rect(op[1], op[2], op[3], op[4], op[5])
+        elif kind == OP_HLINE:
+            lcd.hline(op[1], op[2], op[3], op[4])
+        elif kind == OP_VLINE:
+            lcd.vline(op[1], op[2], op[3], op[4])
+        elif kind == OP_ICON:
+            display_rgb_image(lcd, op[1], op[2], op[3], op[4], op[5])
+        elif kind == OP_FILL:
+            lcd.fill(op[1])
+
+def value_texts(mode, values):
+    texts = []
+    for op in LAYOUTS[mode][1]:
+        if op[0] == OP_VALUE:
+            value = values.get(op[1])
+            if value is None:
+                texts.append("--")
+                continue
+            try:
+                texts.append(op[5](value))
+            except ValueError:
+                texts.append(str(value))
+    return tuple(texts)
+
+def render_screen(mode, hive_id, values, units=None):
+    texts = value_texts(mode, values)
+    key = (mode, hive_id, texts, units)
+    if _unchanged(key):
+        return
+
+    lcd.load_frame(background(mode))
+    run_ops(LAYOUTS[mode][1], hive_id, texts)
+    lcd.show()
+    lcd.content_key = key
+
+# ================= Screen Cache =================
+# Hive frames are cached per (mode, hive id) so the display loop only has to
+# copy one back and flush it. A frame is stored as the row bands where it
+# differs from its base (the mode's background, or a blank screen for the
+# text summary), which is a few KB instead of 32 KB. Entries are evicted
+# least recently used first to stay under SCREEN_CACHE_BYTES.
+#
+# Hives are shown in order, so if a mode's frames do not all fit, LRU drops
+# each one before its turn comes round again. prerender() then leaves them
+# to render_hive(), which composes each frame as it is shown.
+SCREEN_CACHE_BYTES = 48 * 1024
+ROW_BYTES = SCREEN_WIDTH * 2
+
+_screens = {}        # (mode, hive id) -> (content key, asset generation, bands, bytes)
+_screen_order = []   # (mode, hive id), least recently used first
+_screen_bytes = 0
+_blank_row = bytes(ROW_BYTES)   # BACKGROUND is colour(0, 0, 0)
+_frame_bytes = {}    # mode -> size of its last composed frame
+
+SCREEN_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+def hive_key(mode, hive, units=None):
+    """Content key of a hive's frame; its first two items are (mode, hive id)."""
+    if mode == "sensor_all":
+        return (mode, hive["id"], tuple(hive["temperature"]), tuple(hive["humidity"]),
+                hive["weight"], units)
+    readings = hive[TEMPLATES[mode]["source"]]
+    if isinstance(readings, list):
+        values = values_by_label(readings)
+    else:
+        values = {TEMPLATES[mode]["slots"][0][0].lower(): readings}
+    return (mode, hive["id"], value_texts(mode, values), units)
+
+def _draw_base(mode):
+    if mode in LAYOUTS:
+        lcd.load_frame(background(mode))
+        return _bg["buf"]
+    lcd.fill(BACKGROUND)
+    return None
+
+def _compose(mode, hive, key):
+    """Draw a hive's frame into the LCD buffer and cache it; nothing is flushed."""
+    global _screen_bytes
+    if mode == "sensor_all":
+        draw_summary(hive["id"], hive["temperature"], hive["humidity"], hive["weight"])
+        base = None
+    else:
+        base = _draw_base(mode)
+        run_ops(LAYOUTS[mode][1], key[1], key[2])
+
+    buf = lcd.buffer
+    bands = []
+    size = 0
+    start = None
+    for y in range(SCREEN_HEIGHT + 1):
+        i = y * ROW_BYTES
+        same = y == SCREEN_HEIGHT or buf[i:i + ROW_BYTES] == (
+            _blank_row if base is None else base[i:i + ROW_BYTES])
+        if not same and start is None:
+            start = i
+        elif same and start is not None:
+            bands.append((start, bytes(buf[start:i])))
+            size += i - start
+            start = None
+
+    slot = key[:2]
+    drop_screen(slot)
+    _frame_bytes[mode] = size
+    if size > SCREEN_CACHE_BYTES:
+        return
+    while _screen_order and _screen_bytes + size > SCREEN_CACHE_BYTES:
+        drop_screen(_screen_order[0])
+        SCREEN_STATS["evictions"] += 1
+    _screens[slot] = (key, lcd_display.asset_generation, bands, size)
+    _screen_order.append(slot)
+    _screen_bytes += size
+
+def _restore(key):
+    """Copy a cached frame back into the LCD buffer. False on a miss."""
+    slot = key[:2]
+    entry = _screens.get(slot)
+    if entry is None or entry[0] != key or entry[1] != lcd_display.asset_generation:
+        SCREEN_STATS["misses"] += 1
+        return False
+    SCREEN_STATS["hits"] += 1
+    _screen_order.remove(slot)
+    _screen_order.append(slot)
+
+    _draw_base(key[0])
+    buf = memoryview(lcd.buffer)
+    for start, band in entry[2]:
+        buf[start:start + len(band)] = band
+    return True
+
+def drop_screen(slot):
+    global _screen_bytes
+    entry = _screens.pop(slot, None)
+    if entry is not None:
+        _screen_order.remove(slot)
+        _screen_bytes -= entry[3]
+
+def draw_stale_badge():
+    """Mark the hive on the panel as out of date: its dashboard has not
+    answered for a while. Drawing clears lcd.content_key, so the next
+    render_hive() redraws the frame without it."""
+    lcd.fill_rect(110, 0, 18, 18, colour(255, 160, 0))
+    lcd.text("!", 116, 4, colour(0, 0, 0))
     lcd.show()
 
+def drop_hives(ids):
+    """Evict every mode's frame of the given hive ids."""
+    for slot in [slot for slot in _screens if slot[1] in ids]:
+        drop_screen(slot)
+
+def clear_screen_cache():
+    global _screen_bytes
+    _screens.clear()
+    del _screen_order[:]
+    _screen_bytes = 0
+
+def prerender(mode, hives, units=None):
+    """Compose and cache every hive frame that is missing or stale, e.g. right
+    after new data lands, as long as all of them fit the cache. Leaves the
+    LCD buffer dirty, so follow it with render_hive()."""
+    for hive in hives:
+        key = hive_key(mode, hive, units)
+        entry = _screens.get(key[:2])
+        if entry is None or entry[0] != key or entry[1] != lcd_display.asset_generation:
+            size = _frame_bytes.get(mode)
+            if size is not None and len(hives) * size > SCREEN_CACHE_BYTES:
+                return   # would be evicted before it is shown
+            _compose(mode, hive, key)
+
+def render_hive(mode, hive, units=None, transition=False):
+    """Show one hive in a sensor mode from the screen cache, composing it on
+    a miss, and skip it entirely if it is already on the panel. With
+    transition set the new frame slides in over the old one."""
+    key = hive_key(mode, hive, units)
+    if _unchanged(key):
+        return
+    if not _restore(key):
+        _compose(mode, hive, key)
+    if transition:
+        lcd.slide_in()
+    else:
+        lcd.show()
+    lcd.content_key = key
 
-# ================= HUMIDITY HALVES =================
-def display_humidity_halves(hive_id, humidities, image_path="Images/humidity.rgb"):
-    lcd.fill(colour(0, 0, 0))
-
-    screen_width = 128
-    screen_height = 128
-    title_height = 14
-    bottom_margin = 2
-    grid_top = title_height + 2
-    grid_bottom = screen_height - bottom_margin
-    grid_height = grid_bottom - grid_top
-
-    title_bg = colour(40, 40, 40)
-    text_colour = colour(255, 255, 255)
-
-    lcd.fill_rect(0, 0, screen_width, title_height, title_bg)
-    title = f"Hive {hive_id}"
-    text_x = (screen_width - len(title) * 8) // 2
-    lcd.text(title, text_x, 4, text_colour)
-
-    half_width = screen_width // 2
-    centers = [
-        (half_width // 2, grid_top + grid_height // 2),
-        (half_width + half_width // 2, grid_top + grid_height // 2)
-    ]
-
-    lcd.vline(half_width, grid_top, grid_height, colour(60, 60, 60))
 
-    labels = ["Inside", "Outside"]
-    labels_coords = [
-        (centers[0][0], grid_bottom - 10),
-        (centers[1][0], grid_bottom - 10)
-    ]
+# ================= TEMPERATURE QUADRANTS =================
+def display_temp_quadrants(hive_id, temps):
+    render_screen("sensor_temp", hive_id, values_by_label(temps))
 
-    for i, hum_label in enumerate(labels):
-        value = "--"
-        for k, v in humidities:
-            if k.lower() == hum_label.lower():
-                value = v
-                break
-
-        num_str = str(value)
-        digit_width = 8
-        digit_height = 16
-        total_width = len(num_str) * digit_width
-        draw_x = centers[i][0] - total_width // 2
-        draw_y = centers[i][1] - digit_height // 2
-        draw_number(lcd, num_str, draw_x, draw_y, digit_width, digit_height)
-
-        lx, ly = labels_coords[i]
-        label_width = len(hum_label) * 8
-        lcd.text(hum_label, lx - label_width // 2, ly, text_colour)
-
-    try:
-        icon_x = (screen_width - 32) // 2
-        icon_y = grid_top + 8
-        display_rgb_image(lcd, image_path, icon_x, icon_y, 32, 32)
-    except Exception as e:
-        print("Could not load image:", e)
 
-    lcd.show()
+# ================= HUMIDITY HALVES =================
+def display_humidity_halves(hive_id, humidities):
+    render_screen("sensor_humidity", hive_id, values_by_label(humidities))
 
 
 # ================= WEIGHT SINGLE =================
-def display_weight_single(hive_id, weight_value, image_path="Images/weight.rgb"):
-    lcd.fill(colour(0, 0, 0))
-
-    screen_width = 128
-    screen_height = 128
-    title_height = 14
-    grid_top = title_height + 2
-    grid_bottom = screen_height - 2
-    grid_height = grid_bottom - grid_top
-
-    title_bg = colour(40, 40, 40)
-    text_colour = colour(255, 255, 255)
-
-    lcd.fill_rect(0, 0, screen_width, title_height, title_bg)
-    title = f"Hive {hive_id}"
-    text_x = (screen_width - len(title) * 8) // 2
-    lcd.text(title, text_x, 4, text_colour)
-
-    num_str = str(round(float(weight_value), 1))
-    digit_width = 8
-    digit_height = 16
-    total_width = len(num_str) * digit_width
-
-    icon_width = 32
-    icon_height = 32
-    icon_x = 8
-    icon_y = grid_top + (grid_height - icon_height) // 2
-
-    draw_x = icon_x + icon_width + 8
-    draw_y = grid_top + (grid_height - digit_height) // 2
-
-    try:
-        display_rgb_image(lcd, image_path, icon_x, icon_y, icon_width, icon_height)
-    except Exception as e:
-        print("Could not load image:", e)
-
-    draw_number(lcd, num_str, draw_x, draw_y, digit_width, digit_height)
-    lcd.show()
-
+def display_weight_single(hive_id, weight_value):
+    render_screen("sensor_weight", hive_id, {"weight": weight_value})
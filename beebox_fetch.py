@@ -1,130 +1,336 @@
-import ure
-import urequests
-import network
-import time
+import utime
+import hashlib
 import wifi_utils # Wifi Connection Function
+import beebox_http
+import beebox_metrics
 
-# ================= Fetch & Parse HTML =================
-def fetch_webpage(url="http://beedata.bee-box.co.uk/"):
-    try:
-        response = urequests.get(url)
-        html = response.text
-        response.close()
-        return html
-    except Exception as e:
-        print("Error fetching webpage:", e)
-        return None
-
-# === Extract a value by class name from HTML chunk ===
-def extract_values_by_class(html, cls, unit):
-    values = []
-    start_tag = f'class="list-group-item {cls}"'
-    start_idx = 0
-    while True:
-        idx = html.find(start_tag, start_idx)
-        if idx == -1:
-            break
-        # Find the closing >
-        gt_idx = html.find(">", idx)
-        if gt_idx == -1:
-            break
-        # Find the closing </li>
-        end_idx = html.find("</li>", gt_idx)
-        if end_idx == -1:
-            break
-        li_text = html[gt_idx+1:end_idx].strip()
-        if ":" in li_text:
-            label, value = li_text.split(":")
-            values.append((label.strip(), value.replace(unit, "").strip()))
-        start_idx = end_idx + 5  # move past this </li>
-    return values
-
-# ================= Parse HTML by hive =================
-def parse_html_by_hive(html):
-    hives = []
-    hive_marker = '<h3>Beehive ID:'
-    
-    # Find all positions of hive headers
-    positions = []
-    pos = 0
-    while True:
-        idx = html.find(hive_marker, pos)
-        if idx == -1:
-            break
-        positions.append(idx)
-        pos = idx + len(hive_marker)
-    positions.append(len(html))  # add end of page for the last hive
-
-    # Extract each hive block
-    for i in range(len(positions)-1):
-        start = positions[i]
-        end = positions[i+1]
-        hive_html = html[start:end]
-
-        # Hive ID
-        hive_id = None
-        id_end = hive_html.find('</h3>')
-        if id_end != -1:
-            hive_id = hive_html[len(hive_marker):id_end].strip()
-
-        # Temperatures
-        temp_classes = ["temp-brood","temp-super","temp-roof","temp-outside"]
-        temperatures = {}
-        for cls in temp_classes:
-            vals = extract_values_by_class(hive_html, cls, "°C")
-            if vals:
-                temperatures[vals[0][0]] = vals[0][1]
+# ================= Streaming parser =================
+# The page is read CHUNK_SIZE bytes at a time and never held whole.
+# HiveParser keeps only the unconsumed tail of what it has been fed (at most
+# MAX_TOKEN bytes waiting for an element to close) and emits each hive as
+# soon as the next hive header, or the end of the page, completes it.
+#
+# Scanning is a single pass over byte offsets: jump from one '<' to the
+# next, let the byte after it pick a tag handler, and look up list items by
+# their class attribute. Only ids, labels and values are ever copied out.
+DATA_URL = "http://beedata.bee-box.co.uk/"
+CHUNK_SIZE = 512
+MAX_TOKEN = 256
 
-        # Humidities
-        hum_classes = ["humid-outside","humid-roof"]
-        humidities = {}
-        for cls in hum_classes:
-            vals = extract_values_by_class(hive_html, cls, "%")
-            if vals:
-                humidities[vals[0][0]] = vals[0][1]
-
-        # Weight
-        weight = None
-        for line in hive_html.splitlines():
-            if "Weight:" in line:
-                parts = line.split(":")
-                if len(parts) > 1:
-                    weight = parts[1].split("kg")[0].strip()
-                    break
+HIVE_MARKER = b'<h3>Beehive ID:'
+ITEM_MARKER = b'class="list-group-item '
+WEIGHT_MARKER = b'Weight:'
+
+TEMP_CLASSES = (b"temp-brood", b"temp-super", b"temp-roof", b"temp-outside")
+HUM_CLASSES = (b"humid-outside", b"humid-roof")
+CLASS_UNITS = {}
+for _cls in TEMP_CLASSES:
+    CLASS_UNITS[_cls] = "°C"
+for _cls in HUM_CLASSES:
+    CLASS_UNITS[_cls] = "%"
+
+class HiveParser:
+    def __init__(self):
+        self._buf = b""
+        self._hive = None   # [id, {class: (label, value)}, weight]
+        # Byte after '<' -> handler; anything else is skipped to its '>'
+        self._tags = {0x68: self._h3, 0x6C: self._li}   # 'h', 'l'
+
+    def feed(self, data):
+        """Consume the next piece of the page; returns the hives it completed."""
+        self._buf += data
+        return self._scan(False)
+
+    def close(self):
+        """End of page: returns the remaining hives."""
+        done = self._scan(True)
+        if self._hive is not None:
+            done.append(self._finish())
+        self._buf = b""
+        return done
+
+    def _scan(self, final):
+        buf = self._buf
+        end = len(buf)
+        pos = 0
+        done = []
+        while pos < end:
+            lt = buf.find(b"<", pos)
+            text_end = end if lt == -1 else lt
+
+            # Text before the tag: only the weight is read from free text
+            hive = self._hive
+            if text_end > pos and hive is not None and hive[2] is None:
+                if lt == -1 and not final and end - pos <= MAX_TOKEN:
+                    break   # the text may go on in the next chunk
+                at = buf.find(WEIGHT_MARKER, pos, text_end)
+                if at != -1:
+                    self._weight(buf, at + len(WEIGHT_MARKER), text_end)
+            if lt == -1:
+                pos = end
+                break
+
+            nxt = None
+            if lt + 1 < end:
+                handler = self._tags.get(buf[lt + 1])
+                if handler is not None:
+                    nxt = handler(buf, lt, end, done)
+                else:
+                    gt = buf.find(b">", lt)
+                    nxt = gt + 1 if gt != -1 else None
+            if nxt is None:
+                # Element not closed yet: wait for more, unless it never will
+                if final or end - lt > MAX_TOKEN:
+                    pos = lt + 1
+                    continue
+                pos = lt
+                break
+            pos = nxt
+
+        self._buf = buf[pos:]
+        return done
+
+    def _h3(self, buf, lt, end, done):
+        if end - lt < len(HIVE_MARKER):
+            return None
+        if not buf.startswith(HIVE_MARKER, lt):
+            gt = buf.find(b">", lt)
+            return gt + 1 if gt != -1 else None
+        close = buf.find(b"</h3>", lt)
+        if close == -1:
+            return None
+        if self._hive is not None:
+            done.append(self._finish())
+        self._hive = [buf[lt + len(HIVE_MARKER):close].strip().decode(), {}, None]
+        return close + 5
+
+    def _li(self, buf, lt, end, done):
+        gt = buf.find(b">", lt)
+        if gt == -1:
+            return None
+        at = buf.find(ITEM_MARKER, lt, gt)
+        if at == -1 or self._hive is None:
+            return gt + 1
+        at += len(ITEM_MARKER)
+        cls = buf[at:buf.find(b'"', at, gt)]
+        unit = CLASS_UNITS.get(cls)
+        items = self._hive[1]
+        if unit is None or cls in items:
+            return gt + 1   # its text is scanned like any other
+        close = buf.find(b"</li>", gt)
+        if close == -1:
+            return None
+        text = buf[gt + 1:close]
+        if b":" in text:
+            label, value = text.split(b":", 1)
+            items[cls] = (label.strip().decode(), value.decode().replace(unit, "").strip())
+        return close + 5
 
-        hives.append({
+    def _weight(self, buf, start, stop):
+        # Same reading as the line-based parser: up to the next ':' or the
+        # end of the line, then the number before "kg"
+        nl = buf.find(b"\n", start, stop)
+        if nl != -1:
+            stop = nl
+        colon = buf.find(b":", start, stop)
+        if colon != -1:
+            stop = colon
+        self._hive[2] = buf[start:stop].split(b"kg")[0].strip().decode()
+
+    def _finish(self):
+        hive_id, items, weight = self._hive
+        self._hive = None
+        temperatures = {}
+        for cls in TEMP_CLASSES:
+            if cls in items:
+                temperatures[items[cls][0]] = items[cls][1]
+        humidities = {}
+        for cls in HUM_CLASSES:
+            if cls in items:
+                humidities[items[cls][0]] = items[cls][1]
+        return {
             "id": hive_id,
             "temperature": temperatures,
             "humidity": humidities,
             "weight": weight
-        })
+        }
+
+def stream_hives(response, digest=None):
+    """Yield raw hive records one at a time as the page streams in, feeding
+    every chunk to digest (a hashlib object) too if one is given."""
+    parser = HiveParser()
+    read_us = parse_us = size = 0
+    while True:
+        t = utime.ticks_us()
+        chunk = response.raw.read(CHUNK_SIZE)
+        read_us += utime.ticks_diff(utime.ticks_us(), t)
+        if not chunk:
+            break
+        size += len(chunk)
+        t = utime.ticks_us()
+        if digest is not None:
+            digest.update(chunk)
+        done = parser.feed(chunk)
+        parse_us += utime.ticks_diff(utime.ticks_us(), t)
+        for hive in done:
+            yield hive
+    t = utime.ticks_us()
+    done = parser.close()
+    parse_us += utime.ticks_diff(utime.ticks_us(), t)
+    beebox_metrics.add("download", read_us, size)
+    beebox_metrics.add("parse", parse_us)
+    for hive in done:
+        yield hive
 
-    return hives
+def format_hive(hive, source=None):
+    """Convert to lists of tuples and filter out 'None'. With a source name
+    the hive is tagged with it, and its id is prefixed so ids stay unique
+    across dashboards."""
+    formatted = {
+        "id": hive["id"] if source is None else source + "/" + hive["id"],
+        "temperature": [(k, v) for k, v in hive["temperature"].items() if v != "None"],
+        "humidity": [(k, v) for k, v in hive["humidity"].items() if v != "None"],
+        "weight": hive["weight"]
+    }
+    if source is not None:
+        formatted["source"] = source
+    return formatted
 
 
 # ===== Fetch all hive data =====
-def get_hive_data():
+# The last result per URL, served again when the page answers 304 or comes
+# back byte-identical (same SHA-256 of the decoded body). Pages without
+# validators are the common case for a dynamic dashboard, so the hash is
+# what catches "nothing new" there.
+_cache = {}   # url -> (hives, digest)
+
+def diff_hives(old, new):
+    """Per-hive changes from old to new -> (hives, changed ids, removed ids).
+    Hives whose readings are unchanged keep their old dict, so the returned
+    list shares them with old."""
+    previous = {}
+    for hive in old or ():
+        previous[hive["id"]] = hive
+    hives = []
+    changed = []
+    for hive in new:
+        before = previous.pop(hive["id"], None)
+        if before == hive:
+            hive = before
+        else:
+            changed.append(hive["id"])
+        hives.append(hive)
+    return hives, changed, list(previous)
+
+def fetch_hive_changes(url=DATA_URL, source=None):
+    """Fetch the page -> (hives, changes). changes is None when nothing is
+    new (304 or an identical payload, hives is then the previous list),
+    otherwise (changed ids, removed ids). Errors give ([], None). source
+    tags the hives (see format_hive)."""
+    fetch = _begin(url)
     wifi_utils.ensure_wifi()
-    html = fetch_webpage()
-    if not html:
-        #print("[DEBUG] fetch_webpage returned None")
-        return []
-    
-    #print("[DEBUG] HTML fetched, length:", len(html))
-    raw_hives = parse_html_by_hive(html)
-    #print("[DEBUG] raw_hives:", raw_hives)
-
-    formatted_hives = []
-
-    for hive in raw_hives:
-        # Convert to lists of tuples and filter out 'None'
-        temps = [(k, v) for k, v in hive["temperature"].items() if v != "None"]
-        hums = [(k, v) for k, v in hive["humidity"].items() if v != "None"]
-        formatted_hives.append({
-            "id": hive["id"],
-            "temperature": temps,
-            "humidity": hums,
-            "weight": hive["weight"]
-        })
-
-    return formatted_hives
+    try:
+        response = beebox_http.get(url, fetch[2] is not None)
+        if response is None:
+            return _unchanged(fetch)
+        digest = hashlib.sha256()
+        try:
+            parsed = [format_hive(hive, source) for hive in stream_hives(response, digest)]
+        finally:
+            response.close()
+    except Exception as e:
+        return _failed(fetch, e)
+    return _done(url, fetch, response, parsed, digest)
+
+# The bookkeeping fetch_hive_changes() and afetch_hive_changes() share. A
+# fetch is (start ticks, wire bytes at the start, cached hives, their digest).
+def _begin(url):
+    cached, last_digest = _cache.get(url, (None, None))
+    return beebox_metrics.start(), beebox_http.STATS["wire_bytes"], cached, last_digest
+
+def _stop(fetch):
+    beebox_metrics.stop("fetch", fetch[0], beebox_http.STATS["wire_bytes"] - fetch[1])
+
+def _unchanged(fetch):
+    _stop(fetch)
+    return fetch[2], None   # page unchanged since it was parsed
+
+def _failed(fetch, e):
+    print("Error fetching webpage:", e)
+    _stop(fetch)
+    return [], None
+
+def _done(url, fetch, response, parsed, digest):
+    """A page was parsed: keep its validators and diff it against the cache."""
+    beebox_http.commit(url, response)
+    _stop(fetch)
+    t = beebox_metrics.start()
+    result = _publish(url, fetch[2], fetch[3], parsed, digest.digest())
+    beebox_metrics.stop("diff", t)
+    return result
+
+def _publish(url, cached, last_digest, parsed, digest):
+    if cached is not None and digest == last_digest:
+        return cached, None       # same bytes as last time
+    hives, changed, removed = diff_hives(cached, parsed)
+    _cache[url] = (hives, digest)
+    if cached is not None and not changed and not removed:
+        return cached, None       # different bytes, same readings
+    return hives, (changed, removed)
+
+def get_hive_data(url=DATA_URL):
+    return fetch_hive_changes(url)[0]
+
+async def afetch_hive_changes(url=DATA_URL, source=None):
+    """fetch_hive_changes() for the uasyncio runtime. The page is read over a
+    non-blocking connection and other tasks run between chunks. A compressed
+    page is spooled first (it gzips to a few KB) and inflated from RAM.
+    Reads (spooling and inflating included) are timed into "download", as
+    stream_hives() does; the time other tasks run meanwhile counts too."""
+    import uasyncio as asyncio
+    import io
+    fetch = _begin(url)
+    await wifi_utils.aensure_wifi()
+    try:
+        response = await beebox_http.aget(url, fetch[2] is not None)
+        if response is None:
+            return _unchanged(fetch)
+        digest = hashlib.sha256()
+        parser = HiveParser()
+        parsed = []
+        read_us = parse_us = size = 0
+        try:
+            body = None
+            if response.encoding:
+                t = utime.ticks_us()
+                body = beebox_http.inflate(io.BytesIO(await response.readall()),
+                                           response.encoding)
+                read_us += utime.ticks_diff(utime.ticks_us(), t)
+            while True:
+                t = utime.ticks_us()
+                if body is None:
+                    chunk = await response.read(CHUNK_SIZE)
+                    read_us += utime.ticks_diff(utime.ticks_us(), t)
+                else:
+                    chunk = body.read(CHUNK_SIZE)
+                    read_us += utime.ticks_diff(utime.ticks_us(), t)
+                    await asyncio.sleep_ms(0)
+                if not chunk:
+                    break
+                size += len(chunk)
+                t = utime.ticks_us()
+                digest.update(chunk)
+                for hive in parser.feed(chunk):
+                    parsed.append(format_hive(hive, source))
+                parse_us += utime.ticks_diff(utime.ticks_us(), t)
+            t = utime.ticks_us()
+            for hive in parser.close():
+                parsed.append(format_hive(hive, source))
+            parse_us += utime.ticks_diff(utime.ticks_us(), t)
+        finally:
+            response.close()
+    except Exception as e:
+        return _failed(fetch, e)
+    beebox_metrics.add("download", read_us, size)
+    beebox_metrics.add("parse", parse_us)
+    return _done(url, fetch, response, parsed, digest)
@@ -0,0 +1,634 @@
+# ===== beebox_http.py =====
+# HTTP client shared by beebox_fetch and ota.
+#
+# Requests are HTTP/1.1 over pooled keep-alive connections, one small idle
+# pool per (host, port, tls). An OTA run fetches a dozen or more files from
+# raw.githubusercontent.com; reusing the connection saves a DNS lookup, a
+# TCP handshake and a TLS handshake for every file after the first. Every
+# socket has a TIMEOUT, and bodies may be sent with Content-Length, chunked,
+# or (HTTP/1.0 style) until the server closes.
+#
+# Responses may be compressed: get() sends Accept-Encoding and a gzip or
+# deflate body is inflated as it is read, through the deflate module, so
+# callers stream decoded bytes exactly as before. STATS counts the bytes
+# received on the wire against the decoded body bytes handed to callers.
+#
+# Conditional requests: once a caller has used a response successfully it
+# calls commit(), which stores the response's ETag / Last-Modified for that
+# URL. The next get() for the URL, if the caller still holds what it parsed
+# last time, sends If-None-Match / If-Modified-Since. A 304 comes back as
+# None so the caller can reuse its cached result without downloading or
+# parsing. Validators live in RAM only: the parsed results they stand for
+# do not survive a reboot, so neither need they.
+#
+# Every GET also notes the response's Cache-Control max-age and Retry-After
+# for its URL; hints() hands them to the fetch scheduler.
+import io
+import usocket as socket
+import ussl as ssl
+import utime
+import ujson
+import beebox_metrics
+
+try:
+    import deflate
+except ImportError:   # firmware before 1.21: ask for identity bodies only
+    deflate = None
+
+TIMEOUT = 10            # seconds, for connect and every read
+POOL_PER_HOST = 2       # idle connections kept per host (0: never reuse)
+POOL_IDLE_MS = 20000    # servers drop idle keep-alive sockets; so do we
+DRAIN_MAX = 1024        # unread body bytes worth reading to keep a socket
+READ_SIZE = 512
+ACCEPT_ENCODING = "gzip, deflate" if deflate else None
+
+STATS = {"requests": 0, "not_modified": 0, "connects": 0, "tls_handshakes": 0,
+         "reused": 0, "stale": 0, "wire_bytes": 0, "body_bytes": 0}
+
+_validators = {}     # url -> [etag, last_modified]
+_pool = {}           # (host, port, tls) -> [idle _Connection]
+_addrs = {}          # (host, port) -> resolved address
+
+# ================= Connections =================
+class _Connection:
+    def __init__(self, key):
+        host, port, tls = key
+        addr = _addrs.get((host, port))
+        if addr is None:
+            t = beebox_metrics.start()
+            addr = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][-1]
+            beebox_metrics.stop("dns", t)
+            _addrs[(host, port)] = addr
+        t = beebox_metrics.start()
+        s = socket.socket()
+        s.settimeout(TIMEOUT)
+        try:
+            s.connect(addr)
+            if tls:
+                s = ssl.wrap_socket(s, server_hostname=host)
+                STATS["tls_handshakes"] += 1
+        except:
+            s.close()
+            _addrs.pop((host, port), None)   # the host may have moved
+            raise
+        STATS["connects"] += 1
+        beebox_metrics.stop("connect", t)
+        self.key = key
+        self.sock = s
+        self.used = utime.ticks_ms()
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+def _acquire(key):
+    """An idle pooled connection for key, or a new one; (conn, reused)."""
+    idle = _pool.get(key)
+    now = utime.ticks_ms()
+    while idle:
+        conn = idle.pop()
+        if utime.ticks_diff(now, conn.used) < POOL_IDLE_MS:
+            return conn, True
+        conn.close()
+    return _Connection(key), False
+
+def _release(conn):
+    idle = _pool.setdefault(conn.key, [])
+    if len(idle) < POOL_PER_HOST:
+        conn.used = utime.ticks_ms()
+        idle.append(conn)
+    else:
+        conn.close()
+
+def close_all():
+    """Close every pooled connection, e.g. at the end of an OTA run (a TLS
+    session holds tens of KB) or after Wi-Fi has dropped."""
+    for idle in _pool.values():
+        for conn in idle:
+            conn.close()
+    _pool.clear()
+    _addrs.clear()
+
+# ================= Responses =================
+def _readline(s):
+    line = s.readline()
+    STATS["wire_bytes"] += len(line)
+    return line
+
+def _recv(s, n):
+    data = s.read(n)
+    STATS["wire_bytes"] += len(data)
+    return data
+
+class _Body(io.IOBase):
+    """Reads one response body off its connection and no further. A stream
+    (readinto) so deflate.DeflateIO can read from it."""
+    def __init__(self, sock, length, chunked):
+        self._sock = sock
+        # Bytes left in the body (or in the current chunk); None: the body
+        # runs until the server closes
+        self._left = length
+        self._chunked = chunked
+        self.done = length == 0 and not chunked
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            out = b""
+            while True:
+                data = self.read(READ_SIZE)
+                if not data:
+                    return out
+                out += data
+        if self.done or n == 0:
+            return b""
+        s = self._sock
+        if self._chunked and self._left == 0:
+            size = int(_readline(s).split(b";")[0].strip(), 16)
+            if size == 0:
+                while _readline(s) not in (b"\r\n", b""):
+                    pass   # trailers
+                self.done = True
+                return b""
+            self._left = size
+        if self._left is None:
+            data = _recv(s, n)
+            if not data:
+                self.done = True
+            return data
+        data = _recv(s, min(n, self._left))
+        if not data:
+            raise OSError("connection closed mid-body")
+        self._left -= len(data)
+        if self._left == 0:
+            if self._chunked:
+                _readline(s)   # CRLF after the chunk
+            else:
+                self.done = True
+        return data
+
+    def readinto(self, buf):
+        data = self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def drain(self, limit):
+        """Read and discard the rest if it is known to be at most limit bytes."""
+        if not self.done and not self._chunked and self._left is not None \
+                and self._left <= limit:
+            self.read()
+        return self.done
+
+class _Decoded:
+    """Body reader that counts what it hands out, inflating it first if the
+    response has a Content-Encoding."""
+    def __init__(self, body, encoding):
+        self._body = body
+        self._src = body
+        if encoding in ("gzip", "deflate"):
+            # AUTO tells zlib and gzip framing apart by their headers
+            self._src = deflate.DeflateIO(body, deflate.AUTO)
+        elif encoding not in (None, "identity"):
+            raise ValueError("Unsupported Content-Encoding: " + encoding)
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            out = b""
+            while True:
+                data = self.read(READ_SIZE)
+                if not data:
+                    return out
+                out += data
+        data = self._src.read(n)
+        STATS["body_bytes"] += len(data)
+        return data
+
+    def drain(self, limit):
+        return self._body.drain(limit)
+
+class Response:
+    def __init__(self, conn):
+        self._conn = conn
+        self._keep = False
+        self._content = None
+        self.status_code = None
+        self.reason = b""
+        self.headers = {}
+        self.raw = None
+
+    def close(self):
+        """Finish with the response; a fully read keep-alive connection goes
+        back to the pool, anything else is closed."""
+        conn = self._conn
+        if conn is None:
+            return
+        self._conn = None
+        try:
+            if self._keep and self.raw.drain(DRAIN_MAX):
+                _release(conn)
+                return
+        except OSError:
+            pass
+        conn.close()
+
+    @property
+    def content(self):
+        if self._content is None:
+            try:
+                self._content = self.raw.read()
+            finally:
+                self.close()
+        return self._content
+
+    @property
+    def text(self):
+        return str(self.content, "utf-8")
+
+    def json(self):
+        return ujson.loads(self.content)
+
+def _lookup(headers, name):
+    name = name.lower()
+    for k, v in headers.items():
+        if k.lower() == name:
+            return v
+    return None
+
+def header(response, name):
+    """Case-insensitive response header lookup (None if absent)."""
+    return _lookup(getattr(response, "headers", None) or {}, name)
+
+# ================= Requests =================
+def _split(url):
+    proto, _, rest = url.partition("//")
+    host, _, path = rest.partition("/")
+    if proto == "http:":
+        port, tls = 80, False
+    elif proto == "https:":
+        port, tls = 443, True
+    else:
+        raise ValueError("Unsupported protocol: " + proto)
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    return (host, port, tls), "/" + path
+
+def _head(key, method, path, headers):
+    host, port, tls = key
+    if port != (443 if tls else 80):
+        host = "%s:%d" % (host, port)
+    head = "%s %s HTTP/1.1\r\nHost: %s\r\n" % (method, path, host)
+    for k, v in headers.items():
+        head += "%s: %s\r\n" % (k, v)
+    return head.encode() + b"\r\n"
+
+def _status(r, line):
+    """Parse the status line into r; returns the HTTP version."""
+    if not line:
+        raise OSError("connection closed")
+    parts = line.split(None, 2)
+    r.status_code = int(parts[1])
+    if len(parts) > 2:
+        r.reason = parts[2].rstrip()
+    return parts[0]
+
+def _header(r, line):
+    """Add one header line to r; False at the blank line ending them."""
+    if not line or line == b"\r\n":
+        return False
+    k, _, v = line.decode().partition(":")
+    r.headers[k.strip()] = v.strip()
+    return True
+
+def _framing(r, method, version):
+    """How the body is delimited -> (length, chunked, keep-alive). A length
+    of None means the body runs until the server closes."""
+    connection = (_lookup(r.headers, "Connection") or "").lower()
+    if version == b"HTTP/1.1":
+        keep = connection != "close"
+    else:
+        keep = connection == "keep-alive"
+    if method == "HEAD" or r.status_code in (204, 304) or r.status_code < 200:
+        return 0, False, keep
+    if "chunked" in (_lookup(r.headers, "Transfer-Encoding") or "").lower():
+        return 0, True, keep
+    length = _lookup(r.headers, "Content-Length")
+    if length is not None:
+        return int(length), False, keep
+    return None, False, False
+
+def _encoding(r):
+    encoding = _lookup(r.headers, "Content-Encoding")
+    return encoding and encoding.strip().lower()
+
+def _exchange(conn, method, path, headers):
+    s = conn.sock
+    s.write(_head(conn.key, method, path, headers))
+    r = Response(conn)
+    version = _status(r, _readline(s))
+    while _header(r, _readline(s)):
+        pass
+    length, chunked, keep = _framing(r, method, version)
+    r.raw = _Decoded(_Body(s, length, chunked), _encoding(r))
+    r._keep = keep
+    return r
+
+def request(method, url, headers=None):
+    """Send one request over a pooled connection. The response body is left
+    on response.raw; close() the response when done with it."""
+    key, path = _split(url)
+    while True:
+        conn, reused = _acquire(key)
+        t = beebox_metrics.start()
+        try:
+            r = _exchange(conn, method, path, headers or {})
+        except OSError:
+            conn.close()
+            if not reused:
+                raise
+            STATS["stale"] += 1   # server dropped it while idle: try the next
+            beebox_metrics.retry("request")
+            continue
+        except:
+            conn.close()   # a malformed response: the socket is unusable
+            raise
+        beebox_metrics.stop("request", t)
+        if reused:
+            STATS["reused"] += 1
+        return r
+
+# ================= Conditional GET =================
+def _get_headers(url, cached):
+    """Request headers for a GET -> (headers, conditional)."""
+    headers = {}
+    if ACCEPT_ENCODING:
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
+    conditional = False
+    if cached:
+        v = _validators.get(url)
+        if v:
+            conditional = True
+            if v[0]:
+                headers["If-None-Match"] = v[0]
+            if v[1]:
+                headers["If-Modified-Since"] = v[1]
+    return headers, conditional
+
+def get(url, cached=False):
+    """GET url. With cached set and validators held the request is
+    conditional, and None is returned if the server answers 304. Any status
+    other than 200 raises."""
+    headers, conditional = _get_headers(url, cached)
+    STATS["requests"] += 1
+    _hints.pop(url, None)
+    r = request("GET", url, headers)
+    _note_hints(url, r)
+    if r.status_code == 304 and conditional:
+        r.close()
+        STATS["not_modified"] += 1
+        return None
+    if r.status_code != 200:
+        r.close()
+        raise RuntimeError("HTTP %d" % r.status_code)
+    return r
+
+def commit(url, response):
+    """Remember a response's validators once its body has been used."""
+    v = [header(response, "ETag"), header(response, "Last-Modified")]
+    if v[0] or v[1]:
+        _validators[url] = v
+    else:
+        _validators.pop(url, None)
+
+def forget(url):
+    """Drop a URL's validators so the next get() is unconditional."""
+    _validators.pop(url, None)
+
+# ================= Scheduling hints =================
+_hints = {}   # url -> (max_age, retry_after) from its last response
+
+def _seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None   # absent, or an HTTP-date (the RTC may not be set)
+
+def _max_age(value):
+    if value:
+        for part in value.split(","):
+            part = part.strip().lower()
+            if part.startswith("max-age="):
+                return _seconds(part[8:])
+    return None
+
+def _note_hints(url, r):
+    _hints[url] = (_max_age(header(r, "Cache-Control")),
+                   _seconds(header(r, "Retry-After")))
+
+def hints(url):
+    """(max_age, retry_after) in seconds from the last response for url,
+    None for any the server did not send (or when no response came)."""
+    return _hints.get(url, (None, None))
+
+# ================= Async client =================
+# The same requests for the uasyncio runtime (beebox_async), over asyncio
+# streams so a slow or stalled host never blocks the scheduler; the pool is
+# separate from the blocking one. Bodies come back transfer-decoded but not
+# content-decoded: DeflateIO needs a blocking stream, so a compressed body
+# is spooled (to RAM or flash) by the caller and inflated with inflate().
+# open_connection resolves the host itself, so "connect" includes DNS here.
+_apool = {}   # (host, port, tls) -> [idle _AConnection]
+
+class _AConnection:
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.used = utime.ticks_ms()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except OSError:
+            pass
+
+async def _aopen(key):
+    import uasyncio as asyncio
+    host, port, tls = key
+    t = beebox_metrics.start()
+    if tls:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=True), TIMEOUT)
+        STATS["tls_handshakes"] += 1
+    else:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), TIMEOUT)
+    STATS["connects"] += 1
+    beebox_metrics.stop("connect", t)
+    return _AConnection(key, reader, writer)
+
+async def _aline(reader):
+    import uasyncio as asyncio
+    line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+    STATS["wire_bytes"] += len(line)
+    return line
+
+async def _arecv(reader, n):
+    import uasyncio as asyncio
+    data = await asyncio.wait_for(reader.read(n), TIMEOUT)
+    STATS["wire_bytes"] += len(data)
+    return data
+
+class _ABody:
+    """_Body over an asyncio stream."""
+    def __init__(self, reader, length, chunked):
+        self._reader = reader
+        self._left = length
+        self._chunked = chunked
+        self.done = length == 0 and not chunked
+
+    async def read(self, n):
+        if self.done or n == 0:
+            return b""
+        reader = self._reader
+        if self._chunked and self._left == 0:
+            size = int((await _aline(reader)).split(b";")[0].strip(), 16)
+            if size == 0:
+                while (await _aline(reader)) not in (b"\r\n", b""):
+                    pass   # trailers
+                self.done = True
+                return b""
+            self._left = size
+        if self._left is None:
+            data = await _arecv(reader, n)
+            if not data:
+                self.done = True
+            return data
+        data = await _arecv(reader, min(n, self._left))
+        if not data:
+            raise OSError("connection closed mid-body")
+        self._left -= len(data)
+        if self._left == 0:
+            if self._chunked:
+                await _aline(reader)   # CRLF after the chunk
+            else:
+                self.done = True
+        return data
+
+class AsyncResponse:
+    def __init__(self, conn):
+        self._conn = conn
+        self._keep = False
+        self.status_code = None
+        self.reason = b""
+        self.headers = {}
+        self.raw = None
+        self.encoding = None   # Content-Encoding still to undo, if any
+
+    async def read(self, n=READ_SIZE):
+        """Up to n body bytes (b"" at the end), still content-encoded."""
+        data = await self.raw.read(n)
+        if not self.encoding:
+            STATS["body_bytes"] += len(data)
+        return data
+
+    async def readall(self):
+        out = b""
+        while True:
+            data = await self.read(READ_SIZE)
+            if not data:
+                return out
+            out += data
+
+    def close(self):
+        """Pool the connection if the body was read to the end, else close
+        it. Never waits, so it is safe in a finally on cancellation."""
+        conn = self._conn
+        if conn is None:
+            return
+        self._conn = None
+        if self._keep and self.raw.done:
+            idle = _apool.setdefault(conn.key, [])
+            if len(idle) < POOL_PER_HOST:
+                conn.used = utime.ticks_ms()
+                idle.append(conn)
+                return
+        conn.close()
+
+async def _aexchange(conn, method, path, headers):
+    conn.writer.write(_head(conn.key, method, path, headers))
+    await conn.writer.drain()
+    r = AsyncResponse(conn)
+    version = _status(r, await _aline(conn.reader))
+    while _header(r, await _aline(conn.reader)):
+        pass
+    length, chunked, keep = _framing(r, method, version)
+    r.raw = _ABody(conn.reader, length, chunked)
+    r.encoding = _encoding(r)
+    if r.encoding == "identity":
+        r.encoding = None
+    r._keep = keep
+    return r
+
+async def arequest(method, url, headers=None):
+    """request() for the uasyncio runtime; returns an AsyncResponse."""
+    key, path = _split(url)
+    while True:
+        idle = _apool.get(key)
+        now = utime.ticks_ms()
+        conn = None
+        while idle:
+            conn = idle.pop()
+            if utime.ticks_diff(now, conn.used) < POOL_IDLE_MS:
+                break
+            conn.close()
+            conn = None
+        reused = conn is not None
+        if conn is None:
+            conn = await _aopen(key)
+        t = beebox_metrics.start()
+        try:
+            r = await _aexchange(conn, method, path, headers or {})
+        except OSError:
+            conn.close()
+            if not reused:
+                raise
+            STATS["stale"] += 1
+            beebox_metrics.retry("request")
+            continue
+        except:
+            conn.close()   # cancelled or timed out mid-exchange
+            raise
+        beebox_metrics.stop("request", t)
+        if reused:
+            STATS["reused"] += 1
+        return r
+
+async def aget(url, cached=False):
+    """get() for the uasyncio runtime."""
+    headers, conditional = _get_headers(url, cached)
+    STATS["requests"] += 1
+    _hints.pop(url, None)
+    r = await arequest("GET", url, headers)
+    _note_hints(url, r)
+    if r.status_code == 304 and conditional:
+        r.close()
+        STATS["not_modified"] += 1
+        return None
+    if r.status_code != 200:
+        r.close()
+        raise RuntimeError("HTTP %d" % r.status_code)
+    return r
+
+def inflate(source, encoding):
+    """A reader that decodes a spooled body (any blocking stream, e.g. a
+    BytesIO or an open file) of the given Content-Encoding."""
+    return _Decoded(source, encoding)
+
+def aclose_all():
+    """close_all() for the async pool."""
+    for idle in _apool.values():
+        for conn in idle:
+            conn.close()
+    _apool.clear()
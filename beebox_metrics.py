@@ -0,0 +1,105 @@
+# ===== beebox_metrics.py =====
+# Per-stage timing of the fetch pipeline. Each stage keeps its last SAMPLES
+# durations (microseconds, from utime.ticks_us) in a fixed ring, plus running
+# byte and retry counts. Everything is allocated at import, so recording and
+# reading never touch the heap: read() fills a caller-owned array made once
+# with new_record(), which suits a diagnostics screen redrawn every second.
+#
+#   wifi      Wi-Fi association in ensure_wifi
+#   probe     the has_internet TCP probe
+#   dns       getaddrinfo for a new connection
+#   connect   TCP connect (+ TLS handshake)
+#   request   request sent until the response headers are read
+#   download  body reads, decoding included; bytes = decoded body
+#   parse     HiveParser work on the page
+#   diff      hashing result check and per-hive diff
+#   fetch     one whole fetch_hive_changes(); bytes = on the wire,
+#             retries = failed attempts in the background updater
+#   ota       one whole OTA check
+from array import array
+import utime
+
+SAMPLES = 32
+
+STAGE_NAMES = ("wifi", "probe", "dns", "connect", "request", "download",
+               "parse", "diff", "fetch", "ota")
+
+# Fields of a record filled by read()
+FIELDS = ("count", "last", "min", "max", "mean", "p95", "bytes", "retries")
+COUNT, LAST, MIN, MAX, MEAN, P95, BYTES, RETRIES = range(8)
+
+class Stage:
+    def __init__(self):
+        self.ring = array("I", [0] * SAMPLES)
+        self.scratch = array("I", [0] * SAMPLES)   # sorted copy for p95
+        self.n = 0          # samples ever recorded
+        self.bytes = 0
+        self.retries = 0
+
+    def add(self, us, nbytes=0):
+        self.ring[self.n % SAMPLES] = us
+        self.n += 1
+        self.bytes += nbytes
+
+    def read(self, out):
+        """Fill out (see FIELDS) from the samples in the ring."""
+        k = min(self.n, SAMPLES)
+        out[COUNT] = self.n
+        out[BYTES] = self.bytes
+        out[RETRIES] = self.retries
+        if k == 0:
+            for i in range(LAST, P95 + 1):
+                out[i] = 0
+            return out
+        ring = self.ring
+        s = self.scratch
+        total = 0
+        for i in range(k):
+            v = ring[i]
+            total += v
+            # Insertion sort into scratch: no allocation, and k is small
+            j = i
+            while j > 0 and s[j - 1] > v:
+                s[j] = s[j - 1]
+                j -= 1
+            s[j] = v
+        out[LAST] = ring[(self.n - 1) % SAMPLES]
+        out[MIN] = s[0]
+        out[MAX] = s[k - 1]
+        out[MEAN] = total // k
+        out[P95] = s[(k * 95 + 99) // 100 - 1]   # nearest rank
+        return out
+
+STAGES = {}
+for _name in STAGE_NAMES:
+    STAGES[_name] = Stage()
+
+def start():
+    return utime.ticks_us()
+
+def stop(name, t0, nbytes=0):
+    """Record the time since t0 (from start()) as a sample of stage name."""
+    STAGES[name].add(utime.ticks_diff(utime.ticks_us(), t0), nbytes)
+
+def add(name, us, nbytes=0):
+    STAGES[name].add(us, nbytes)
+
+def retry(name):
+    STAGES[name].retries += 1
+
+def new_record():
+    """A record for read(); make one and reuse it."""
+    return array("i", [0] * len(FIELDS))
+
+def read(name, out):
+    """Fill out with stage name's statistics without allocating."""
+    return STAGES[name].read(out)
+
+def report():
+    """Print every stage that has samples (allocates; for the serial console)."""
+    rec = new_record()
+    print("[METRICS] stage       n    last     min     max    mean     p95     bytes retries (us)")
+    for name in STAGE_NAMES:
+        read(name, rec)
+        if rec[COUNT]:
+            print("[METRICS] %-8s %4d %7d %7d %7d %7d %7d %9d %3d" % ((name,) + tuple(rec)))
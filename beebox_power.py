@@ -0,0 +1,105 @@
+# ===== beebox_power.py =====
+# Screen power states. The manager owns the backlight PWM (lcd_display.pwm,
+# the only PWM on that pin) and decides when the render pipeline may run.
+#
+#   ON  -> DIM  after the screen timeout with no button activity
+#   DIM -> OFF  OFF_AFTER_DIM_SEC later; the panel is put to sleep
+#   any -> ON   on button activity
+#
+# While OFF nothing is composed or flushed. The panel RAM keeps the last
+# frame through sleep, so waking is a backlight change and a sleep-out with
+# no redraw unless the data changed meanwhile.
+import utime
+import lcd_display
+
+ON = "ON"
+DIM = "DIM"
+OFF = "OFF"
+
+DIM_LEVEL = 20               # % backlight while dimmed
+OFF_AFTER_DIM_SEC = 30 * 60
+
+def duty(percent):
+    return int(percent / 100 * 65535)
+
+class PowerManager:
+    def __init__(self, pwm):
+        self.pwm = pwm
+        self.state = ON
+        self.brightness = 100
+        self.timeout_hours = 2
+        self.last_activity = utime.time()
+        # Per state: [ms spent in it, us of render CPU time, flash bytes read]
+        self.stats = {ON: [0, 0, 0], DIM: [0, 0, 0], OFF: [0, 0, 0]}
+        self._since = utime.ticks_ms()
+        self._flash = lcd_display.FLASH_STATS["bytes"]
+
+    @property
+    def rendering(self):
+        """False while the screen is off: skip composing and flushing."""
+        return self.state != OFF
+
+    def configure(self, brightness, timeout_hours):
+        if brightness != self.brightness:
+            self.brightness = brightness
+            if self.state == ON:
+                self.pwm.duty_u16(duty(brightness))
+        self.timeout_hours = timeout_hours
+
+    def set_brightness(self, percent):
+        """Apply a brightness straight away (e.g. while it is being adjusted)."""
+        self.brightness = percent
+        if self.state != OFF:
+            self.pwm.duty_u16(duty(percent))
+
+    def activity(self):
+        self.last_activity = utime.time()
+        if self.state != ON:
+            self._enter(ON)
+
+    def update(self):
+        """Step the state machine from the time since the last activity."""
+        if self.timeout_hours == 0:
+            if self.state != ON:
+                self._enter(ON)
+            return
+        elapsed = utime.time() - self.last_activity
+        dim_after = self.timeout_hours * 3600
+        if self.state == ON and elapsed > dim_after:
+            self._enter(DIM)
+        elif self.state == DIM and elapsed > dim_after + OFF_AFTER_DIM_SEC:
+            self._enter(OFF)
+
+    def charge(self, us):
+        """Book render CPU time (microseconds) to the current state."""
+        self.stats[self.state][1] += us
+
+    def _account(self):
+        now = utime.ticks_ms()
+        flash = lcd_display.FLASH_STATS["bytes"]
+        entry = self.stats[self.state]
+        entry[0] += utime.ticks_diff(now, self._since)
+        entry[2] += flash - self._flash
+        self._since = now
+        self._flash = flash
+
+    def _enter(self, state):
+        self._account()
+        print("[POWER]", self.state, "->", state, self.report())
+        if self.state == OFF:
+            lcd_display.lcd.wake()
+        if state == ON:
+            self.pwm.duty_u16(duty(self.brightness))
+        elif state == DIM:
+            self.pwm.duty_u16(duty(DIM_LEVEL))
+        else:
+            self.pwm.duty_u16(0)
+            lcd_display.lcd.sleep()
+        self.state = state
+
+    def report(self):
+        """{state: (s in state, render ms, flash bytes)} up to now."""
+        self._account()
+        return {s: (v[0] // 1000, v[1] // 1000, v[2]) for s, v in self.stats.items()}
+
+power = PowerManager(lcd_display.pwm)
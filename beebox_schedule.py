@@ -0,0 +1,73 @@
+# ===== beebox_schedule.py =====
+# When to fetch the dashboard next.
+#
+# The base period is the update_period setting, scaled by the screen power
+# state: data is wanted sooner while someone may be looking at it, and much
+# less often once the panel is off (a button press wakes it, and the wait is
+# recomputed against the shorter interval straight away).
+#
+# A failed fetch is retried after an exponential backoff with jitter, from
+# RETRY_FIRST up to RETRY_MAX seconds. Jitter is "equal": half the step
+# plus a random part of the other half, so devices that lost the same
+# access point do not all come back in step.
+#
+# The server may ask for less: Cache-Control: max-age is a floor on the
+# next fetch after a success, and Retry-After (delta-seconds) a floor on
+# the next attempt after a failure. Hints are capped at HINT_MAX.
+#
+# All times come from the clock passed in (utime.time by default), so host
+# scripts can drive the scheduler with a simulated one.
+import random
+import utime
+
+MIN_PERIOD = 60         # seconds; never fetch more often than this
+# Multiplier on update_period per beebox_power state
+SCREEN_FACTORS = {"ON": 0.5, "DIM": 1, "OFF": 4}
+RETRY_FIRST = 5         # seconds before the first retry
+RETRY_MAX = 30 * 60
+HINT_MAX = 6 * 3600     # ignore anything longer a server asks for
+
+def _random():
+    return random.getrandbits(16) / 65536
+
+class FetchScheduler:
+    def __init__(self, period=300, clock=utime.time, rand=_random):
+        """rand() returns a float in [0, 1)."""
+        self.clock = clock
+        self.rand = rand
+        self.period = MIN_PERIOD
+        self.configure(period)
+        self.failures = 0       # consecutive failed fetches
+        self.last = None        # clock() of the last success
+        self.not_before = 0     # floor from a hint or the backoff
+
+    def configure(self, period):
+        """Take a new update_period (seconds); applies to the current wait."""
+        self.period = max(MIN_PERIOD, period)
+
+    def interval(self, screen="ON"):
+        return max(MIN_PERIOD, int(self.period * SCREEN_FACTORS.get(screen, 1)))
+
+    def success(self, max_age=None):
+        now = self.clock()
+        self.failures = 0
+        self.last = now
+        self.not_before = now + min(max_age or 0, HINT_MAX)
+
+    def failure(self, retry_after=None):
+        """Note a failed fetch -> seconds until the retry."""
+        self.failures += 1
+        step = min(RETRY_MAX, RETRY_FIRST << min(self.failures - 1, 16))
+        wait = step // 2 + int(self.rand() * (step - step // 2))
+        if retry_after:
+            wait = max(wait, min(retry_after, HINT_MAX))
+        self.not_before = self.clock() + wait
+        return wait
+
+    def delay(self, screen="ON"):
+        """Seconds until the next fetch is due; 0 means fetch now."""
+        if self.last is None or self.failures:
+            due = self.not_before
+        else:
+            due = max(self.last + self.interval(screen), self.not_before)
+        return max(0, due - self.clock())
@@ -0,0 +1,136 @@
+# ===== beebox_sources.py =====
+# Several apiary dashboards on one display. config.json may list them:
+#
+#   "sources": [{"name": "Home", "url": "http://beedata.bee-box.co.uk/"},
+#               {"name": "Farm", "url": "http://farm.example.org/"}]
+#
+# (a bare URL string works too; unnamed sources are numbered). Without a
+# list the one DATA_URL is fetched as before and its hives are not tagged.
+#
+# Each source keeps its own FetchScheduler, page cache (beebox_fetch caches
+# per URL) and last good hives. A dead site backs off on its own while the
+# others keep their period, and its last hives stay on show. Once it has
+# gone STALE_AFTER of its intervals without a success it is listed by
+# stale(), and both runtimes badge its hives on screen.
+#
+# Sources that are due together are fetched concurrently over non-blocking
+# sockets (afetch_hive_changes under uasyncio), so a slow or unreachable
+# site costs the others nothing. The async runtime awaits afetch(); the
+# thread runtime calls fetch(), which runs a short event loop of its own on
+# core1 (one due source is simply fetched with the blocking client).
+#
+# The merged list is the sources' hives in config order. With more than one
+# source every hive carries a "source" tag and its id is prefixed with the
+# source name, so diffs and the frame cache (keyed on ids) never mix sites.
+import ujson
+import utime
+import wifi_utils
+import beebox_http
+from beebox_fetch import DATA_URL, fetch_hive_changes, afetch_hive_changes
+from beebox_schedule import FetchScheduler
+
+CONFIG_FILE = "config.json"
+STALE_AFTER = 3   # intervals without a success before a source is stale
+
+class Source:
+    def __init__(self, name, url, clock=utime.time):
+        self.name = name          # None: untagged (the single-source case)
+        self.url = url
+        self.schedule = FetchScheduler(clock=clock)
+        self.hives = []           # last good hives, kept while it fails
+        self.ok_at = None         # clock() of the last success
+
+    def label(self):
+        return self.name or self.url
+
+    def fresh(self, screen="ON"):
+        s = self.schedule
+        return (self.ok_at is not None and
+                s.clock() - self.ok_at <= STALE_AFTER * s.interval(screen))
+
+    def record(self, data, changes):
+        """Fold in one fetch result -> its changes, or None if nothing is new."""
+        max_age, retry_after = beebox_http.hints(self.url)
+        if data:
+            self.schedule.success(max_age)
+            self.ok_at = self.schedule.clock()
+            self.hives = data
+            return changes
+        wait = self.schedule.failure(retry_after)
+        print("[SOURCES] %s failed (%d in a row), retrying in %ds"
+              % (self.label(), self.schedule.failures, wait))
+        return None
+
+def load(path=CONFIG_FILE, clock=utime.time):
+    """The configured sources, or the single default dashboard."""
+    try:
+        with open(path) as f:
+            listed = ujson.load(f).get("sources")
+    except (OSError, ValueError):
+        listed = None
+    if not listed:
+        return [Source(None, DATA_URL, clock)]
+    sources = []
+    for i, entry in enumerate(listed):
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        name = entry.get("name") or (str(i + 1) if len(listed) > 1 else None)
+        sources.append(Source(name, entry["url"], clock))
+    return sources
+
+def due(sources, period, screen="ON"):
+    """Sources whose next fetch is due, with update_period applied."""
+    out = []
+    for source in sources:
+        source.schedule.configure(period)
+        if source.schedule.delay(screen) == 0:
+            out.append(source)
+    return out
+
+def stale(sources, screen="ON"):
+    """Names of the sources whose hives on show are out of date (a hive's
+    "source" tag, or None untagged)."""
+    return [source.name for source in sources
+            if source.hives and not source.fresh(screen)]
+
+def merged(sources):
+    hives = []
+    for source in sources:
+        hives.extend(source.hives)
+    return hives
+
+def _fold(fetched, results):
+    changed = []
+    removed = []
+    new = False
+    for source, (data, changes) in zip(fetched, results):
+        changes = source.record(data, changes)
+        if changes is not None:
+            new = True
+            changed.extend(changes[0])
+            removed.extend(changes[1])
+    return (changed, removed) if new else None
+
+async def afetch(fetched):
+    """Fetch the given sources concurrently -> merged changes (changed ids,
+    removed ids), or None if none of them has anything new."""
+    import uasyncio as asyncio
+    await wifi_utils.aensure_wifi()   # once, not once per source
+    results = await asyncio.gather(*[afetch_hive_changes(s.url, s.name) for s in fetched])
+    return _fold(fetched, results)
+
+def fetch(fetched):
+    """afetch() for the thread runtime."""
+    if len(fetched) == 1:
+        source = fetched[0]
+        return _fold(fetched, [fetch_hive_changes(source.url, source.name)])
+    import uasyncio as asyncio
+
+    async def run():
+        try:
+            return await afetch(fetched)
+        finally:
+            # Streams belong to this loop, and would idle out before the
+            # next round anyway
+            beebox_http.aclose_all()
+    return asyncio.run(run())
@@ -0,0 +1,58 @@
+# ===== host/bench_double_buffer.py =====
+# Compares single- and double-buffered show() with a fake SPI bus that takes
+# real time per byte (10 MHz by default), so flushes can overlap composition.
+#
+#   python host/bench_double_buffer.py [frames] [compose_ms]
+
+import sys
+import time
+
+import harness   # host/ and the device code on sys.path
+
+import machine
+import lcd_display
+
+machine.SPI.latency_per_byte = 8 / 10_000_000
+
+lcd = lcd_display.lcd
+WHITE = lcd_display.colour(255, 255, 255)
+
+
+def compose(n, compose_ms):
+    lcd.fill(0)
+    lcd.fill_rect(0, 0, 128, 14, lcd_display.colour(40, 40, 40))
+    lcd.text(f"Hive {n}", 40, 4, WHITE)
+    time.sleep(compose_ms / 1000)   # stands in for Python-side rendering
+
+
+def run(frames, compose_ms):
+    blocked = 0.0
+    start = time.perf_counter()
+    for n in range(frames):
+        compose(n, compose_ms)
+        t = time.perf_counter()
+        lcd.show()
+        blocked += time.perf_counter() - t
+    lcd.fence()
+    total = time.perf_counter() - start
+    return total * 1000 / frames, blocked * 1000 / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    compose_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"{frames} frames, {compose_ms} ms composition, SPI at 10 MHz")
+    print(f"{'mode':<16}{'ms/frame':>10}{'ms in show()':>14}")
+    per_frame, blocked = run(frames, compose_ms)
+    print(f"{'single':<16}{per_frame:>10.1f}{blocked:>14.1f}")
+
+    if not lcd.enable_double_buffer():
+        print("double buffer could not start")
+        return
+    per_frame, blocked = run(frames, compose_ms)
+    print(f"{'double':<16}{per_frame:>10.1f}{blocked:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
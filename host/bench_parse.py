@@ -0,0 +1,198 @@
+# ===== host/bench_parse.py =====
+# Parses synthetic dashboard pages with the whole-page parser the device
+# used to run (parse_html_by_hive, kept here as the baseline) and the
+# streaming HiveParser fed CHUNK_SIZE pieces, checks they agree, and reports
+# time and peak transient allocation for each. Time is the best of REPEAT
+# untraced runs; allocation is a separate traced run.
+# The streaming parser is also fed the page in random-sized pieces (down to a
+# single byte) to check that element boundaries falling between chunks parse
+# the same.
+#
+#   python host/bench_parse.py [hives ...]
+
+import random
+import sys
+import time
+import tracemalloc
+
+import harness   # host/ and the device code on sys.path
+
+import beebox_fetch
+
+REPEAT = 5
+
+TEMPS = (("temp-brood", "Brood"), ("temp-super", "Super"),
+         ("temp-roof", "Roof"), ("temp-outside", "Outside"))
+HUMIDS = (("humid-outside", "Outside"), ("humid-roof", "Roof"))
+
+
+def synthetic_page(hives, seed=1):
+    rnd = random.Random(seed)
+    out = ['<html><head><title>BeeBox</title></head><body>\n',
+           '<div class="container"><h1>Apiary dashboard</h1>\n']
+    for n in range(hives):
+        out.append('<div class="card mb-3"><div class="card-body">\n')
+        out.append(f'<h3>Beehive ID: {1000 + n}</h3>\n')
+        out.append('<ul class="list-group list-group-flush">\n')
+        for cls, label in TEMPS:
+            value = "None" if rnd.random() < 0.05 else f"{rnd.uniform(-5, 38):.1f}"
+            out.append(f'<li class="list-group-item {cls}">{label}: {value}°C</li>\n')
+        for cls, label in HUMIDS:
+            out.append(f'<li class="list-group-item {cls}">{label}: {rnd.randint(30, 95)}%</li>\n')
+        out.append(f'<li class="list-group-item weight">Weight: {rnd.uniform(10, 60):.1f} kg</li>\n')
+        out.append('</ul>\n')
+        out.append(f'<p class="small text-muted">Last reading: 2024-06-{n % 28 + 1:02d} 12:{n % 60:02d}</p>\n')
+        out.append('</div></div>\n')
+    out.append('</div></body></html>\n')
+    return "".join(out).encode()
+
+
+# ----- the whole-page parser beebox_fetch used before HiveParser -----
+# === Extract a value by class name from HTML chunk ===
+def extract_values_by_class(html, cls, unit):
+    values = []
+    start_tag = f'class="list-group-item {cls}"'
+    start_idx = 0
+    while True:
+        idx = html.find(start_tag, start_idx)
+        if idx == -1:
+            break
+        # Find the closing >
+        gt_idx = html.find(">", idx)
+        if gt_idx == -1:
+            break
+        # Find the closing </li>
+        end_idx = html.find("</li>", gt_idx)
+        if end_idx == -1:
+            break
+        li_text = html[gt_idx+1:end_idx].strip()
+        if ":" in li_text:
+            label, value = li_text.split(":")
+            values.append((label.strip(), value.replace(unit, "").strip()))
+        start_idx = end_idx + 5  # move past this </li>
+    return values
+
+
+# ================= Parse HTML by hive =================
+def parse_html_by_hive(html):
+    hives = []
+    hive_marker = '<h3>Beehive ID:'
+    
+    # Find all positions of hive headers
+    positions = []
+    pos = 0
+    while True:
+        idx = html.find(hive_marker, pos)
+        if idx == -1:
+            break
+        positions.append(idx)
+        pos = idx + len(hive_marker)
+    positions.append(len(html))  # add end of page for the last hive
+
+    # Extract each hive block
+    for i in range(len(positions)-1):
+        start = positions[i]
+        end = positions[i+1]
+        hive_html = html[start:end]
+
+        # Hive ID
+        hive_id = None
+        id_end = hive_html.find('</h3>')
+        if id_end != -1:
+            hive_id = hive_html[len(hive_marker):id_end].strip()
+
+        # Temperatures
+        temp_classes = ["temp-brood","temp-super","temp-roof","temp-outside"]
+        temperatures = {}
+        for cls in temp_classes:
+            vals = extract_values_by_class(hive_html, cls, "°C")
+            if vals:
+                temperatures[vals[0][0]] = vals[0][1]
+
+        # Humidities
+        hum_classes = ["humid-outside","humid-roof"]
+        humidities = {}
+        for cls in hum_classes:
+            vals = extract_values_by_class(hive_html, cls, "%")
+            if vals:
+                humidities[vals[0][0]] = vals[0][1]
+
+        # Weight
+        weight = None
+        for line in hive_html.splitlines():
+            if "Weight:" in line:
+                parts = line.split(":")
+                if len(parts) > 1:
+                    weight = parts[1].split("kg")[0].strip()
+                    break
+
+        hives.append({
+            "id": hive_id,
+            "temperature": temperatures,
+            "humidity": humidities,
+            "weight": weight
+        })
+
+    return hives
+
+
+def legacy(page):
+    # What the old fetch did: decode the whole body, then slice it up per hive
+    return parse_html_by_hive(str(page, "utf-8"))
+
+
+def streaming(page):
+    parser = beebox_fetch.HiveParser()
+    hives = []
+    for i in range(0, len(page), beebox_fetch.CHUNK_SIZE):
+        # bytes(...) stands in for the fresh chunk a socket read returns
+        hives.extend(parser.feed(bytes(page[i:i + beebox_fetch.CHUNK_SIZE])))
+    hives.extend(parser.close())
+    return hives
+
+
+def ragged(page, seed=1):
+    rnd = random.Random(seed)
+    parser = beebox_fetch.HiveParser()
+    hives = []
+    i = 0
+    while i < len(page):
+        n = rnd.choice((1, 2, 7, rnd.randint(1, 2 * beebox_fetch.CHUNK_SIZE)))
+        hives.extend(parser.feed(bytes(page[i:i + n])))
+        i += n
+    hives.extend(parser.close())
+    return hives
+
+
+def measure(fn, page):
+    best = None
+    for _ in range(REPEAT):
+        t = time.perf_counter()
+        fn(page)
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    tracemalloc.start()
+    result = fn(page)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Both return the same records; report the transient working memory
+    # on top of them
+    return result, best * 1000, peak - kept
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 100, 500]
+    print(f"{'hives':>6}{'page KB':>9}  {'parser':<10}{'ms':>9}{'work KB':>10}")
+    for n in sizes:
+        page = memoryview(synthetic_page(n))
+        expected, ms, peak = measure(legacy, page)
+        print(f"{n:>6}{len(page) / 1024:>9.1f}  {'legacy':<10}{ms:>9.1f}{peak / 1024:>10.1f}")
+        got, ms, peak = measure(streaming, page)
+        status = "" if got == expected else "  MISMATCH"
+        print(f"{'':>6}{'':>9}  {'streaming':<10}{ms:>9.1f}{peak / 1024:>10.1f}{status}")
+        if ragged(page, n) != expected:
+            print(f"{'':>6}{'':>9}  {'ragged':<10}  MISMATCH")
+
+
+if __name__ == "__main__":
+    main()
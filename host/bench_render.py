@@ -0,0 +1,163 @@
+# ===== host/bench_render.py =====
+# Renders every sensor screen through the real beebox_display_helpers and
+# Sensors_TextSummary code on the host fakes, and reports per screen mode:
+# time, file opens, bytes read, allocations and SPI bytes per frame.
+#
+#   python host/bench_render.py [frames]
+#
+# "first" is the first frame after switching to the mode (background and
+# glyph caches cold for that mode); "steady" averages the following frames,
+# alternating between two hives so every frame really redraws.
+#
+# Then counts frame composes over a few display cycles (prerender() and a
+# render_hive() per hive, as display_sensor_loop does) for small and large
+# apiaries. Composing each hive once per show is the uncached cost; no mode
+# should do worse than that when its frames overflow the screen cache.
+
+import builtins
+import os
+import sys
+import time
+import tracemalloc
+
+from harness import ROOT, check
+os.chdir(ROOT)   # asset paths are relative to the device root
+
+import machine
+import lcd_display
+import beebox_display_helpers
+
+MODES = ["sensor_temp", "sensor_humidity", "sensor_weight", "sensor_all"]
+
+HIVES = [
+    {
+        "id": "101",
+        "temperature": [("Brood", "34.5"), ("Super", "31.2"), ("Roof", "24.8"), ("Outside", "18.3")],
+        "humidity": [("Outside", "61"), ("Roof", "72")],
+        "weight": "42.7",
+    },
+    {
+        "id": "102",
+        "temperature": [("Brood", "35.1"), ("Super", "30.9"), ("Roof", "25.6"), ("Outside", "-2.4")],
+        "humidity": [("Outside", "88"), ("Roof", "69")],
+        "weight": "38.0",
+    },
+]
+
+
+# ----- file I/O accounting -----
+io_stats = {"opens": 0, "bytes_read": 0}
+_open = builtins.open
+
+
+class CountingFile:
+    def __init__(self, f):
+        self._f = f
+
+    def read(self, *args):
+        data = self._f.read(*args)
+        io_stats["bytes_read"] += len(data)
+        return data
+
+    def readinto(self, buf):
+        n = self._f.readinto(buf)
+        io_stats["bytes_read"] += n or 0
+        return n
+
+    def readline(self, *args):
+        data = self._f.readline(*args)
+        io_stats["bytes_read"] += len(data)
+        return data
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def counting_open(path, *args, **kwargs):
+    io_stats["opens"] += 1
+    return CountingFile(_open(path, *args, **kwargs))
+
+
+# ----- measurement -----
+def measure(mode, hive):
+    """One render_hive call -> (ms, opens, bytes read, peak alloc bytes, SPI bytes)."""
+    for k in io_stats:
+        io_stats[k] = 0
+    machine.reset_stats()
+    tracemalloc.start()
+    t = time.perf_counter()
+    beebox_display_helpers.render_hive(mode, hive, "C")
+    lcd_display.lcd.fence()
+    ms = (time.perf_counter() - t) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ms, io_stats["opens"], io_stats["bytes_read"], peak, machine.stats["spi_bytes"]
+
+
+def composes(mode, count, cycles=3):
+    """Frame composes over display cycles of count hives."""
+    hives = [dict(HIVES[i % 2], id=str(200 + i)) for i in range(count)]
+    beebox_display_helpers.clear_screen_cache()
+    compose = beebox_display_helpers._compose
+    n = 0
+
+    def counting(*args):
+        nonlocal n
+        n += 1
+        compose(*args)
+    beebox_display_helpers._compose = counting
+    try:
+        for _ in range(cycles):
+            beebox_display_helpers.prerender(mode, hives, "C")
+            for hive in hives:
+                beebox_display_helpers.render_hive(mode, hive, "C")
+    finally:
+        beebox_display_helpers._compose = compose
+    return n
+
+
+def row(label, results):
+    n = len(results)
+    avg = [sum(r[i] for r in results) / n for i in range(5)]
+    print(f"{label:<24}{avg[0]:>9.1f}{avg[1]:>7.1f}{avg[2]:>10.0f}{avg[3] / 1024:>10.1f}{avg[4]:>10.0f}")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    builtins.open = counting_open
+    try:
+        print(f"{'mode':<24}{'ms':>9}{'opens':>7}{'read B':>10}{'alloc KB':>10}{'SPI B':>10}")
+        for mode in MODES:
+            row(mode + " first", [measure(mode, HIVES[0])])
+            row(mode + " steady", [measure(mode, HIVES[(i + 1) % 2]) for i in range(frames)])
+    finally:
+        builtins.open = _open
+
+    print(f"\n{'composes over 3 cycles':<24}{'hives':>7}{'composes':>10}{'uncached':>10}")
+    worse = []
+    for mode in MODES:
+        for count in (3, 10):
+            n = composes(mode, count)
+            print(f"{mode:<24}{count:>7}{n:>10}{count * 3:>10}")
+            if n > count * 3:
+                worse.append(mode)
+    check("no mode composes more than once per show", not worse)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# ===== host/bench_spi.py =====
+# Counts SPI transactions, bytes and pin toggles per frame for the ST7735
+# driver in lcd_display, using the fake bus in host/machine.py.
+#
+#   python host/bench_spi.py
+
+import harness   # host/ and the device code on sys.path
+
+import machine
+import lcd_display
+
+lcd = lcd_display.lcd
+WHITE = lcd_display.colour(255, 255, 255)
+BLUE = lcd_display.colour(0, 100, 200)
+
+
+def legacy_show():
+    """The original show(): one CS/DC round trip per command or data byte."""
+    lcd.write_cmd(0x2A); lcd.write_data(0x00); lcd.write_data(0x01)
+    lcd.write_data(0x00); lcd.write_data(0x80)
+    lcd.write_cmd(0x2B); lcd.write_data(0x00); lcd.write_data(0x02)
+    lcd.write_data(0x00); lcd.write_data(0x82)
+    lcd.write_cmd(0x2C)
+    lcd.cs(1); lcd.dc(1); lcd.cs(0)
+    lcd.spi.write(lcd.buffer)
+    lcd.cs(1)
+
+
+def full_frame():
+    lcd.fill(0)
+    lcd.show()
+
+def brightness_value():
+    lcd.text("100%", 40, 60, WHITE)
+    lcd.show()
+
+def menu_step():
+    lcd.fill_rect(6, 26, 100, 14, 0)
+    lcd.text("Autoscroll", 8, 28, WHITE)
+    lcd.fill_rect(6, 44, 100, 14, BLUE)
+    lcd.text("Update Period", 8, 46, WHITE)
+    lcd.show()
+
+def idle():
+    lcd.show()
+
+def legacy_full_frame():
+    lcd.fill(0)
+    legacy_show()
+
+def legacy_init():
+    lcd.write_cmd(0x36); lcd.write_data(0x70)
+    lcd.write_cmd(0x3A); lcd.write_data(0x05)
+    lcd.write_cmd(0x11); lcd.write_cmd(0x29)
+
+def init():
+    lcd.send_cmds(lcd._init_seq)
+
+
+CASES = [
+    ("init (legacy)", legacy_init),
+    ("init", init),
+    ("full frame (legacy)", legacy_full_frame),
+    ("full frame", full_frame),
+    ("brightness value", brightness_value),
+    ("menu highlight step", menu_step),
+    ("idle show", idle),
+]
+
+
+def main():
+    lcd.show()
+    print(f"{'case':<22}{'spi writes':>12}{'spi bytes':>12}{'pin writes':>12}")
+    for name, fn in CASES:
+        machine.reset_stats()
+        fn()
+        st = machine.stats
+        print(f"{name:<22}{st['spi_writes']:>12}{st['spi_bytes']:>12}{st['pin_writes']:>12}")
+
+
+if __name__ == "__main__":
+    main()
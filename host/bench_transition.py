@@ -0,0 +1,150 @@
+# ===== host/bench_transition.py =====
+# Compares hive transitions on the fake bus: a plain cut, a naive slide that
+# composes and flushes a full frame per step, and lcd.slide_in(), which
+# streams the new frame into hidden GRAM lines and moves the hardware scroll
+# pointer. A small ST7735 RAM model decodes the SPI stream so every approach
+# is checked against what the panel would actually show.
+#
+#   python host/bench_transition.py [step]
+
+import sys
+import time
+
+import harness   # host/ and the device code on sys.path
+
+import machine
+import lcd_display
+
+machine.SPI.latency_per_byte = 8 / 10_000_000
+
+lcd = lcd_display.lcd
+W, H = lcd.width, lcd.height
+ROW = W * 2
+
+
+class PanelModel:
+    """GRAM as [line][row] RGB565 pairs, fed from the driver's SPI writes."""
+    def __init__(self):
+        self.gram = [[b"\0\0"] * 132 for _ in range(lcd_display.GRAM_LINES)]
+        self.scroll = 0
+        self.cmd = None
+        self.args = bytearray()
+        self.window = (0, 0, 0, 0)
+        self.cursor = None
+        self.pending = b""
+        self.seconds = 0.0
+
+    def write(self, buf):
+        data = bytes(buf)
+        if lcd.dc.value() == 0:
+            self.cmd = data[0]
+            self.args = bytearray()
+            self.pending = b""
+            if self.cmd == lcd_display.RAMWR:
+                self.cursor = [self.window[0], self.window[2]]
+            return
+        if self.cmd == lcd_display.RAMWR:
+            self._pixels(self.pending + data)
+            return
+        self.args += data
+        a = self.args
+        if self.cmd == lcd_display.CASET and len(a) == 4:
+            self.window = ((a[0] << 8) | a[1], (a[2] << 8) | a[3]) + self.window[2:]
+        elif self.cmd == lcd_display.RASET and len(a) == 4:
+            self.window = self.window[:2] + ((a[0] << 8) | a[1], (a[2] << 8) | a[3])
+        elif self.cmd == lcd_display.VSCSAD and len(a) == 2:
+            self.scroll = (a[0] << 8) | a[1]
+
+    def _pixels(self, data):
+        xs, xe, ys, ye = self.window
+        n = len(data) // 2
+        for i in range(n):
+            x, y = self.cursor
+            self.gram[x % lcd_display.GRAM_LINES][y] = data[i * 2:i * 2 + 2]
+            x += 1
+            if x > xe:
+                x = xs
+                y += 1
+            self.cursor = [x, y]
+        self.pending = data[n * 2:]
+
+    def visible(self):
+        out = bytearray()
+        for y in range(H):
+            for x in range(W):
+                out += self.gram[(x + 1 + self.scroll) % lcd_display.GRAM_LINES][y + 2]
+        return bytes(out)
+
+
+def frame(shade):
+    lcd.fill(lcd_display.colour(shade, shade // 2, 0))
+    lcd.fill_rect(0, 0, W, 14, lcd_display.colour(40, 40, 40))
+    lcd.text(f"Hive {shade}", 36, 4, lcd_display.colour(255, 255, 255))
+    for x in range(0, W, 16):
+        lcd.vline(x, 14, H - 14, lcd_display.colour(255, 255, 255))
+    return bytes(lcd.buffer)
+
+
+def cut(old, new, step):
+    lcd.load_frame(new)
+    lcd.show()
+
+def naive_slide(old, new, step):
+    buf = lcd.buffer
+    for x in range(step, W + step, step):
+        x = min(x, W)
+        # old shifted left by x, new entering from the right
+        for y in range(H):
+            i = y * ROW
+            buf[i:i + (W - x) * 2] = old[i + x * 2:i + ROW]
+            buf[i + (W - x) * 2:i + ROW] = new[i:i + x * 2]
+        lcd.mark_all_dirty()
+        lcd.show()
+
+def hw_slide(old, new, step):
+    lcd.load_frame(new)
+    lcd.slide_in(step, 0)
+
+
+def run(name, fn, step, panel):
+    old = frame(200)
+    lcd.load_frame(old)
+    lcd.show()
+    new = frame(90)
+    machine.reset_stats()
+    panel.seconds = 0.0
+    t = time.perf_counter()
+    fn(old, new, step)
+    ms = (time.perf_counter() - t - panel.seconds) * 1000
+    ok = panel.visible() == new
+    print(f"{name:<14}{machine.stats['spi_bytes']:>10}{machine.stats['spi_writes']:>8}"
+          f"{ms:>10.1f}  {'ok' if ok else 'MISMATCH'}")
+
+
+def main():
+    step = int(sys.argv[1]) if len(sys.argv) > 1 else lcd_display.SLIDE_STEP
+    panel = PanelModel()
+    spi_write = lcd.spi.write
+
+    def tap(buf):
+        t = time.perf_counter()
+        panel.write(buf)
+        panel.seconds += time.perf_counter() - t   # not charged to the transition
+        spi_write(buf)
+
+    lcd.spi.write = tap
+    lcd.init_display()
+    print(f"{-(-W // step)} steps of {step} columns, SPI at 10 MHz")
+    print(f"{'transition':<14}{'SPI B':>10}{'writes':>8}{'ms':>10}")
+    run("cut", cut, step, panel)
+    run("naive slide", naive_slide, step, panel)
+    run("scroll slide", hw_slide, step, panel)
+    run("scroll slide", hw_slide, step, panel)   # from a non-zero pointer
+    # Partial redraws after a slide must land on the scrolled lines
+    lcd.fill_rect(100, 100, 20, 20, lcd_display.colour(0, 255, 0))
+    lcd.show()
+    print(f"{'partial after':<14}{'':>28}  {'ok' if panel.visible() == bytes(lcd.buffer) else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
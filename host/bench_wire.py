@@ -0,0 +1,60 @@
+# ===== host/bench_wire.py =====
+# Bytes on the wire for a dashboard page fetch and a full OTA download, with
+# the stand-in server sending identity, gzip and deflate bodies (and gzip
+# chunked). Checks the decoded results match, and estimates transfer time
+# over a weak apiary link of LINK_KBPS.
+#
+#   python host/bench_wire.py [hives]
+
+import os
+import sys
+import tempfile
+
+import harness   # host/ and the device code on sys.path
+
+import beebox_http
+import beebox_fetch
+from bench_parse import parse_html_by_hive, synthetic_page
+from check_keepalive import documents, ota_cycle
+from http_server import StandInServer
+
+LINK_KBPS = 20   # KB/s
+
+CASES = (("identity", {}), ("gzip", {"compress": "gzip"}),
+         ("deflate", {"compress": "deflate"}), ("gzip chunked", {"compress": "gzip", "chunked": True}))
+
+
+def counted(fn):
+    for k in ("wire_bytes", "body_bytes"):
+        beebox_http.STATS[k] = 0
+    result = fn()
+    return result, beebox_http.STATS["wire_bytes"], beebox_http.STATS["body_bytes"]
+
+
+def row(label, case, wire, body, ok):
+    print(f"{label:<6}{case:<14}{wire:>10}{body:>10}{wire / body:>8.2f}"
+          f"{wire / 1024 / LINK_KBPS:>13.1f}  {'ok' if ok else 'MISMATCH'}")
+
+
+def main():
+    hives = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    os.chdir(tempfile.mkdtemp())
+    page = synthetic_page(hives)
+    expected = parse_html_by_hive(page.decode())
+    docs = documents()
+    docs["/"] = page
+    print(f"{'fetch':<6}{'encoding':<14}{'wire B':>10}{'body B':>10}{'ratio':>8}{'s @ %d KB/s' % LINK_KBPS:>13}")
+    for case, options in CASES:
+        server = StandInServer(docs, validators=False, **options).start()
+        try:
+            beebox_fetch._cache.clear()
+            got, wire, body = counted(lambda: beebox_fetch.get_hive_data(server.url("/")))
+            row("page", case, wire, body, got == [beebox_fetch.format_hive(h) for h in expected])
+            (ok, _), wire, body = counted(lambda: ota_cycle(server))
+            row("ota", case, wire, body, ok)
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
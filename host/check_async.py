@@ -0,0 +1,211 @@
+# ===== host/check_async.py =====
+# Exercises the uasyncio runtime (beebox_async) on the host against
+# host/http_server.py serving the page over a throttled link, with the fake
+# LCD and pins:
+#
+#   - how long the scheduler goes without running the button task while a
+#     slow page downloads, next to how long the blocking fetch holds the
+#     caller for the same page
+#   - a fetch cancelled mid-body closes its connection instead of pooling it
+#   - the async OTA download stages and verifies the same tree as the
+#     blocking one, from a host that gzips it
+#   - the runtime starts the double-buffer flusher, draws the dashboard, and
+#     on BACK runs the menu and restarts the fetch and OTA tasks
+#
+#   python host/check_async.py
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from harness import check
+
+import uasyncio as asyncio
+import beebox_async
+import beebox_fetch
+import beebox_http
+import beebox_sources
+import lcd_display
+import machine
+import ota
+import wifi_utils
+from bench_parse import synthetic_page
+from check_keepalive import documents
+from http_server import StandInServer
+
+wifi_utils.WIFI_STATE["healthy"] = True   # skip the Wi-Fi bring-up
+
+THROTTLE = 0.01   # seconds per 1000 bytes of body
+
+
+async def longest_gap(work, poll_ms=beebox_async.BUTTON_POLL_MS):
+    """Run work() while a task polls like the button task; -> (result, worst
+    ms between polls)."""
+    worst = 0
+    done = False
+
+    async def poll():
+        nonlocal worst
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep_ms(poll_ms)
+            now = time.perf_counter()
+            worst = max(worst, (now - last) * 1000 - poll_ms)
+            last = now
+
+    poller = asyncio.create_task(poll())
+    try:
+        return await work(), worst
+    finally:
+        done = True
+        await poller
+
+
+def latency(server):
+    url = server.url("/")
+    beebox_fetch._cache.clear()
+    t = time.perf_counter()
+    blocking, _ = beebox_fetch.fetch_hive_changes(url)
+    blocked = (time.perf_counter() - t) * 1000
+    beebox_http.close_all()
+
+    beebox_fetch._cache.clear()
+
+    async def fetch():
+        try:
+            return await beebox_fetch.afetch_hive_changes(url)
+        finally:
+            beebox_http.aclose_all()   # its streams belong to this event loop
+
+    (hives, _), worst = asyncio.run(longest_gap(fetch))
+    print(f"  blocking fetch holds the caller {blocked:.0f} ms; "
+          f"async fetch delays button polls by at most {worst:.1f} ms")
+    check("async fetch parses the same hives", hives == blocking and len(hives) > 0)
+    check("button polls keep running during the download", worst < blocked / 10)
+
+
+def cancellation(server):
+    url = server.url("/")
+
+    async def run():
+        beebox_fetch._cache.clear()
+        task = asyncio.create_task(beebox_fetch.afetch_hive_changes(url))
+        await asyncio.sleep(0.1)   # headers are in, the body is still coming
+        check("fetch still running after 100 ms", not task.done())
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        check("cancelled fetch leaves nothing pooled",
+              not any(beebox_http._apool.values()))
+        hives, _ = await beebox_fetch.afetch_hive_changes(url)
+        beebox_http.aclose_all()
+        check("next fetch succeeds on a new connection", len(hives) > 0)
+
+    server.reset_stats()
+    asyncio.run(run())
+    check("two connections (the cancelled one was not reused)",
+          server.stats["connections"] == 2)
+
+
+def async_ota():
+    server = StandInServer(documents(), compress=True).start()
+    try:
+        with open("config.json", "w") as f:
+            json.dump({"github_repo_url": server.url("/"), "version": "1.0.0"}, f)
+        ota._json_cache.clear()
+        beebox_http._validators = {}
+
+        async def run():
+            try:
+                return await ota.adownload_and_verify_update()
+            finally:
+                beebox_http.aclose_all()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = asyncio.run(run())
+        staged = ota.load_config().get("pending_reboot")
+    finally:
+        server.stop()
+    check("async OTA verifies every gzipped file and stages the update", ok and staged)
+
+
+def press(pin, ms=60):
+    """Hold pin down for ms, as a finger would."""
+    pin.value(0)
+
+    async def release():
+        await asyncio.sleep_ms(ms)
+        pin.value(1)
+    return asyncio.create_task(release())
+
+
+def runtime(server):
+    url = server.url("/")
+    pins = {name: machine.Pin(n, machine.Pin.IN, machine.Pin.PULL_UP)
+            for n, name in enumerate(("up", "down", "select", "back"))}
+    menus = []
+    rt = beebox_async.Runtime(
+        pins,
+        settings=lambda: {"units": "C", "autoscroll": True, "transitions": False},
+        check_power=lambda: None,
+        menu=lambda: menus.append(time.perf_counter()),
+        reboot_check=lambda: None,
+        mode=lambda: "sensor_all",
+        sources=[beebox_sources.Source(None, url)])
+    beebox_fetch._cache.clear()
+
+    async def run():
+        seen = {}
+        main = asyncio.create_task(rt.main())
+        await asyncio.wait_for(rt.fetched.wait(), 10)
+        await asyncio.sleep(0.2)
+        seen["flusher"] = lcd_display.lcd._front is not None
+        seen["hives"] = len(rt.hives)
+        before = rt.tasks["fetch"]
+        await press(pins["back"])
+        await asyncio.sleep(0.2)
+        seen["menus"] = len(menus)
+        seen["restarted"] = (rt.tasks["fetch"] is not before and
+                             not rt.tasks["fetch"].done() and not rt.tasks["ota"].done())
+        main.cancel()
+        try:
+            await main
+        except asyncio.CancelledError:
+            pass
+        seen["tasks"] = len(rt.tasks)
+        return seen
+
+    with contextlib.redirect_stdout(io.StringIO()):   # the runtime's own logging
+        seen = asyncio.run(run())
+    check("double-buffer flusher started", seen["flusher"])
+    check("dashboard has the hives", seen["hives"] > 0)
+    check("BACK opened the menu once", seen["menus"] == 1)
+    check("network tasks restarted after the menu", seen["restarted"])
+    check("every task cancelled on the way out", seen["tasks"] == 0)
+    check("no connections left pooled", not any(beebox_http._apool.values()))
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    # An OTA host with nothing newer, so the OTA task has a quick look
+    with open("config.json", "w") as f:
+        json.dump({"github_repo_url": "http://127.0.0.1:9/", "version": "1.0.0"}, f)
+    page = synthetic_page(100)
+    server = StandInServer({"/": page}, validators=False, throttle=THROTTLE).start()
+    print(f"page {len(page)} B at {1 / THROTTLE:.0f} KB/s")
+    try:
+        latency(server)
+        cancellation(server)
+        async_ota()
+        runtime(server)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
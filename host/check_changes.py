@@ -0,0 +1,69 @@
+# ===== host/check_changes.py =====
+# Exercises payload hashing and per-hive diffs against host/http_server.py
+# with a host that sends no validators (so every fetch is a 200): an
+# identical page publishes nothing, one changed reading yields one changed
+# hive, a vanished hive is reported as removed, and unchanged hives keep
+# the very same dicts throughout.
+#
+#   python host/check_changes.py
+
+import os
+import re
+import tempfile
+import time
+
+from harness import check
+
+import beebox_fetch
+import wifi_utils
+from bench_parse import synthetic_page
+from http_server import StandInServer
+
+wifi_utils.WIFI_STATE["healthy"] = True   # skip the Wi-Fi bring-up
+
+
+def timed(url):
+    t = time.perf_counter()
+    result = beebox_fetch.fetch_hive_changes(url)
+    return result, (time.perf_counter() - t) * 1000
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    page = synthetic_page(50)
+    server = StandInServer({"/": page}, validators=False).start()
+    url = server.url("/")
+    try:
+        (first, changes), ms = timed(url)
+        check("first fetch: every hive is new", len(first) == 50 and len(changes[0]) == 50)
+        print(f"     first fetch {ms:.1f} ms")
+
+        (again, changes), ms = timed(url)
+        check("identical payload: nothing published, same list", changes is None and again is first)
+        print(f"     unchanged fetch {ms:.1f} ms")
+
+        # One reading of hive 1007 changes
+        edited = re.sub(rb"(Beehive ID: 1007</h3>.*?Weight: )[0-9.]+", rb"\g<1>99.9", page,
+                        count=1, flags=re.S)
+        server.put("/", edited)
+        (hives, changes), _ = timed(url)
+        check("one reading changed: one hive in the diff", changes == (["1007"], []))
+        check("unchanged hives keep their dicts",
+              all(a is b for a, b in zip(first, hives) if a["id"] != "1007"))
+
+        # Same readings, different bytes (e.g. a timestamp): no publish
+        server.put("/", edited.replace(b"Apiary dashboard", b"Apiary dashboard "))
+        (same, changes), _ = timed(url)
+        check("new bytes, same readings: nothing published", changes is None and same is hives)
+
+        # Hive 1049 drops off the page
+        cut = edited[:edited.index(b'<div class="card mb-3"><div class="card-body">\n<h3>Beehive ID: 1049')]
+        server.put("/", cut + b"</div></body></html>\n")
+        (fewer, changes), _ = timed(url)
+        check("vanished hive is reported removed", changes == ([], ["1049"]) and len(fewer) == 49)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
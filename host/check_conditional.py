@@ -0,0 +1,74 @@
+# ===== host/check_conditional.py =====
+# Exercises conditional GET end to end against host/http_server.py: the
+# hive page and the OTA manifests are fetched, fetched again (304, cached
+# result reused), changed on the server (200, re-parsed), and fetched from a
+# host that sends no validators (always 200).
+#
+#   python host/check_conditional.py
+
+import os
+import tempfile
+
+from harness import check
+
+import beebox_http
+import beebox_fetch
+import ota
+import wifi_utils
+from bench_parse import synthetic_page
+from http_server import StandInServer
+
+wifi_utils.WIFI_STATE["healthy"] = True   # skip the Wi-Fi bring-up
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    page = synthetic_page(50)
+    server = StandInServer({
+        "/": page,
+        "/config.json": b'{"version": "1.0.4"}',
+        "/file_list.json": b'{"version": "1.0.4", "files": []}',
+    }).start()
+    try:
+        first = beebox_fetch.get_hive_data(server.url("/"))
+        check("first fetch parses 50 hives", len(first) == 50 and server.stats["200"] == 1)
+
+        server.reset_stats()
+        again = beebox_fetch.get_hive_data(server.url("/"))
+        check("unchanged page answers 304", server.stats["304"] == 1 and server.stats["body_bytes"] == 0)
+        check("304 returns the cached result", again is first)
+
+        server.put("/", synthetic_page(51))
+        server.reset_stats()
+        changed = beebox_fetch.get_hive_data(server.url("/"))
+        check("changed page is downloaded and re-parsed", len(changed) == 51 and server.stats["200"] == 1)
+
+        # Without a parsed copy in RAM the request must not be conditional,
+        # and nothing is written to flash
+        beebox_fetch._cache.clear()
+        server.reset_stats()
+        beebox_fetch.get_hive_data(server.url("/"))
+        check("no cached result -> unconditional GET", server.stats["200"] == 1)
+        check("validators kept in RAM only",
+              server.url("/") in beebox_http._validators and not os.listdir("."))
+
+        for name in ("/config.json", "/file_list.json"):
+            doc = ota.fetch_json(server.url(name))
+            server.reset_stats()
+            check(f"{name} 304 reuses parsed JSON", ota.fetch_json(server.url(name)) is doc
+                  and server.stats["304"] == 1)
+    finally:
+        server.stop()
+
+    plain = StandInServer({"/": page}, validators=False).start()
+    try:
+        beebox_fetch.get_hive_data(plain.url("/"))
+        beebox_fetch.get_hive_data(plain.url("/"))
+        check("host without validators always sends 200", plain.stats["200"] == 2)
+    finally:
+        plain.stop()
+    print("requests:", beebox_http.STATS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# ===== host/check_keepalive.py =====
+# Runs a full OTA download (ota.download_and_verify_update) against
+# host/http_server.py, serving the files listed in file_list.json, and
+# compares one connection per request (what urequests did) with the pooled
+# keep-alive client. Every connection to raw.githubusercontent.com costs a
+# DNS lookup, a TCP handshake and a TLS handshake, so connections saved are
+# handshakes saved. Also checks chunked bodies, a host that refuses
+# keep-alive, and a pooled connection the server has dropped while idle.
+# Then applies a staged update and checks the device's own config keys
+# (RUNTIME_CONFIG_KEYS) survive it, and that a malformed response closes
+# its socket and a refused connect forgets the host's cached address.
+#
+#   python host/check_keepalive.py
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+from harness import ROOT, check
+
+import beebox_http
+import beebox_fetch
+import ota
+import wifi_utils
+from bench_parse import synthetic_page
+from http_server import StandInServer
+
+wifi_utils.WIFI_STATE["healthy"] = True   # skip the Wi-Fi bring-up
+
+
+def documents():
+    """The OTA host's tree: every file in the manifest, with fresh hashes."""
+    with open(os.path.join(ROOT, "file_list.json")) as f:
+        paths = [e["path"] for e in json.load(f)["files"]]
+    docs = {}
+    files = []
+    for path in paths:
+        with open(os.path.join(ROOT, path), "rb") as f:
+            body = f.read()
+        docs["/" + path] = body
+        files.append({"path": path, "sha256": hashlib.sha256(body).hexdigest()})
+    docs["/file_list.json"] = json.dumps({"version": "9.9.9", "files": files}).encode()
+    docs["/config.json"] = b'{"version": "9.9.9"}'
+    return docs
+
+
+def malformed(reply):
+    """Serve reply to one request -> (the client's exception, whether the
+    client closed its socket afterwards)."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    seen = {}
+
+    def serve():
+        conn, _ = listener.accept()
+        conn.settimeout(2)
+        conn.recv(4096)
+        conn.sendall(reply)
+        try:
+            seen["closed"] = conn.recv(1) == b""
+        except OSError:
+            seen["closed"] = False
+        conn.close()
+
+    server = threading.Thread(target=serve)
+    server.start()
+    try:
+        beebox_http.request("GET", "http://127.0.0.1:%d/" % listener.getsockname()[1])
+        error = None
+    except Exception as e:
+        error = e
+    server.join()
+    listener.close()
+    return error, seen.get("closed")
+
+
+def ota_cycle(server):
+    """One download into a fresh device tree -> (ok, ms)."""
+    shutil.rmtree("UPDATE", ignore_errors=True)
+    with open("config.json", "w") as f:
+        json.dump({"github_repo_url": server.url("/"), "version": "1.0.0"}, f)
+    ota._json_cache.clear()
+    beebox_http._validators = {}
+    server.reset_stats()
+    t = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = ota.download_and_verify_update()
+    ms = (time.perf_counter() - t) * 1000
+    beebox_http.close_all()
+    return ok, ms
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    docs = documents()
+    pool = beebox_http.POOL_PER_HOST
+
+    server = StandInServer(docs).start()
+    try:
+        print(f"{'client':<22}{'requests':>9}{'connects':>10}{'saved':>7}{'ms':>9}")
+        for label, size in (("connection per request", 0), ("keep-alive pool", pool)):
+            beebox_http.POOL_PER_HOST = size
+            ok, ms = ota_cycle(server)
+            st = server.stats
+            check(f"{label}: update downloaded and verified", ok)
+            print(f"{label:<22}{st['requests']:>9}{st['connections']:>10}"
+                  f"{st['requests'] - st['connections']:>7}{ms:>9.1f}")
+        check("keep-alive: one connection for the whole OTA run", server.stats["connections"] == 1)
+    finally:
+        server.stop()
+
+    cfg = ota.load_config()
+    cfg.update({"setup_complete": True, "sources": ["http://farm.example/"]})
+    ota.save_config(cfg)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ota.apply_update()
+    cfg = ota.load_config()
+    check("applied update keeps sources and setup_complete, takes the new version",
+          cfg.get("sources") == ["http://farm.example/"] and cfg.get("setup_complete")
+          and cfg.get("version") == "9.9.9" and not cfg.get("pending_reboot"))
+
+    chunked = StandInServer(docs, chunked=True).start()
+    try:
+        ok, _ = ota_cycle(chunked)
+        check("chunked bodies hash correctly over one connection",
+              ok and chunked.stats["connections"] == 1)
+    finally:
+        chunked.stop()
+
+    closing = StandInServer(docs, keep_alive=False).start()
+    try:
+        ok, _ = ota_cycle(closing)
+        check("Connection: close is honoured (no reuse)",
+              ok and closing.stats["connections"] == closing.stats["requests"])
+    finally:
+        closing.stop()
+
+    idle = StandInServer({"/": synthetic_page(5)}, idle_timeout=0.2).start()
+    try:
+        stale = beebox_http.STATS["stale"]
+        first = beebox_fetch.get_hive_data(idle.url("/"))
+        time.sleep(0.5)   # server drops the pooled connection meanwhile
+        beebox_fetch._cache.clear()
+        again = beebox_fetch.get_hive_data(idle.url("/"))
+        check("dropped idle connection is retried on a fresh one",
+              len(first) == 5 and again == first and beebox_http.STATS["stale"] == stale + 1)
+    finally:
+        idle.stop()
+
+    for label, reply in (("bad status line", b"HTTP/1.1 OK\r\n\r\n"),
+                         ("bad Content-Length", b"HTTP/1.1 200 OK\r\nContent-Length: x\r\n\r\n")):
+        error, closed = malformed(reply)
+        check(f"{label}: raises and closes the socket",
+              isinstance(error, (ValueError, IndexError)) and closed)
+
+    refused = StandInServer({}).start()
+    url = refused.url("/")
+    refused.stop()
+    beebox_http.close_all()
+    port = int(url.rstrip("/").rsplit(":", 1)[1])
+    beebox_http._addrs[("127.0.0.1", port)] = ("127.0.0.1", port)   # resolved earlier
+    try:
+        beebox_http.request("GET", url)
+    except OSError:
+        pass
+    check("a refused connect forgets the cached address", not beebox_http._addrs)
+    print("client:", beebox_http.STATS)
+
+
+if __name__ == "__main__":
+    main()
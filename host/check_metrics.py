@@ -0,0 +1,92 @@
+# ===== host/check_metrics.py =====
+# Runs fetch cycles against host/http_server.py (a cold one with Wi-Fi
+# bring-up, then warm ones over the pooled connection) and an OTA download,
+# prints the per-stage report, and checks the statistics read back through
+# beebox_metrics.read() are consistent, including after the rings wrap.
+# Also checks the async fetch records its body reads under "download", for
+# a plain and a gzipped page.
+#
+#   python host/check_metrics.py [cycles]
+
+import os
+import sys
+import tempfile
+
+from harness import check
+
+import uasyncio as asyncio
+import beebox_fetch
+import beebox_http
+import beebox_metrics as metrics
+import wifi_utils
+from bench_parse import synthetic_page
+from check_keepalive import documents, ota_cycle
+from http_server import StandInServer
+
+
+def async_download(page):
+    rec = metrics.new_record()
+    for compress in (False, True):
+        server = StandInServer({"/": page}, validators=False, compress=compress).start()
+        metrics.read("download", rec)
+        count, size = rec[metrics.COUNT], rec[metrics.BYTES]
+
+        async def fetch():
+            try:
+                return await beebox_fetch.afetch_hive_changes(server.url("/"))
+            finally:
+                beebox_http.aclose_all()
+        try:
+            beebox_fetch._cache.clear()
+            hives, _ = asyncio.run(fetch())
+        finally:
+            server.stop()
+        metrics.read("download", rec)
+        check(f"async fetch{' (gzip)' if compress else ''} times its reads into download",
+              len(hives) > 0 and rec[metrics.COUNT] == count + 1
+              and rec[metrics.BYTES] - size == len(page))
+
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    os.chdir(tempfile.mkdtemp())
+    docs = documents()
+    docs["/"] = synthetic_page(50)
+    server = StandInServer(docs, validators=False).start()
+    # Credentials are stubbed so ensure_wifi() runs the association and probe
+    wifi_utils.load_wifi_credentials = lambda: ("BeeBox-Test", "password")
+    wifi_utils.has_internet = lambda timeout=3: True
+    wifi_utils.WIFI_STATE["healthy"] = False
+    try:
+        for i in range(cycles):
+            beebox_fetch._cache.clear()   # parse every time
+            beebox_fetch.fetch_hive_changes(server.url("/"))
+        ota_cycle(server)
+    finally:
+        server.stop()
+    async_download(docs["/"])
+    metrics.report()
+
+    rec = metrics.new_record()
+    for name in ("fetch", "download", "parse", "request"):
+        metrics.read(name, rec)
+        check(f"{name}: min <= mean <= max, p95 <= max",
+              rec[metrics.COUNT] >= cycles and
+              rec[metrics.MIN] <= rec[metrics.MEAN] <= rec[metrics.MAX] and
+              rec[metrics.MIN] <= rec[metrics.P95] <= rec[metrics.MAX])
+    metrics.read("wifi", rec)
+    check("Wi-Fi association timed once (then latched)", rec[metrics.COUNT] == 1)
+    metrics.read("dns", rec)
+    check("one DNS lookup for the pooled host", rec[metrics.COUNT] <= 2)
+
+    stage = metrics.STAGES["diff"]
+    for us in range(1, 101):
+        stage.add(us)
+    metrics.read("diff", rec)
+    check("ring keeps the last SAMPLES: min/max/p95 over 69..100",
+          rec[metrics.MIN] == 101 - metrics.SAMPLES and rec[metrics.MAX] == 100
+          and rec[metrics.P95] == 99 and rec[metrics.LAST] == 100)
+
+
+if __name__ == "__main__":
+    main()
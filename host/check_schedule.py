@@ -0,0 +1,191 @@
+# ===== host/check_schedule.py =====
+# Drives beebox_schedule.FetchScheduler with a simulated clock: the period
+# follows update_period and the screen state, failures back off
+# exponentially with jitter up to RETRY_MAX, and max-age / Retry-After act
+# as floors. Then checks the hints are read off real responses from
+# host/http_server.py, and simulates a day with a two-hour outage to count
+# the requests made. Finally runs main.fetch_round (the background thread's
+# pass) against a dead dashboard: with the link up it only backs off, with
+# the link down it escalates to a reboot.
+#
+#   python host/check_schedule.py
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+from harness import check
+
+import beebox_fetch
+import beebox_http
+import beebox_sources
+import wifi_utils
+from beebox_schedule import FetchScheduler, MIN_PERIOD, RETRY_FIRST, RETRY_MAX, HINT_MAX
+from bench_parse import synthetic_page
+from http_server import StandInServer
+
+wifi_utils.WIFI_STATE["healthy"] = True   # skip the Wi-Fi bring-up
+
+
+class SimClock:
+    def __init__(self, now=1000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def scheduler(period=300, seed=1):
+    clock = SimClock()
+    return FetchScheduler(period, clock, random.Random(seed).random), clock
+
+
+def periods():
+    s, clock = scheduler(300)
+    check("first fetch is due straight away", s.delay() == 0)
+    s.success()
+    check("screen on: half of update_period", s.delay("ON") == 150)
+    check("screen dimmed: update_period", s.delay("DIM") == 300)
+    check("screen off: four times update_period", s.delay("OFF") == 1200)
+    clock.now += 400
+    check("waking the screen makes an overdue fetch due at once",
+          s.delay("OFF") == 800 and s.delay("ON") == 0)
+    s.configure(1200)
+    check("a new update_period applies to the current wait", s.delay("ON") == 200)
+    s.configure(10)
+    check("update_period is floored at MIN_PERIOD", s.interval("ON") == MIN_PERIOD)
+
+
+def backoff():
+    s, clock = scheduler(300)
+    waits = []
+    for n in range(12):
+        waits.append(s.failure())
+    steps = [min(RETRY_MAX, RETRY_FIRST << n) for n in range(12)]
+    print("  retry waits:", waits)
+    check("each wait is within [step/2, step] of a doubling step",
+          all(step // 2 <= w <= step for w, step in zip(waits, steps)))
+    check("waits stop growing at RETRY_MAX", max(waits) <= RETRY_MAX and waits[-1] >= RETRY_MAX // 2)
+    check("the wait is what delay() reports", s.delay("OFF") == waits[-1])
+    other, _ = scheduler(300, seed=2)
+    check("jitter: another device waits differently",
+          [other.failure() for _ in range(12)] != waits)
+    s.success()
+    check("a success resets the backoff", s.failures == 0 and s.delay("DIM") == 300)
+
+
+def hints():
+    s, clock = scheduler(300)
+    s.success(max_age=900)
+    check("max-age beyond the period defers the next fetch", s.delay("ON") == 900)
+    s.success(max_age=60)
+    check("a short max-age leaves the period in charge", s.delay("ON") == 150)
+    s.success(max_age=10 ** 6)
+    check("hints are capped at HINT_MAX", s.delay("ON") == HINT_MAX)
+    wait = s.failure(retry_after=600)
+    check("Retry-After is a floor on the retry", wait == 600 and s.delay() == 600)
+
+
+def server_hints():
+    page = synthetic_page(5)
+    server = StandInServer({"/": page}, cache_control="public, max-age=900").start()
+    url = server.url("/")
+    quiet = contextlib.redirect_stdout(io.StringIO())   # the fetch's own logging
+    try:
+        with quiet:
+            hives, _ = beebox_fetch.fetch_hive_changes(url)
+        check("max-age read from a 200", len(hives) == 5 and
+              beebox_http.hints(url) == (900, None))
+        with quiet:
+            beebox_fetch.fetch_hive_changes(url)
+        check("and from a 304", server.stats["304"] == 1 and
+              beebox_http.hints(url) == (900, None))
+        server.cache_control = None
+        server.retry_after = 120
+        with quiet:
+            hives, _ = beebox_fetch.fetch_hive_changes(url)
+    finally:
+        server.stop()
+    check("a 503 fails the fetch and yields its Retry-After",
+          hives == [] and beebox_http.hints(url) == (None, 120))
+    beebox_http.close_all()
+
+
+def day():
+    """24 simulated hours: screen on 08:00-18:00, off otherwise, and the
+    dashboard down 02:00-04:00."""
+    s, clock = scheduler(300)
+    start = clock.now
+    attempts = outage = 0
+    recovered = None
+    for t in range(0, 24 * 3600):
+        clock.now = start + t
+        screen = "ON" if 8 * 3600 <= t < 18 * 3600 else "OFF"
+        if s.delay(screen):
+            continue
+        attempts += 1
+        if 2 * 3600 <= t < 4 * 3600:
+            outage += 1
+            s.failure()
+        else:
+            if recovered is None and t >= 4 * 3600:
+                recovered = t - 4 * 3600
+            s.success()
+    print(f"  {attempts} fetches in a day, {outage} attempts during the outage, "
+          f"back {recovered} s after it ended")
+    check("about one fetch per 150 s screen-on, per 1200 s screen-off",
+          36000 // 150 <= attempts <= 36000 // 150 + 50400 // 1200 + outage + 2)
+    check("backoff keeps the outage to a handful of attempts", outage <= 16)
+    check("data is back within RETRY_MAX of the recovery", recovered <= RETRY_MAX)
+
+
+def updater():
+    import main
+    main.draw_error = lambda lcd, message: None   # flashes the badge for 2 s
+    main.SETTINGS_CACHE = {"update_period": 300}
+    wifi_utils.load_wifi_credentials = lambda: ("BeeBox-Test", "password")
+    dead = StandInServer({}).start()
+    url = dead.url("/")
+    dead.stop()   # connections are refused from here on
+
+    def outage(online, seconds):
+        """-> (rounds run, whether the device rebooted)"""
+        wifi_utils.has_internet = lambda timeout=3: online
+        wifi_utils.WIFI_STATE.update({"healthy": True, "failures": 0})
+        clock = SimClock()
+        source = beebox_sources.Source(None, url, clock)
+        rounds = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                for t in range(seconds):
+                    clock.now = 1000 + t
+                    if main.fetch_round([source]) is not None:
+                        rounds += 1
+            except SystemExit:   # host machine.reset()
+                return rounds, True
+        return rounds, False
+
+    rounds, rebooted = outage(True, 2 * 3600)
+    print(f"  dead site, link up: {rounds} attempts in 2 h")
+    check("a dead site with the link up never reboots the device", not rebooted)
+    check("and its attempts follow the backoff", rounds <= 16)
+    rounds, rebooted = outage(False, 2 * 3600)
+    print(f"  link down: rebooted after {rounds} attempts")
+    check("with the link down the failures escalate to a reboot",
+          rebooted and rounds <= wifi_utils.MAX_FAILURES_BEFORE_REBOOT)
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    periods()
+    backoff()
+    hints()
+    server_hints()
+    day()
+    updater()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# ===== host/check_sources.py =====
+# Runs beebox_sources against several stand-in dashboards from
+# host/http_server.py, each serving the same synthetic page (so the hive
+# ids collide) over a throttled link:
+#
+#   - config.json "sources" entries load with names, numbered or untagged
+#   - due sources are fetched concurrently: a round takes about as long as
+#     the slowest site, not the sum
+#   - hives are tagged and their ids prefixed by source, so none collide
+#   - a refused and a hung site fail on their own: the others' hives are
+#     merged as before, and only the dead sources back off and go stale;
+#     a live site's hives are listed stale (badged) once it stops answering
+#   - a changed reading on one site is reported under that site only
+#
+#   python host/check_sources.py
+
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import time
+
+from harness import check
+
+import beebox_fetch
+import beebox_http
+import beebox_sources
+import wifi_utils
+from bench_parse import synthetic_page
+from http_server import StandInServer
+
+wifi_utils.WIFI_STATE["healthy"] = True   # skip the Wi-Fi bring-up
+
+THROTTLE = 0.01   # seconds per 1000 bytes of body
+HIVES = 50
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):   # the fetch's own logging
+        result = fn(*args)
+    return result, (time.perf_counter() - t) * 1000
+
+
+def loading():
+    with open("config.json", "w") as f:
+        json.dump({"version": "1.0.0"}, f)
+    default = beebox_sources.load()
+    check("no list: the one default dashboard, untagged",
+          [(s.name, s.url) for s in default] == [(None, beebox_fetch.DATA_URL)])
+    with open("config.json", "w") as f:
+        json.dump({"sources": [{"name": "Home", "url": "http://a/"}, "http://b/"]}, f)
+    check("named and bare entries", [(s.name, s.url) for s in beebox_sources.load()] ==
+          [("Home", "http://a/"), ("2", "http://b/")])
+    with open("config.json", "w") as f:
+        json.dump({"sources": ["http://a/"]}, f)
+    check("a single listed source is untagged", beebox_sources.load()[0].name is None)
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    loading()
+
+    page = synthetic_page(HIVES)
+    home = StandInServer({"/": page}, validators=False, throttle=THROTTLE).start()
+    farm = StandInServer({"/": page}, validators=False, throttle=THROTTLE).start()
+    servers = (home, farm)
+    print(f"two sites, {len(page)} B page each at {1 / THROTTLE:.0f} KB/s")
+    try:
+        sources = [beebox_sources.Source("Home", home.url("/")),
+                   beebox_sources.Source("Farm", farm.url("/"))]
+        serial = 0
+        for s in sources:
+            _, ms = timed(beebox_fetch.fetch_hive_changes, s.url, s.name)
+            serial += ms
+        beebox_fetch._cache.clear()
+        beebox_http.close_all()
+
+        changes, ms = timed(beebox_sources.fetch, sources)
+        print(f"  one after the other {serial:.0f} ms, concurrently {ms:.0f} ms")
+        check("concurrent round takes well under the serial time", ms < serial * 0.75)
+        hives = beebox_sources.merged(sources)
+        ids = [h["id"] for h in hives]
+        check("every hive of both sites, in config order",
+              len(hives) == 2 * HIVES and ids[0].startswith("Home/") and ids[-1].startswith("Farm/"))
+        check("ids are unique across sites", len(set(ids)) == len(ids))
+        check("hives are tagged with their source",
+              all(h["source"] == h["id"].split("/")[0] for h in hives))
+        check("first round reports every hive as changed", len(changes[0]) == 2 * HIVES)
+
+        # A site that refuses connections and one that accepts and never answers
+        refused = StandInServer({}).start()
+        refused_url = refused.url("/")
+        refused.stop()
+        hung = socket.socket()
+        hung.bind(("127.0.0.1", 0))
+        hung.listen(4)
+        hung_url = "http://127.0.0.1:%d/" % hung.getsockname()[1]
+        sources += [beebox_sources.Source("Gone", refused_url),
+                    beebox_sources.Source("Hung", hung_url)]
+        timeout = beebox_http.TIMEOUT
+        beebox_http.TIMEOUT = 1
+        try:
+            changes, ms = timed(beebox_sources.fetch, sources)
+        finally:
+            beebox_http.TIMEOUT = timeout
+            hung.close()
+        print(f"  round with a refused and a hung site: {ms:.0f} ms (TIMEOUT 1 s)")
+        check("the hung site costs the round at most its timeout", ms < 1000 + serial)
+        check("the live sites' hives are all still merged",
+              len(beebox_sources.merged(sources)) == 2 * HIVES)
+        check("live sites: nothing new, no failures",
+              changes is None and not sources[0].schedule.failures and not sources[1].schedule.failures)
+        check("dead sites fail and back off on their own",
+              [s.schedule.failures for s in sources[2:]] == [1, 1] and
+              all(s.schedule.delay() > 0 for s in sources[2:]))
+        check("freshness per source", [s.fresh() for s in sources] == [True, True, False, False])
+        check("no hives on show are stale", beebox_sources.stale(sources) == [])
+        sources[1].ok_at -= beebox_sources.STALE_AFTER * sources[1].schedule.interval() + 1
+        check("a site silent for STALE_AFTER intervals has its hives badged",
+              beebox_sources.stale(sources) == ["Farm"] and
+              beebox_sources.stale(sources, "OFF") == [])
+
+        farm.put("/", page.replace(b"Weight: ", b"Weight: 1", 1))
+        for s in sources[:2]:
+            s.schedule.last -= 3600   # due again
+        changes, _ = timed(beebox_sources.fetch, beebox_sources.due(sources[:2], 300))
+        check("a change on one site is reported under that site only",
+              changes is not None and changes[0] == ["Farm/1000"] and not changes[1])
+    finally:
+        for server in servers:
+            server.stop()
+        beebox_http.close_all()
+
+
+if __name__ == "__main__":
+    main()
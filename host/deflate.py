@@ -0,0 +1,52 @@
+# ===== host/deflate.py =====
+# Host stand-in for MicroPython's deflate module (decompression side):
+# DeflateIO reads compressed data from a stream and returns it inflated.
+
+import zlib
+
+AUTO = 0
+RAW = 1
+ZLIB = 2
+GZIP = 3
+
+_WBITS = {AUTO: 47, RAW: -15, ZLIB: 15, GZIP: 31}   # 47: zlib or gzip header
+
+
+class DeflateIO:
+    def __init__(self, stream, format=AUTO, wbits=0, close=False):
+        self._stream = stream
+        self._d = zlib.decompressobj(_WBITS[format])
+        self._buf = bytearray(256)
+        self._out = b""
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            out = self._out
+            self._out = b""
+            while not self._d.eof:
+                data = self._fill()
+                if data is None:
+                    break
+                out += data
+            return out
+        while not self._out and not self._d.eof:
+            data = self._fill()
+            if data is None:
+                break
+            self._out = data
+        out, self._out = self._out[:n], self._out[n:]
+        return out
+
+    def _fill(self):
+        k = self._stream.readinto(self._buf)
+        if not k:
+            return None
+        return self._d.decompress(bytes(self._buf[:k]))
+
+    def readinto(self, buf):
+        data = self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        pass
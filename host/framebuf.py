@@ -0,0 +1,141 @@
+# ===== host/framebuf.py =====
+# Pure-Python stand-in for MicroPython's framebuf: RGB565 plus the GS4_HMSB
+# and GS8 index formats used by palette sprites. RGB565 pixels are stored
+# little-endian, as on the device. Text uses the device's 8x8 cell, but each
+# glyph is a fixed 5x7 pattern derived from the character code rather than
+# the real font, which is enough for timing and dirty-area measurements.
+
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, fmt, stride=None):
+        if fmt not in (RGB565, GS4_HMSB, GS8):
+            raise ValueError("host framebuf supports RGB565, GS4_HMSB and GS8 only")
+        self._buf = memoryview(buf).cast("B")
+        self._w = width
+        self._h = height
+        self._fmt = fmt
+        self._stride = width if stride is None else stride
+
+    # ----- pixel access -----
+    def _get(self, x, y):
+        i = y * self._stride + x
+        if self._fmt == GS8:
+            return self._buf[i]
+        if self._fmt == GS4_HMSB:
+            b = self._buf[i >> 1]
+            return b & 0x0F if i & 1 else b >> 4
+        return self._buf[i * 2] | (self._buf[i * 2 + 1] << 8)
+
+    def _set(self, x, y, c):
+        i = y * self._stride + x
+        if self._fmt == GS8:
+            self._buf[i] = c & 0xFF
+        elif self._fmt == GS4_HMSB:
+            b = self._buf[i >> 1]
+            if i & 1:
+                self._buf[i >> 1] = (b & 0xF0) | (c & 0x0F)
+            else:
+                self._buf[i >> 1] = (b & 0x0F) | ((c & 0x0F) << 4)
+        else:
+            self._buf[i * 2] = c & 0xFF
+            self._buf[i * 2 + 1] = (c >> 8) & 0xFF
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._w and 0 <= y < self._h):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    # ----- shapes -----
+    def fill(self, c):
+        self.fill_rect(0, 0, self._w, self._h, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(0, x); y0 = max(0, y)
+        x1 = min(self._w, x + w); y1 = min(self._h, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self._fmt != RGB565:
+            for yy in range(y0, y1):
+                for xx in range(x0, x1):
+                    self._set(xx, yy, c)
+            return
+        row = bytes((c & 0xFF, (c >> 8) & 0xFF)) * (x1 - x0)
+        for yy in range(y0, y1):
+            i = (yy * self._stride + x0) * 2
+            self._buf[i:i + len(row)] = row
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1); dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy; x1 += sx
+            if e2 <= dx:
+                err += dx; y1 += sy
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            code = ord(ch)
+            if code > 32:
+                bits = (code * 2654435761) & 0x7FFFFFFFF
+                for row in range(7):
+                    for col in range(5):
+                        if bits >> (row * 5 + col) & 1:
+                            self.pixel(x + col, y + row, c)
+            x += 8
+
+    # ----- composition -----
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for sy in range(fbuf._h):
+            ty = y + sy
+            if not 0 <= ty < self._h:
+                continue
+            for sx in range(fbuf._w):
+                tx = x + sx
+                if not 0 <= tx < self._w:
+                    continue
+                c = fbuf._get(sx, sy)
+                if c != key:
+                    if palette is not None:
+                        c = palette._get(c, 0)
+                    self._set(tx, ty, c)
+
+    def scroll(self, xstep, ystep):
+        src = FrameBuffer(bytearray(self._buf), self._w, self._h, self._fmt,
+                          self._stride)
+        for y in range(self._h):
+            for x in range(self._w):
+                sx = x - xstep; sy = y - ystep
+                if 0 <= sx < self._w and 0 <= sy < self._h:
+                    self._set(x, y, src._get(sx, sy))
@@ -0,0 +1,20 @@
+# ===== host/harness.py =====
+# Shared setup for the host scripts. Importing it puts host/ (the
+# MicroPython stand-ins) and the device code on sys.path, ahead of the
+# CPython modules of the same name; so import it before any device module:
+#
+#   from harness import check
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [HERE, ROOT]
+
+
+def check(label, ok):
+    """Print an ok / FAIL line; a failure ends the script with status 1."""
+    print(f"{'ok ' if ok else 'FAIL'} {label}")
+    if not ok:
+        sys.exit(1)
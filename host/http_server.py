@@ -0,0 +1,178 @@
+# ===== host/http_server.py =====
+# Local stand-in for the dashboard and OTA hosts. Serves in-memory documents
+# over HTTP/1.1 with ETag / Last-Modified and answers conditional requests
+# with 304, while counting connections and what it sends so host scripts can
+# check the device code's traffic.
+#
+# keep_alive=False answers every request with "Connection: close";
+# chunked=True sends bodies with chunked transfer coding; idle_timeout drops
+# a keep-alive connection that has been idle that many seconds.
+# compress=True gzips (or deflates) bodies for clients that accept it;
+# compress="deflate" prefers zlib-wrapped deflate. stats["body_bytes"] counts
+# body bytes as sent, i.e. after compression. throttle pauses that many
+# seconds between 1000-byte pieces of a body, to stand in for a slow link.
+# cache_control is sent as Cache-Control with every response; setting
+# retry_after answers every request 503 with that Retry-After instead.
+#
+#   server = StandInServer({"/": page_bytes, "/config.json": ...})
+#   server.start(); ... server.url("/") ...; server.stop()
+
+import gzip
+import hashlib
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInServer:
+    def __init__(self, documents=None, validators=True, keep_alive=True,
+                 chunked=False, idle_timeout=None, compress=False, throttle=None,
+                 cache_control=None, retry_after=None):
+        self.documents = {}
+        self.validators = validators   # False: a host that sends neither header
+        self.keep_alive = keep_alive
+        self.chunked = chunked
+        self.compress = compress
+        self.throttle = throttle
+        self.cache_control = cache_control
+        self.retry_after = retry_after
+        self._encoded = {}   # (path, version, coding) -> compressed body
+        self.idle_timeout = idle_timeout
+        self.stats = {"connections": 0, "requests": 0, "200": 0, "304": 0, "404": 0,
+                      "503": 0, "body_bytes": 0}
+        self._lock = threading.Lock()
+        for path, body in (documents or {}).items():
+            self.put(path, body)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    def put(self, path, body):
+        """Publish (or replace) a document; a change gets new validators."""
+        with self._lock:
+            version = self.documents.get(path, (None, None, None, 0))[3] + 1
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+            modified = formatdate(1700000000 + version * 60, usegmt=True)
+            self.documents[path] = (body, etag, modified, version)
+
+    def url(self, path="/"):
+        return "http://127.0.0.1:%d%s" % (self._httpd.server_address[1], path)
+
+    def reset_stats(self):
+        for k in self.stats:
+            self.stats[k] = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _coding(self, accept):
+        if not self.compress:
+            return None
+        offered = [c.split(";")[0].strip() for c in accept.split(",")]
+        order = ("deflate", "gzip") if self.compress == "deflate" else ("gzip", "deflate")
+        for coding in order:
+            if coding in offered:
+                return coding
+        return None
+
+    def _encode(self, path, version, coding, body):
+        key = (path, version, coding)
+        with self._lock:
+            if key not in self._encoded:
+                self._encoded[key] = (gzip.compress(body, mtime=0) if coding == "gzip"
+                                      else zlib.compress(body, 9))
+            return self._encoded[key]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # headers and body go out separately
+            timeout = server.idle_timeout
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.stats["connections"] += 1
+
+            def end_headers(self):
+                if server.cache_control:
+                    self.send_header("Cache-Control", server.cache_control)
+                if not server.keep_alive:
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                super().end_headers()
+
+            def do_GET(self):
+                with server._lock:
+                    server.stats["requests"] += 1
+                    doc = server.documents.get(self.path)
+                if server.retry_after is not None:
+                    server.stats["503"] += 1
+                    self.send_response(503)
+                    self.send_header("Retry-After", str(server.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if doc is None:
+                    server.stats["404"] += 1
+                    self.send_error(404)
+                    return
+                body, etag, modified, version = doc
+                if server.validators and (
+                        self.headers.get("If-None-Match") == etag or
+                        (self.headers.get("If-None-Match") is None and
+                         self.headers.get("If-Modified-Since") == modified)):
+                    server.stats["304"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                coding = server._coding(self.headers.get("Accept-Encoding") or "")
+                if coding:
+                    body = server._encode(self.path, version, coding, body)
+                server.stats["200"] += 1
+                server.stats["body_bytes"] += len(body)
+                self.send_response(200)
+                if coding:
+                    self.send_header("Content-Encoding", coding)
+                if not server.chunked:
+                    self.send_header("Content-Length", str(len(body)))
+                else:
+                    self.send_header("Transfer-Encoding", "chunked")
+                if server.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", modified)
+                self.end_headers()
+                if not server.chunked and not server.throttle:
+                    self.wfile.write(body)
+                    return
+                try:
+                    self._send_pieces(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True   # the client gave up mid-body
+
+            def _send_pieces(self, body):
+                for i in range(0, len(body), 1000):
+                    piece = body[i:i + 1000]
+                    if i and server.throttle:
+                        time.sleep(server.throttle)
+                    if server.chunked:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+                    else:
+                        self.wfile.write(piece)
+                if server.chunked:
+                    self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
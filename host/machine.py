@@ -0,0 +1,84 @@
+# ===== host/machine.py =====
+# Host stand-in for MicroPython's machine module. Pin and SPI record how
+# often the display driver touches the bus so it can be measured off-device.
+
+import time
+
+stats = {
+    "pin_writes": 0,    # Pin set calls (CS/DC/RST toggles)
+    "spi_writes": 0,    # SPI.write transactions
+    "spi_bytes": 0,     # payload bytes sent
+}
+
+def reset_stats():
+    for k in stats:
+        stats[k] = 0
+
+def unique_id():
+    return b"\xe6\x61\x38\x52\x83\x4f\x2a\x2b"
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, pin_id, mode=-1, pull=-1, value=None):
+        self.id = pin_id
+        self._value = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self._value = value
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        stats["pin_writes"] += 1
+        self._value = 1 if value else 0
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+
+class SPI:
+    # Seconds spent per byte written; set to 8 / baudrate to model the bus
+    latency_per_byte = 0.0
+
+    def __init__(self, spi_id, baudrate=1000000, polarity=0, phase=0, **kwargs):
+        self.id = spi_id
+        self.baudrate = baudrate
+
+    def write(self, buf):
+        stats["spi_writes"] += 1
+        stats["spi_bytes"] += len(buf)
+        if self.latency_per_byte:
+            time.sleep(len(buf) * self.latency_per_byte)
+
+
+class PWM:
+    def __init__(self, pin):
+        self.pin = pin
+        self._freq = 0
+        self._duty = 0
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+
+    def deinit(self):
+        pass
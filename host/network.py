@@ -0,0 +1,65 @@
+# ===== host/network.py =====
+# Host stand-in for MicroPython's network module. A WLAN connects instantly
+# to whatever SSID it is given; set WLAN.fail_connect to simulate outages.
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = -3
+STAT_NO_AP_FOUND = -2
+STAT_CONNECT_FAIL = -1
+STAT_GOT_IP = 3
+
+
+class WLAN:
+    fail_connect = False
+    networks = [(b"BeeBox-Test", b"\x00\x11\x22\x33\x44\x55", 6, -50, 3, False)]
+
+    _interfaces = {}   # like the device, every WLAN(STA_IF) is the same radio
+
+    def __init__(self, interface=STA_IF):
+        self.interface = interface
+        self._state = WLAN._interfaces.setdefault(interface, {
+            "active": False,
+            "status": STAT_IDLE,
+            "config": {"essid": "BeeBox" if interface == AP_IF else ""},
+        })
+
+    def active(self, value=None):
+        if value is None:
+            return self._state["active"]
+        self._state["active"] = bool(value)
+        if not value:
+            self._state["status"] = STAT_IDLE
+
+    def connect(self, ssid=None, key=None, **kwargs):
+        self._state["config"]["essid"] = ssid
+        self._state["status"] = STAT_CONNECT_FAIL if WLAN.fail_connect else STAT_GOT_IP
+
+    def disconnect(self):
+        self._state["status"] = STAT_IDLE
+
+    def isconnected(self):
+        return self._state["active"] and self._state["status"] == STAT_GOT_IP
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -50
+        return self._state["status"]
+
+    def scan(self):
+        return list(WLAN.networks)
+
+    def ifconfig(self, config=None):
+        if config is not None:
+            return
+        if self.interface == AP_IF:
+            return ("192.168.4.1", "255.255.255.0", "192.168.4.1", "192.168.4.1")
+        return ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+
+    def config(self, *args, **kwargs):
+        if args:
+            return self._state["config"].get(args[0])
+        self._state["config"].update(kwargs)
@@ -0,0 +1,14 @@
+# ===== host/uasyncio.py =====
+# Host stand-in for MicroPython's uasyncio on top of CPython's asyncio, plus
+# the millisecond helpers MicroPython adds.
+
+from asyncio import *   # noqa: F401,F403
+from asyncio import sleep, wait_for
+
+
+def sleep_ms(ms):
+    return sleep(ms / 1000)
+
+
+def wait_for_ms(aw, ms):
+    return wait_for(aw, ms / 1000)
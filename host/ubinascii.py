@@ -0,0 +1,3 @@
+# ===== host/ubinascii.py =====
+# Host stand-in for MicroPython's ubinascii.
+from binascii import *
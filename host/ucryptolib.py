@@ -0,0 +1,8 @@
+# ===== host/ucryptolib.py =====
+# Host stand-in for MicroPython's ucryptolib, so wifi_encryption imports.
+# The host scripts stub out load_wifi_credentials; nothing is decrypted.
+
+
+class aes:
+    def __init__(self, key, mode, iv=None):
+        raise NotImplementedError("no AES on the host")
@@ -0,0 +1,3 @@
+# ===== host/ujson.py =====
+# Host stand-in for MicroPython's ujson: the CPython json module.
+from json import *
@@ -0,0 +1,52 @@
+# ===== host/usocket.py =====
+# Host stand-in for MicroPython's usocket: a blocking TCP socket with the
+# stream methods the device code uses (read, readline, write), on top of a
+# CPython socket.
+
+import socket as _socket
+
+AF_INET = _socket.AF_INET
+SOCK_STREAM = _socket.SOCK_STREAM
+
+
+def getaddrinfo(host, port, af=0, type=0, proto=0, flags=0):
+    return _socket.getaddrinfo(host, port, af, type, proto, flags)
+
+
+class socket:
+    def __init__(self, af=AF_INET, type=SOCK_STREAM, proto=0, sock=None):
+        self._sock = sock or _socket.socket(af, type, proto)
+        self._file = None
+
+    def settimeout(self, seconds):
+        self._sock.settimeout(seconds)
+
+    def connect(self, addr):
+        self._sock.connect(addr)
+
+    def _stream(self):
+        if self._file is None:
+            self._file = self._sock.makefile("rwb")
+        return self._file
+
+    def read(self, n=-1):
+        f = self._stream()
+        return f.read() if n < 0 else f.read1(n)
+
+    def readline(self):
+        return self._stream().readline()
+
+    def write(self, data):
+        f = self._stream()
+        f.write(data)
+        f.flush()
+        return len(data)
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        self._sock.close()
@@ -0,0 +1,11 @@
+# ===== host/ussl.py =====
+# Host stand-in for MicroPython's ussl.wrap_socket over host/usocket.py.
+
+import ssl as _ssl
+
+import usocket
+
+
+def wrap_socket(sock, server_hostname=None, **kw):
+    ctx = _ssl.create_default_context()
+    return usocket.socket(sock=ctx.wrap_socket(sock._sock, server_hostname=server_hostname))
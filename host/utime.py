@@ -0,0 +1,33 @@
+# ===== host/utime.py =====
+# Host stand-in for MicroPython's utime, backed by the CPython clock.
+
+import time as _time
+
+_start = _time.monotonic_ns()
+
+def ticks_ms():
+    return (_time.monotonic_ns() - _start) // 1_000_000
+
+def ticks_us():
+    return (_time.monotonic_ns() - _start) // 1_000
+
+def ticks_add(ticks, delta):
+    return ticks + delta
+
+def ticks_diff(end, start):
+    return end - start
+
+def sleep(seconds):
+    _time.sleep(seconds)
+
+def sleep_ms(ms):
+    _time.sleep(ms / 1000)
+
+def sleep_us(us):
+    _time.sleep(us / 1_000_000)
+
+def time():
+    return int(_time.time())
+
+def localtime(secs=None):
+    return _time.localtime(secs)[:8]
@@ -1,5 +1,7 @@
 from machine import Pin, SPI, PWM
 import framebuf
+import _thread
+import utime
 
 # ========== LCD SETUP ==========
 BL = 13
@@ -13,6 +15,60 @@ def colour(R, G, B):
     return (((G & 0b00011100) << 3) + ((R & 0b11111000) >> 3) << 8) + \
            (B & 0b11111000) + ((G & 0b11100000) >> 5)
 
+# ========== ST7735 command streams ==========
+# A command sequence is encoded once into a flat buffer of
+#   cmd, n, data[0..n-1], cmd, n, ...
+# and sent with CS held low, toggling DC only between command and data bytes.
+MADCTL, COLMOD, SLPOUT, DISPON = 0x36, 0x3A, 0x11, 0x29
+SLPIN, DISPOFF = 0x10, 0x28
+CASET, RASET, RAMWR = 0x2A, 0x2B, 0x2C
+VSCRDEF, VSCSAD = 0x33, 0x37
+
+GRAM_LINES = 162   # panel RAM lines along the scroll axis; 128 are visible
+
+INIT_SEQUENCE = (
+    (MADCTL, b"\x70"),
+    (COLMOD, b"\x05"),
+    (VSCRDEF, b"\x00\x00\x00\xa2\x00\x00"),   # no fixed areas, all 162 lines scroll
+    (VSCSAD, b"\x00\x00"),
+    (SLPOUT, b""),
+    (DISPON, b""),
+)
+
+def encode_cmds(seq):
+    buf = bytearray()
+    for cmd, data in seq:
+        buf.append(cmd)
+        buf.append(len(data))
+        buf.extend(data)
+    return buf
+
+# ========== Dirty-rectangle refresh ==========
+FULL_REFRESH_RATIO = 60   # % of the screen dirty before show() sends everything
+STAGE_BYTES = 1024        # partial rows are packed into this before each SPI write
+MAX_DIRTY_RECTS = 6       # beyond this, collapse to one bounding box
+MERGE_SLACK = 256         # px of clean area a merge may drag in
+
+# ========== Scroll transitions ==========
+SLIDE_STEP = 16           # columns revealed per scroll step (<= 34 hidden lines)
+SLIDE_FRAME_MS = 15       # pause between steps
+
+class Sprite(framebuf.FrameBuffer):
+    """FrameBuffer that remembers its size, so blits can be dirty-tracked,
+    and for palette-indexed formats the palette to blit it through."""
+    def __init__(self, buf, width, height, fmt, palette=None):
+        super().__init__(buf, width, height, fmt)
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.nbytes = len(buf) + (palette.nbytes if palette is not None else 0)
+
+def blit_sprite(lcd, sprite, x, y):
+    if sprite.palette is None:
+        lcd.blit(sprite, x, y)
+    else:
+        lcd.blit(sprite, x, y, -1, sprite.palette)
+
 class lcd_1inch44(framebuf.FrameBuffer):
     def __init__(self):
         self.width = 128
@@ -24,34 +80,324 @@ class lcd_1inch44(framebuf.FrameBuffer):
         self.dc = Pin(DC, Pin.OUT)
         self.buffer = bytearray(self.height * self.width * 2)
         super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
+        self._dirty = []         # [x0, y0, x1, y1], end exclusive
+        self._full = True        # whole frame must be sent
+        self.content_key = None  # set by renderers after show(); any draw clears it
+        self._byte = bytearray(1)
+        self._stage = memoryview(bytearray(STAGE_BYTES))
+        self._front = None       # set by enable_double_buffer()
+        self._init_seq = encode_cmds(INIT_SEQUENCE)
+        # CASET/RASET arguments are patched in place by _begin_write()
+        self._window_seq = encode_cmds(((CASET, b"\0\0\0\0"), (RASET, b"\0\0\0\0"), (RAMWR, b"")))
+        self._scroll_seq = encode_cmds(((VSCSAD, b"\0\0"),))
+        self._scroll = 0         # GRAM line shown in column 0, minus the panel offset
         self.init_display()
 
     def write_cmd(self, cmd):
+        self._byte[0] = cmd
         self.cs(1); self.dc(0); self.cs(0)
-        self.spi.write(bytearray([cmd]))
+        self.spi.write(self._byte)
         self.cs(1)
 
     def write_data(self, buf):
+        self._byte[0] = buf
         self.cs(1); self.dc(1); self.cs(0)
-        self.spi.write(bytearray([buf]))
+        self.spi.write(self._byte)
+        self.cs(1)
+
+    def _stream_cmds(self, seq):
+        """Send an encoded sequence with CS already low; leaves DC high."""
+        mv = memoryview(seq)
+        i = 0
+        end = len(seq)
+        while i < end:
+            n = seq[i + 1]
+            self.dc(0)
+            self.spi.write(mv[i:i + 1])
+            self.dc(1)
+            if n:
+                self.spi.write(mv[i + 2:i + 2 + n])
+            i += 2 + n
+
+    def send_cmds(self, seq):
+        """Send a sequence built by encode_cmds() in one CS transaction."""
+        self.cs(1); self.cs(0)
+        self._stream_cmds(seq)
         self.cs(1)
 
     def init_display(self):
         self.rst(1); self.rst(0); self.rst(1)
-        self.write_cmd(0x36); self.write_data(0x70)
-        self.write_cmd(0x3A); self.write_data(0x05)
-        self.write_cmd(0x11); self.write_cmd(0x29)
+        self.send_cmds(self._init_seq)
+        self._scroll = 0
+
+    def _begin_write(self, xs, ys, xe, ye):
+        """Set the RAM window (panel coordinates, inclusive) and start RAMWR.
+
+        CS is left low with DC high: the caller streams pixels, then cs(1).
+        """
+        seq = self._window_seq
+        seq[2] = xs >> 8; seq[3] = xs & 0xFF; seq[4] = xe >> 8; seq[5] = xe & 0xFF
+        seq[8] = ys >> 8; seq[9] = ys & 0xFF; seq[10] = ye >> 8; seq[11] = ye & 0xFF
+        self.cs(1); self.cs(0)
+        self._stream_cmds(seq)
+
+    # ----- dirty tracking -----
+    def mark_dirty(self, x, y, w, h):
+        self.content_key = None
+        if self._full:
+            return
+        x0 = max(0, x); y0 = max(0, y)
+        x1 = min(self.width, x + w); y1 = min(self.height, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # Absorb any existing rect that overlaps or sits close by
+        rects = self._dirty
+        i = 0
+        while i < len(rects):
+            r = rects[i]
+            ux0 = min(x0, r[0]); uy0 = min(y0, r[1])
+            ux1 = max(x1, r[2]); uy1 = max(y1, r[3])
+            union = (ux1 - ux0) * (uy1 - uy0)
+            if union <= (x1 - x0) * (y1 - y0) + (r[2] - r[0]) * (r[3] - r[1]) + MERGE_SLACK:
+                x0, y0, x1, y1 = ux0, uy0, ux1, uy1
+                rects.pop(i)
+                i = 0
+            else:
+                i += 1
+        rects.append([x0, y0, x1, y1])
+
+        if len(rects) > MAX_DIRTY_RECTS:
+            self._dirty = [[min(r[0] for r in rects), min(r[1] for r in rects),
+                            max(r[2] for r in rects), max(r[3] for r in rects)]]
+
+    def mark_all_dirty(self):
+        self.content_key = None
+        self._full = True
+        self._dirty = []
+
+    def dirty_area(self):
+        if self._full:
+            return self.width * self.height
+        return sum((r[2] - r[0]) * (r[3] - r[1]) for r in self._dirty)
+
+    # ----- drawing (FrameBuffer overrides) -----
+    def fill(self, c):
+        super().fill(c)
+        self.mark_all_dirty()
+
+    def fill_rect(self, x, y, w, h, c):
+        super().fill_rect(x, y, w, h, c)
+        self.mark_dirty(x, y, w, h)
+
+    def rect(self, x, y, w, h, c, *args):
+        super().rect(x, y, w, h, c, *args)
+        self.mark_dirty(x, y, w, h)
+
+    def hline(self, x, y, w, c):
+        super().hline(x, y, w, c)
+        self.mark_dirty(x, y, w, 1)
 
+    def vline(self, x, y, h, c):
+        super().vline(x, y, h, c)
+        self.mark_dirty(x, y, 1, h)
+
+    def line(self, x1, y1, x2, y2, c):
+        super().line(x1, y1, x2, y2, c)
+        self.mark_dirty(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+
+    def pixel(self, x, y, *args):
+        if not args:
+            return super().pixel(x, y)
+        super().pixel(x, y, *args)
+        self.mark_dirty(x, y, 1, 1)
+
+    def text(self, s, x, y, *args):
+        super().text(s, x, y, *args)
+        self.mark_dirty(x, y, len(s) * 8, 8)
+
+    def blit(self, fbuf, x, y, *args):
+        super().blit(fbuf, x, y, *args)
+        w = getattr(fbuf, "width", None)
+        if w is None:
+            self.mark_all_dirty()   # plain FrameBuffer: size unknown
+        else:
+            self.mark_dirty(x, y, w, fbuf.height)
+
+    def scroll(self, xstep, ystep):
+        super().scroll(xstep, ystep)
+        self.mark_all_dirty()
+
+    def load_frame(self, src):
+        """Replace the whole framebuffer with a saved frame (one memcpy)."""
+        memoryview(self.buffer)[:] = src
+        self.mark_all_dirty()
+
+    def save_frame(self, dst):
+        memoryview(dst)[:] = self.buffer
+
+    # ----- flush -----
     def show(self):
-        self.write_cmd(0x2A); self.write_data(0x00); self.write_data(0x01)
-        self.write_data(0x00); self.write_data(0x80)
-        self.write_cmd(0x2B); self.write_data(0x00); self.write_data(0x02)
-        self.write_data(0x00); self.write_data(0x82)
-        self.write_cmd(0x2C)
-        self.cs(1); self.dc(1); self.cs(0)
-        self.spi.write(self.buffer)
+        if not self._full and not self._dirty:
+            return
+        full = self.dirty_area() * 100 > self.width * self.height * FULL_REFRESH_RATIO
+        if self._front is None:
+            self._flush(self.buffer, full, self._dirty)
+        else:
+            self._present(full)
+        self._full = False
+        self._dirty = []
+
+    def _flush(self, src, full, regions):
+        if full:
+            self._show_full(src)
+        else:
+            for r in regions:
+                self._show_region(src, r[0], r[1], r[2], r[3])
+
+    def _show_full(self, src):
+        if self._scroll:
+            self._show_region(src, 0, 0, self.width, self.height)
+            return
+        self._begin_write(0x01, 0x02, 0x80, 0x82)
+        self.spi.write(src)
         self.cs(1)
 
+    def _show_region(self, src, x0, y0, x1, y1):
+        # Panel RAM is offset by (1, 2) from the framebuffer origin. With
+        # MV=1 framebuffer columns are GRAM lines, so x also moves with the
+        # scroll pointer and a region may wrap past the last line.
+        line = (x0 + 1 + self._scroll) % GRAM_LINES
+        if line + (x1 - x0) > GRAM_LINES:
+            split = x0 + GRAM_LINES - line
+            self._show_region(src, x0, y0, split, y1)
+            self._show_region(src, split, y0, x1, y1)
+            return
+        self._begin_write(line, y0 + 2, line + x1 - x0 - 1, y1 + 1)
+        mv = memoryview(src)
+        stride = self.width * 2
+        if x0 == 0 and x1 == self.width:
+            self.spi.write(mv[y0 * stride:y1 * stride])
+        else:
+            # Pack as many partial rows as fit into the staging buffer
+            stage = self._stage
+            n = (x1 - x0) * 2
+            rows = len(stage) // n
+            y = y0
+            while y < y1:
+                o = 0
+                for yy in range(y, min(y + rows, y1)):
+                    i = yy * stride + x0 * 2
+                    stage[o:o + n] = mv[i:i + n]
+                    o += n
+                self.spi.write(stage[:o])
+                y += rows
+        self.cs(1)
+
+    # ----- panel power -----
+    def sleep(self):
+        """Blank and power down the panel. Its RAM keeps the last frame."""
+        self.fence()
+        self.write_cmd(DISPOFF)
+        self.write_cmd(SLPIN)
+
+    def wake(self):
+        self.write_cmd(SLPOUT)
+        utime.sleep_ms(120)   # SLPOUT needs 120 ms before further commands
+        self.write_cmd(DISPON)
+
+    # ----- scroll transitions -----
+    def _set_scroll(self, start):
+        seq = self._scroll_seq
+        seq[2] = start >> 8; seq[3] = start & 0xFF
+        self.send_cmds(seq)
+
+    def slide_in(self, step=SLIDE_STEP, frame_ms=SLIDE_FRAME_MS):
+        """Show the composed frame by sliding it in from the right.
+
+        Each strip of columns is written once into the hidden GRAM lines just
+        past the visible edge, then the scroll pointer is moved over it, so a
+        transition sends one frame of pixels plus a 2 byte command per step
+        instead of a full frame per step.
+        """
+        self.fence()
+        step = min(step, GRAM_LINES - self.width)
+        start = self._scroll
+        # From here on the frame is addressed where it will end up
+        self._scroll = (start + self.width) % GRAM_LINES
+        for x in range(0, self.width, step):
+            x1 = min(x + step, self.width)
+            self._show_region(self.buffer, x, 0, x1, self.height)
+            self._set_scroll((start + x1) % GRAM_LINES)
+            if frame_ms:
+                utime.sleep_ms(frame_ms)
+        if self._front is not None:
+            self._front[:] = self.buffer
+        self._full = False
+        self._dirty = []
+
+    # ----- double buffering -----
+    # Drawing always targets self.buffer (the back buffer). show() waits for
+    # the previous flush (the fence), copies the dirty regions into the front
+    # buffer and hands them to the flusher thread, so the caller can start
+    # composing the next frame while this one streams out over SPI.
+    def enable_double_buffer(self):
+        """Start the background flusher. Returns False if no thread is free
+        (on the Pico, core1 may already be running the fetch thread)."""
+        if self._front is not None:
+            return True
+        self._front = bytearray(self.buffer)
+        self._inflight = None
+        self._go = _thread.allocate_lock()
+        self._busy = _thread.allocate_lock()
+        self._go.acquire()
+        try:
+            _thread.start_new_thread(self._flush_loop, ())
+        except Exception as e:
+            print("Double buffer unavailable:", e)
+            self._front = None
+            return False
+        return True
+
+    @property
+    def double_buffered(self):
+        return self._front is not None
+
+    def fence(self):
+        """Block until the frame handed to the flusher has been sent."""
+        if self._front is not None:
+            self._busy.acquire()
+            self._busy.release()
+
+    def _present(self, full):
+        self._busy.acquire()   # previous frame has left the front buffer
+        front = memoryview(self._front)
+        if full:
+            front[:] = self.buffer
+            regions = None
+        else:
+            back = memoryview(self.buffer)
+            stride = self.width * 2
+            for r in self._dirty:
+                a = r[0] * 2
+                b = r[2] * 2
+                for y in range(r[1], r[3]):
+                    i = y * stride
+                    front[i + a:i + b] = back[i + a:i + b]
+            regions = self._dirty
+        self._inflight = (full, regions)
+        self._go.release()
+
+    def _flush_loop(self):
+        while True:
+            self._go.acquire()
+            full, regions = self._inflight
+            try:
+                self._flush(self._front, full, regions)
+            except Exception as e:
+                print("Flush failed:", e)
+            self._busy.release()
+
 # Initialize LCD
 pwm = PWM(Pin(BL))
 pwm.freq(1000)
@@ -59,11 +405,273 @@ pwm.duty_u16(65535)
 lcd = lcd_1inch44()
 
 
+# ========== Flash reads ==========
+# Every asset read goes through these so callers (e.g. the power manager)
+# can see how much flash traffic rendering causes.
+FLASH_STATS = {"opens": 0, "bytes": 0}
+
+def _open(path):
+    FLASH_STATS["opens"] += 1
+    return open(path, "rb")
+
+def _read(f, n):
+    data = f.read(n)
+    FLASH_STATS["bytes"] += len(data)
+    return data
+
+def _readinto(f, buf):
+    n = f.readinto(buf) or 0
+    FLASH_STATS["bytes"] += n
+    return n
+
+
+# ========== Asset invalidation ==========
+# Bumped whenever on-flash assets may have changed (OTA), so anything built
+# from them (glyphs, cached backgrounds) knows to rebuild.
+asset_generation = 0
+
+def invalidate_assets():
+    global asset_generation
+    close_bundle()
+    clear_glyph_cache()
+    asset_generation += 1
+
+
+# ========== Glyph cache ==========
+# Decoded digit sprites, keyed by (char, width, height). A value of None
+# records a glyph with no usable image (e.g. "."), so it is not retried.
+GLYPH_CACHE_BYTES = 8 * 1024   # 32 glyphs at 8x16 RGB565, ~45 palette-indexed
+
+_glyph_cache = {}
+_glyph_order = []   # oldest first, decoded entries only
+_glyph_bytes = 0
+
+def clear_glyph_cache():
+    global _glyph_bytes
+    _glyph_cache.clear()
+    _glyph_order.clear()
+    _glyph_bytes = 0
+
+def get_glyph(ch, width, height):
+    global _glyph_bytes
+    key = (ch, width, height)
+    if key in _glyph_cache:
+        return _glyph_cache[key]
+
+    img = load_image(f"Images/numbers/{ch}.rgb", width, height)
+    _glyph_cache[key] = img
+    if img is None:
+        return None
+
+    while _glyph_order and _glyph_bytes + img.nbytes > GLYPH_CACHE_BYTES:
+        old = _glyph_order.pop(0)
+        _glyph_bytes -= _glyph_cache.pop(old).nbytes
+    _glyph_order.append(key)
+    _glyph_bytes += img.nbytes
+    return img
+
+
+# ========== Asset bundle ==========
+# Images/assets.bin holds every packed sprite behind an index of
+# name -> (offset, size); see Create_FileList.py for the layout. One handle
+# stays open so a draw is a seek + readinto rather than a LittleFS lookup.
+BUNDLE_FILE = "Images/assets.bin"
+BUNDLE_MAGIC = b"BBX1"
+
+_bundle = None
+_bundle_index = None   # {} once a missing/corrupt bundle has been seen
+
+def open_bundle(path=BUNDLE_FILE):
+    global _bundle, _bundle_index
+    close_bundle()
+    _bundle_index = {}
+    try:
+        f = _open(path)
+    except OSError:
+        return False
+    try:
+        header = _read(f, 6)
+        if header[:4] != BUNDLE_MAGIC:
+            raise ValueError("bad bundle header")
+        index = {}
+        for _ in range((header[4] << 8) | header[5]):
+            name = _read(f, _read(f, 1)[0]).decode()
+            entry = _read(f, 8)
+            index[name] = (
+                (entry[0] << 24) | (entry[1] << 16) | (entry[2] << 8) | entry[3],
+                (entry[4] << 24) | (entry[5] << 16) | (entry[6] << 8) | entry[7],
+            )
+    except Exception as e:
+        print("Could not open asset bundle:", e)
+        f.close()
+        return False
+    _bundle = f
+    _bundle_index = index
+    return True
+
+def close_bundle():
+    """Release the bundle handle (e.g. before OTA replaces the file)."""
+    global _bundle, _bundle_index
+    if _bundle is not None:
+        _bundle.close()
+    _bundle = None
+    _bundle_index = None
+
+def asset_name(image_path):
+    """Images/numbers/0.rgb -> numbers/0"""
+    if image_path.startswith("Images/"):
+        image_path = image_path[7:]
+    dot = image_path.rfind(".")
+    return image_path[:dot] if dot > 0 else image_path
+
+# Bundled payloads start with a 6 byte header (magic, width, height as
+# big-endian u16). b"R5" is followed by pixels already in the byte order the
+# panel expects; palette-indexed b"P4" (GS4_HMSB) and b"P8" (GS8) add a
+# colour count and RGB565 palette after the header.
+# Large display-only sprites may instead be run-length coded (b"RL"): after
+# the header come packets of a count byte n then BE pixels, either one pixel
+# repeated (n & 0x7F) + 1 times (n & 0x80 set) or n + 1 literal pixels.
+PACKED_MAGIC = b"R5"
+PALETTE4_MAGIC = b"P4"
+PALETTE8_MAGIC = b"P8"
+RLE_MAGIC = b"RL"
+RLE = -1              # format code _read_sprite_header reports for b"RL"
+RLE_CHUNK = 1024      # file read size; must exceed twice the 257 B packet max
+RLE_PACKET_MAX = 257
+
+_scratch = bytearray(0)   # shared by display_sprite, grows to largest asset
+_pal_scratch = memoryview(bytearray(512))   # palette for display_sprite
+_chunk = bytearray(RLE_CHUNK)   # file reads for the streaming decoders
+
+def _decode_rle(f, buf, stride, x, y, width, height):
+    """Stream an RL payload from f into the RGB565 buffer buf (stride pixels
+    per row) at x, y, clipped to the buffer. Reads RLE_CHUNK bytes at a time,
+    so memory use does not depend on the image size."""
+    chunk = _chunk
+    view = memoryview(chunk)
+    dst = memoryview(buf)
+    rows = len(buf) // (stride * 2)
+    fb = framebuf.FrameBuffer(buf, stride, rows, framebuf.RGB565)
+    pos = end = RLE_CHUNK
+    eof = False
+    col = row = 0
+    while row < height:
+        if end - pos < RLE_PACKET_MAX and not eof:
+            tail = end - pos
+            view[:tail] = view[pos:end]   # pos > tail, so no overlap
+            n = _readinto(f, view[tail:])
+            eof = n < RLE_CHUNK - tail
+            pos, end = 0, tail + n
+        if pos >= end:
+            break   # truncated payload
+        n = chunk[pos]
+        pos += 1
+        count = (n & 0x7F) + 1
+        if n & 0x80:
+            c = chunk[pos] | (chunk[pos + 1] << 8)   # framebuf colours are byte-swapped
+            pos += 2
+            while count:
+                seg = min(count, width - col)
+                fb.hline(x + col, y + row, seg, c)
+                count -= seg
+                col += seg
+                if col == width:
+                    col = 0
+                    row += 1
+            continue
+        while count:
+            seg = min(count, width - col)
+            tx, ty = x + col, y + row
+            lo = max(0, -tx)
+            hi = min(seg, stride - tx)
+            if 0 <= ty < rows and lo < hi:
+                i = (ty * stride + tx + lo) * 2
+                dst[i:i + (hi - lo) * 2] = view[pos + lo * 2:pos + hi * 2]
+            pos += seg * 2
+            count -= seg
+            col += seg
+            if col == width:
+                col = 0
+                row += 1
+
+def _read_sprite_header(f):
+    """Returns (format, width, height, palette colours, pixel bytes)."""
+    header = _read(f, 6)
+    magic = header[:2]
+    width = (header[2] << 8) | header[3]
+    height = (header[4] << 8) | header[5]
+    if magic == PACKED_MAGIC:
+        return framebuf.RGB565, width, height, 0, width * height * 2
+    if magic == RLE_MAGIC:
+        return RLE, width, height, 0, width * height * 2
+    n = _read(f, 2)
+    colours = (n[0] << 8) | n[1]
+    if magic == PALETTE4_MAGIC:
+        return framebuf.GS4_HMSB, width, height, colours, width * height // 2
+    if magic == PALETTE8_MAGIC:
+        return framebuf.GS8, width, height, colours, width * height
+    raise ValueError("unknown sprite format")
+
+def _seek_sprite(name):
+    """Position the bundle at a sprite payload and return its header."""
+    if _bundle_index is None:
+        open_bundle()
+    entry = _bundle_index.get(name)
+    if entry is None:
+        return None
+    _bundle.seek(entry[0])
+    return _read_sprite_header(_bundle)
+
+def load_sprite(name):
+    """Read a bundled sprite into a new Sprite (None if not bundled)."""
+    header = _seek_sprite(name)
+    if header is None:
+        return None
+    fmt, width, height, colours, size = header
+    if fmt == RLE:
+        buf = bytearray(size)
+        _decode_rle(_bundle, buf, width, 0, 0, width, height)
+        return Sprite(buf, width, height, framebuf.RGB565)
+    palette = None
+    if colours:
+        pal = bytearray(colours * 2)
+        _readinto(_bundle, pal)
+        palette = Sprite(pal, colours, 1, framebuf.RGB565)
+    buf = bytearray(size)
+    _readinto(_bundle, buf)
+    return Sprite(buf, width, height, fmt, palette)
+
+def display_sprite(lcd, name, x=0, y=0):
+    """Blit a bundled sprite via the shared scratch buffers. Returns False if not bundled."""
+    global _scratch
+    header = _seek_sprite(name)
+    if header is None:
+        return False
+    fmt, width, height, colours, size = header
+    if fmt == RLE:
+        _decode_rle(_bundle, lcd.buffer, lcd.width, x, y, width, height)
+        lcd.mark_dirty(x, y, width, height)
+        return True
+    palette = None
+    if colours:
+        pal = _pal_scratch[:colours * 2]
+        _readinto(_bundle, pal)
+        palette = Sprite(pal, colours, 1, framebuf.RGB565)
+    if len(_scratch) < size:
+        _scratch = None
+        _scratch = bytearray(size)
+    view = memoryview(_scratch)[:size]
+    _readinto(_bundle, view)
+    blit_sprite(lcd, Sprite(view, width, height, fmt, palette), x, y)
+    return True
+
+
 # ========== Helper functions ==========
-def display_rgb_image(lcd, image_path, x=0, y=0, width=128, height=128):
+def load_rgb_image(image_path, width, height):
+    """Decode an RGB888 file into an RGB565 FrameBuffer, or None on failure."""
     try:
-        with open(image_path, "rb") as f:
-            data = f.read()
+        with _open(image_path) as f:
+            data = _read(f, -1)
         buf = bytearray(width * height * 2)
         for i in range(width * height):
             r = data[i * 3]
@@ -72,15 +680,60 @@ def display_rgb_image(lcd, image_path, x=0, y=0, width=128, height=128):
             rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
             buf[i * 2] = rgb565 >> 8
             buf[i * 2 + 1] = rgb565 & 0xFF
-        img = framebuf.FrameBuffer(buf, width, height, framebuf.RGB565)
-        lcd.blit(img, x, y)
+        return Sprite(buf, width, height, framebuf.RGB565)
+    except Exception as e:
+        print("Could not load image:", e)
+        return None
+
+def load_image(image_path, width, height):
+    """Prefer the bundle, then runtime conversion."""
+    img = load_sprite(asset_name(image_path))
+    if img is None:
+        img = load_rgb_image(image_path, width, height)
+    return img
+
+def display_rgb888(lcd, image_path, x=0, y=0, width=128, height=128):
+    """Convert an RGB888 file straight into the LCD buffer, whole rows per
+    RLE_CHUNK read, so nothing the size of the image is allocated."""
+    buf = lcd.buffer
+    stride = lcd.width
+    rows_per_read = max(1, RLE_CHUNK // (width * 3))
+    view = memoryview(_chunk)[:rows_per_read * width * 3]
+    try:
+        with _open(image_path) as f:
+            row = 0
+            while row < height:
+                n = _readinto(f, view) // (width * 3)
+                if not n:
+                    break
+                for r in range(min(n, height - row)):
+                    ty = y + row + r
+                    if not 0 <= ty < lcd.height:
+                        continue
+                    for c in range(width):
+                        tx = x + c
+                        if not 0 <= tx < stride:
+                            continue
+                        j = (r * width + c) * 3
+                        rgb565 = ((_chunk[j] & 0xF8) << 8) | ((_chunk[j + 1] & 0xFC) << 3) | (_chunk[j + 2] >> 3)
+                        i = (ty * stride + tx) * 2
+                        buf[i] = rgb565 >> 8
+                        buf[i + 1] = rgb565 & 0xFF
+                row += n
     except Exception as e:
         print("Could not load image:", e)
+        return
+    lcd.mark_dirty(x, y, width, height)
+
+def display_rgb_image(lcd, image_path, x=0, y=0, width=128, height=128):
+    if display_sprite(lcd, asset_name(image_path), x, y):
+        return
+    display_rgb888(lcd, image_path, x, y, width, height)
 
 def draw_number(lcd, number_str, x, y, digit_width=16, digit_height=16, spacing=0):
     cursor_x = x
     for ch in str(number_str):
-        img_file = f"Images/numbers/{ch}.rgb"
-        display_rgb_image(lcd, img_file, cursor_x, y, digit_width, digit_height)
+        glyph = get_glyph(ch, digit_width, digit_height)
+        if glyph is not None:
+            blit_sprite(lcd, glyph, cursor_x, y)
         cursor_x += digit_width + spacing
-
@@ -9,11 +9,10 @@ import lcd_display
 import settings_config
 import wifi_setup
 import wifi_utils
-from Sensors_TextSummary import display_on_lcd
-from beebox_fetch import get_hive_data
-from beebox_temp_display import display_temp_quadrants
-from beebox_humid_display import display_humidity_halves
-from beebox_weight_display import display_weight_single
+import beebox_metrics
+import beebox_sources
+from beebox_display_helpers import render_hive, prerender, drop_hives, draw_stale_badge
+from beebox_power import power
 from ota import path_exists, apply_update, safe_ota
 
 STATE_FILE = "config.json"
@@ -40,19 +39,17 @@ lcd = lcd_display.lcd
 data_lock = _thread.allocate_lock()
 current_data = []
 data_fresh = False
-
-# ===== Screen power =====
-last_activity = utime.time()
-screen_state = "ON"   # ON | DIM | OFF
+async_runtime = False   # set when beebox_async runs the show instead
+removed_hives = []   # ids gone from the page, for the display loop to evict
+stale_sources = []   # sources whose hives are out of date (beebox_sources.stale)
 
 # ==== Screen Globals ===
 CONTENT_X = 8
 CONTENT_W = 96   # leaves space for button hints
 
 # ===== Background fetch =====
-HIVE_FETCH_INTERVAL_SEC = 30 * 60  # 30 minutes
-SAFE_FETCH_RETRIES = 10
-SAFE_FETCH_DELAY = 5  # seconds between retries
+# Sources and their periods (the update_period setting): see beebox_sources
+FETCH_ERROR_AFTER = 3   # consecutive failures before the error screen
 
 # ==== OTA timing ====
 last_ota_check = 0
@@ -117,46 +114,18 @@ def draw_text_clipped(text, x, y, width, colour, scroll_offset=0):
 
 # ==== Screen helpers ====
 def record_activity():
-    global last_activity
-    last_activity = utime.time()
-    
-    if screen_state == "OFF":
-        # Restore brightness
-        with settings_lock:
-            brightness = SETTINGS_CACHE.get("brightness", 100)
-        bl = machine.PWM(machine.Pin(lcd_display.BL))
-        bl.duty_u16(int(brightness / 100 * 65535))
-        screen_state = "ON"
+    power.activity()
 
-def check_screen_power():
-    global screen_state
+def settings_copy():
+    with settings_lock:
+        return SETTINGS_CACHE.copy()
 
+def check_screen_power():
     with settings_lock:
         timeout_hours = SETTINGS_CACHE.get("screen_timeout_hours", 2)
         brightness = SETTINGS_CACHE.get("brightness", 100)
-
-    if timeout_hours == 0:
-        return  # Never timeout
-
-    elapsed = utime.time() - last_activity
-    dim_after = timeout_hours * 3600
-    off_after = dim_after + 30 * 60
-
-    bl = machine.PWM(machine.Pin(lcd_display.BL))
-
-    if screen_state == "ON" and elapsed > dim_after:
-        bl.duty_u16(int(0.2 * 65535))
-        screen_state = "DIM"
-
-    elif screen_state == "DIM" and elapsed > off_after:
-        bl.duty_u16(0)
-        lcd.fill(0)
-        lcd.show()
-        screen_state = "OFF"
-
-    elif screen_state != "ON" and elapsed < 2:
-        bl.duty_u16(int(brightness / 100 * 65535))
-        screen_state = "ON"
+    power.configure(brightness, timeout_hours)
+    power.update()
 
 # ==== First-time setup message ====
 def show_first_time_message():
@@ -193,16 +162,79 @@ def wifi_connected():
         return False
 
 # ==== Background updater (safe + interruptible) ====
+def fetch_round(sources):
+    """
+    One pass of the background updater: fetch the due sources and publish
+    what changed. Returns None if nothing was due, False if every due source
+    failed, True otherwise.
+    """
+    global current_data, data_fresh, removed_hives, stale_sources, initial_fetch_complete
+
+    # Re-evaluated every second, so a new update_period or the
+    # screen waking up takes effect during the wait
+    with settings_lock:
+        period = SETTINGS_CACHE.get("update_period", 300)
+    fetching = beebox_sources.due(sources, period, power.state)
+    stale = beebox_sources.stale(sources, power.state)
+    with data_lock:
+        stale_sources = stale
+    if not fetching:
+        return None
+
+    # --- Fetch hive data safely (due sources concurrently) ---
+    changes = None
+    try:
+        changes = beebox_sources.fetch(fetching)
+    except Exception as e:
+        print("[BG] Fetch failed:", e)
+        for s in fetching:
+            s.record([], None)
+    failed = [s for s in fetching if s.schedule.failures]
+    for s in failed:
+        beebox_metrics.retry("fetch")
+    data = beebox_sources.merged(sources)
+
+    if len(failed) < len(fetching):
+        if changes is None and initial_fetch_complete:
+            print("[BG] Hive data unchanged")
+        else:
+            # Publish only on change; unchanged hives keep their dicts
+            # and their cached frames
+            with data_lock:
+                current_data = data
+                data_fresh = True
+                if changes:
+                    removed_hives.extend(changes[1])
+            print("[BG] Hive data changed:", changes[0] if changes else "all",
+                  "removed:", changes[1] if changes else [])
+
+        wifi_utils.WIFI_STATE["healthy"] = True   # latch good state
+        wifi_utils.WIFI_STATE["failures"] = 0     # reset failure counter
+
+        initial_fetch_complete = True
+    if failed:
+        # One dead site leaves the others on show; its hives are
+        # badged once stale (stale_sources)
+        if max(s.schedule.failures for s in failed) >= FETCH_ERROR_AFTER:
+            draw_error(lcd, "Fetch Failed")
+        if len(failed) == len(fetching):
+            # Escalates (and in the end reboots) only if Wi-Fi or the
+            # probe is down; a failing site is left to its backoff
+            wifi_utils.note_fetch_failure()
+            return False
+    return True
+
 def background_updater():
     """
     Background thread: periodically fetch hive data.
     OTA checks are performed only after hive data fetch succeeds.
     Safe for MicroPython threading and Wi-Fi instability.
     """
-    global current_data, data_fresh, menu_active, stop_threads, initial_fetch_complete, last_ota_check
+    global menu_active, stop_threads, last_ota_check
 
     utime.sleep(5)
-    print("[BG] Background updater started")
+    sources = beebox_sources.load()
+    print("[BG] Background updater started:", [s.label() for s in sources])
 
     while not stop_threads:
         try:
@@ -210,33 +242,11 @@ def background_updater():
                 utime.sleep(1)
                 continue  # Skip fetch if menu is active
 
-            # --- Fetch hive data safely ---
-            data = None
-            for attempt in range(SAFE_FETCH_RETRIES):
-                try:
-                    data = get_hive_data()
-                    if data:
-                        break
-                except Exception as e:
-                    print(f"[BG] Fetch attempt {attempt+1} failed:", e)
-                    wifi_utils.note_network_failure()   # 🔑 THIS IS CRITICAL
-                    utime.sleep(SAFE_FETCH_DELAY)
-
-            if data:
-                with data_lock:
-                    current_data = data
-                    data_fresh = True
-                    print("[BG] Fetched hive data:", data)
-                
-                wifi_utils.WIFI_STATE["healthy"] = True   # latch good state
-                wifi_utils.WIFI_STATE["failures"] = 0     # reset failure counter
-                
-                initial_fetch_complete = True
-            else:
-                print("[BG] Failed to fetch hive data after retries")
-                wifi_utils.note_network_failure()   # escalation point
-                draw_error(lcd, "Fetch Failed")
-                utime.sleep(5)
+            fetched = fetch_round(sources)
+            if fetched is None:
+                utime.sleep(1)
+                continue
+            if not fetched:
                 continue
 
             # --- OTA check AFTER successful data fetch ---
@@ -248,7 +258,9 @@ def background_updater():
 
                 if now - last_ota_check > interval_sec:
                     print("[BG] OTA check triggered")
+                    t = beebox_metrics.start()
                     safe_ota()
+                    beebox_metrics.stop("ota", t)
                     last_ota_check = now
 
             except Exception as e:
@@ -257,12 +269,7 @@ def background_updater():
         except Exception as e:
             print("[BG] Unexpected background error:", e)
             draw_error(lcd, "BG Error")
-
-        # Wait for the global fetch interval before next iteration
-        for _ in range(HIVE_FETCH_INTERVAL_SEC):
-            if stop_threads or menu_active:
-                break
-            utime.sleep(1)
+            utime.sleep(5)
 
 # ==== Reboot handler ====
 def reboot_if_pending():
@@ -273,6 +280,7 @@ def reboot_if_pending():
     state = load_state()
     if state.get("pending_reboot"):
         print("[MAIN] Pending OTA update detected — applying update")
+        lcd_display.invalidate_assets()  # asset bundle may be replaced
         try:
             apply_update()  # Moves files from UPDATE/ to root, backs up old files
         except Exception as e:
@@ -321,6 +329,7 @@ def settings_menu():
         "Brightness Level",
         "Screen Timeout",
         "Units (C/F)",
+        "Transitions",
         "Wifi Reconnect"
     ]
     idx = 0
@@ -378,7 +387,6 @@ def settings_menu():
             lcd.text("UP:+10 DN:-10", 15, 90, lcd_display.colour(150,150,150))
             lcd.text("BACK:Save", 25, 110, lcd_display.colour(150,150,150))
             lcd.show()
-            bl = machine.PWM(machine.Pin(lcd_display.BL))
             while True:
                 if BTN_UP.value() == 0:
                     record_activity()
@@ -394,7 +402,7 @@ def settings_menu():
                     with settings_lock:
                         SETTINGS_CACHE.update(settings)
                     break
-                bl.duty_u16(int(settings["brightness"] / 100 * 65535))
+                power.set_brightness(settings["brightness"])
                 lcd.text(f"{settings['brightness']:3d}% ", 40, 60, lcd_display.colour(255,255,255))
                 lcd.show()
         
@@ -447,6 +455,16 @@ def settings_menu():
             lcd.show()
             utime.sleep(1)
 
+        elif result == "Transitions":
+            settings["transitions"] = not settings.get("transitions", True)
+            with settings_lock:
+                SETTINGS_CACHE.update(settings)
+            lcd.fill(lcd_display.colour(0,0,0))
+            status = "Enabled" if settings["transitions"] else "Disabled"
+            lcd.text(f"{status}", 10, 60, lcd_display.colour(255,255,0))
+            lcd.show()
+            utime.sleep(1)
+
         elif result == "Wifi Reconnect":
             settings["wifi_auto_reconnect"] = not settings.get("wifi_auto_reconnect", True)
             with settings_lock:
@@ -461,22 +479,23 @@ def settings_menu():
 def scroll_menu(title, options, start_idx=0):
     global last_press
     lcd.fill(lcd_display.colour(0, 0, 0))
+    lcd.text(title, 10, 8, lcd_display.colour(255, 255, 0))
+    button_hint()
     idx = start_idx
     top = 0
     items_per_page = 5
     scroll_offset = 0
     scroll_pause_until = 0
     last_scroll = utime.ticks_ms()
+    drawn = [None] * items_per_page   # what each row shows on the panel
 
     while True:
-        lcd.fill(lcd_display.colour(0, 0, 0))
-        lcd.text(title, 10, 8, lcd_display.colour(255, 255, 0))
         for i in range(items_per_page):
             j = top + i
-            if j >= len(options):
-                break
             y = 28 + i * 18
-            if j == idx:
+            if j >= len(options):
+                row = None
+            elif j == idx:
                 max_chars = CONTENT_W // 8
                 text_len = len(options[j])
                 max_scroll = max(0, text_len - max_chars)
@@ -499,7 +518,17 @@ def scroll_menu(title, options, start_idx=0):
                             scroll_pause_until = utime.ticks_add(now, 6000)  # pause at end
                 else:
                     scroll_offset = 0
-                
+                row = (options[j], True, scroll_offset)
+            else:
+                row = (options[j], False, 0)
+
+            # Only repaint rows that changed, so show() sends just those
+            if row == drawn[i]:
+                continue
+            drawn[i] = row
+            if row is None:
+                lcd.fill_rect(CONTENT_X - 2, y - 2, CONTENT_W + 4, 14, lcd_display.colour(0, 0, 0))
+            elif row[1]:
                 lcd.fill_rect(CONTENT_X - 2, y - 2, CONTENT_W + 4, 14, lcd_display.colour(0, 100, 200))
                 draw_text_clipped(
                     options[j],
@@ -509,18 +538,17 @@ def scroll_menu(title, options, start_idx=0):
                     lcd_display.colour(255, 255, 255),
                     scroll_offset
                 )
-
-
             else:
-                # 🔧 DRAW NON-HIGHLIGHTED ITEMS
-                lcd.text(
+                # 🔧 DRAW NON-HIGHLIGHTED ITEMS (clipped clear of the button hints)
+                lcd.fill_rect(CONTENT_X - 2, y - 2, CONTENT_W + 4, 14, lcd_display.colour(0, 0, 0))
+                draw_text_clipped(
                     options[j],
                     CONTENT_X,
                     y,
+                    CONTENT_W,
                     lcd_display.colour(200, 200, 200)
                 )
 
-        button_hint()
         lcd.show()
 
         now = utime.ticks_ms()
@@ -561,7 +589,7 @@ def scroll_menu(title, options, start_idx=0):
 # ==== Sensor display ====
 
 def display_sensor_loop(mode):
-    global menu_active, current_data, data_fresh
+    global menu_active, current_data, data_fresh, removed_hives
 
     menu_active = False
     print(f"Displaying {mode} data...")
@@ -577,11 +605,28 @@ def display_sensor_loop(mode):
     # --- Continuous display loop ---
     while True:
         reboot_if_pending()
+        check_screen_power()
+        if not power.rendering:
+            # Screen off: compose nothing until a button wakes it. The panel
+            # kept the last frame, so waking needs no redraw.
+            for pin in (BTN_UP, BTN_DOWN, BTN_SELECT, BTN_BACK):
+                if pin.value() == 0:
+                    wait_release(pin)   # only wakes the screen
+                    break
+            utime.sleep_ms(100)
+            continue
+
         try:
             with data_lock:
                 hives_copy = current_data.copy()
+                removed, removed_hives = removed_hives, []
+                stale = stale_sources
         except:
             hives_copy = []
+            removed = []
+            stale = []
+        if removed:
+            drop_hives(removed)   # their frames would only wait for LRU eviction
         
         with settings_lock:
             settings = SETTINGS_CACHE.copy()
@@ -595,20 +640,32 @@ def display_sensor_loop(mode):
             utime.sleep(3)
             continue
 
+        # Compose any frames new data has made stale, then each hive below
+        # is just a copy out of the screen cache and a flush
+        units = settings.get("units", "C")
+        t = utime.ticks_us()
+        prerender(mode, hives_copy, units)
+        power.charge(utime.ticks_diff(utime.ticks_us(), t))
+        # Slide from one hive to the next (a lone hive just redraws)
+        transitions = settings.get("transitions", True) and len(hives_copy) > 1
+
         for hive in hives_copy:
             reboot_if_pending()  
+            if not power.rendering:
+                break
             # Display the relevant sensor mode for each hive
-            if mode == "sensor_all":
-                display_on_lcd(hive["id"], hive["temperature"], hive["humidity"], hive["weight"])
-            elif mode == "sensor_temp":
-                display_temp_quadrants(hive["id"], hive["temperature"])
-            elif mode == "sensor_humidity":
-                display_humidity_halves(hive["id"], hive["humidity"])
-            elif mode == "sensor_weight":
-                display_weight_single(hive["id"], hive["weight"])
+            t = utime.ticks_us()
+            render_hive(mode, hive, units, transitions)
+            power.charge(utime.ticks_diff(utime.ticks_us(), t))
+            if hive.get("source") in stale:
+                draw_stale_badge()
 
             # Wait a few seconds, check for BACK
-            for _ in range(50):
+            for i in range(50):
+                if i % 10 == 0:
+                    check_screen_power()
+                    if not power.rendering:
+                        break
                 if BTN_BACK.value() == 0:
                     wait_release(BTN_BACK)
                     menu_active = True
@@ -654,6 +711,8 @@ def view_sensors_menu():
         state["last_sensor_mode"] = mode
         save_state(state)
 
+        if async_runtime:
+            return "view"   # the async dashboard picks the mode up
         display_sensor_loop(mode)
 
 
@@ -676,6 +735,9 @@ def main_menu():
             if result2 == "back":
                 idx = 0
                 continue
+            if result2 == "view":
+                menu_active = False
+                return
         elif result == "Settings":
             settings_menu()
             idx = 0  # reset highlight to top
@@ -708,7 +770,7 @@ def main_menu():
 
 # ==== Main ====
 def main():
-    global background_thread_started, stop_threads
+    global background_thread_started, stop_threads, async_runtime
 
     print("[MAIN] Starting main()")
     show_splash(IMAGE_FILE)
@@ -724,6 +786,20 @@ def main():
         global SETTINGS_CACHE
         SETTINGS_CACHE = settings_config.load_settings()
         print("[MAIN] Settings loaded:", SETTINGS_CACHE)
+
+        if SETTINGS_CACHE.get("async_runtime"):
+            import beebox_async
+            async_runtime = True
+            print("[MAIN] Starting uasyncio runtime")
+            beebox_async.run(
+                {"up": BTN_UP, "down": BTN_DOWN, "select": BTN_SELECT, "back": BTN_BACK},
+                settings=settings_copy,
+                check_power=check_screen_power,
+                menu=main_menu,
+                reboot_check=reboot_if_pending,
+                mode=lambda: load_state().get("last_sensor_mode", "sensor_all"),
+            )
+            return
         
         # Start background updater once
         if not background_thread_started:
@@ -1,6 +1,6 @@
 # ===== ota.py =====
-import urequests as requests
 import ujson
+import beebox_http
 import os
 import ubinascii
 import hashlib
@@ -12,7 +12,8 @@ OLD_DIR = "OLD"
 RUNTIME_CONFIG_KEYS = {
     "setup_complete",
     "last_sensor_mode",
-    "pending_reboot"
+    "pending_reboot",
+    "sources"
 }
 
 # -------------------------------------------------
@@ -104,14 +105,15 @@ def merge_remote_config_stage():
     cfg = load_config()
     repo = cfg["github_repo_url"]
     remote = fetch_json(repo + "config.json")
+    return _stage_config(remote), cfg.get("version"), remote.get("version")
 
+def _stage_config(remote):
     # Save staged config to UPDATE folder
     staged_path = UPDATE_DIR + "/config.json"
     ensure_dir(UPDATE_DIR)
     with open(staged_path, "w") as f:
         ujson.dump(remote, f)
-
-    return staged_path, cfg.get("version"), remote.get("version")
+    return staged_path
 
 # -------------------------------------------------
 # Hash helpers
@@ -131,30 +133,49 @@ def sha256_file(path):
 # Network helpers
 # -------------------------------------------------
 
+_json_cache = {}   # url -> last parsed document, reused on 304
+
 def fetch_json(url):
-    r = requests.get(url)
+    cached = _json_cache.get(url)
+    r = beebox_http.get(url, cached is not None)
+    if r is None:
+        return cached
     try:
-        if r.status_code != 200:
-            raise RuntimeError("HTTP %d" % r.status_code)
-        return ujson.loads(r.text)
+        body = r.text
     finally:
         r.close()
+    return _json_doc(url, r, body)
+
+def _json_doc(url, r, body):
+    """Parse a fetched document, keeping it (and its validators) for a 304."""
+    doc = ujson.loads(body)
+    _json_cache[url] = doc
+    beebox_http.commit(url, r)
+    return doc
+
+def _copy(src, f):
+    while True:
+        chunk = src.read(512)
+        if not chunk:
+            break
+        f.write(chunk)
 
 def fetch_file(url, dest):
-    folder = "/".join(dest.split("/")[:-1])
-    ensure_dir(folder)
-    r = requests.get(url)
-    if r.status_code != 200:
-        raise RuntimeError("HTTP %d" % r.status_code)
-    with open(dest, "wb") as f:
-        f.write(r.content)
-    r.close()
+    ensure_dir("/".join(dest.split("/")[:-1]))
+    r = beebox_http.get(url)
+    try:
+        # Stream to flash: the asset bundle is too big to hold in RAM
+        with open(dest, "wb") as f:
+            _copy(r.raw, f)
+    finally:
+        r.close()
 
 # -------------------------------------------------
 # Step 1: Download & verify update
 # -------------------------------------------------
 
-def download_and_verify_update():
+def _begin():
+    """Clear the staging folders -> (config, repo URL)."""
     cfg = load_config()
     repo = cfg["github_repo_url"]
     
@@ -163,13 +184,11 @@ def download_and_verify_update():
     ensure_dir(OLD_DIR)
     clear_folder(UPDATE_DIR)
     clear_folder(OLD_DIR)
+    return cfg, repo
 
-    # Merge config but **do not overwrite local version yet**
-    staged_config_path, local_version, remote_version = merge_remote_config_stage()
-
+def _plan(manifest, local_version, remote_version):
+    """Manifest entries that need downloading, or None if up to date."""
     print("[OTA] Current version:", local_version)
-    
-    manifest = fetch_json(repo + "file_list.json")
     files = manifest.get("files", [])
 
     if not remote_version or not files:
@@ -178,50 +197,148 @@ def download_and_verify_update():
     # Stage config-only update without touching firmware files
     if remote_version == local_version:
         print("[OTA] Already up to date")
-        return False
+        return None
 
     print("[OTA] New firmware version available:", remote_version)
 
+    todo = []
     for entry in files:
-        path = entry["path"]
-        expected = entry["sha256"]
-
-        dst = path
-        tmp = UPDATE_DIR + "/" + path
-
         # Skip unchanged files
-        if path_exists(path) and sha256_file(path) == expected:
-            print("[OTA] Skipping unchanged:", path)
+        if path_exists(entry["path"]) and sha256_file(entry["path"]) == entry["sha256"]:
+            print("[OTA] Skipping unchanged:", entry["path"])
             continue
+        todo.append(entry)
+    return todo
 
-        print("[OTA] Downloading:", path)
-        fetch_file(repo + path, tmp)
+def _staging(entry):
+    """Where a manifest entry is downloaded to."""
+    print("[OTA] Downloading:", entry["path"])
+    return UPDATE_DIR + "/" + entry["path"]
 
-        actual = sha256_file(tmp)
-        if actual != expected:
-            raise RuntimeError("Hash mismatch: " + path)
+def _verify(tmp, entry):
+    actual = sha256_file(tmp)
+    if actual != entry["sha256"]:
+        raise RuntimeError("Hash mismatch: " + entry["path"])
 
+def _stage_reboot(cfg, remote_version):
     print("[OTA] All required files downloaded and verified")
 
     # ---- Stage reboot ----
     cfg["version"] = remote_version
     cfg["pending_reboot"] = True
     save_config(cfg)
+
+def download_and_verify_update():
+    cfg, repo = _begin()
+
+    # Merge config but **do not overwrite local version yet**
+    staged_config_path, local_version, remote_version = merge_remote_config_stage()
+
+    manifest = fetch_json(repo + "file_list.json")
+    todo = _plan(manifest, local_version, remote_version)
+    if todo is None:
+        return False
+
+    for entry in todo:
+        tmp = _staging(entry)
+        fetch_file(repo + entry["path"], tmp)
+        _verify(tmp, entry)
+
+    _stage_reboot(cfg, remote_version)
     return True
 
 # -------------------------------------------------
 # Safe OTA trigger (called during runtime)
 # -------------------------------------------------
 
+def _report(updated):
+    if updated:
+        print("[OTA] Update staged; reboot deferred to main loop")
+    else:
+        print("[OTA] No update required")
+
 def safe_ota():
     try:
-        updated = download_and_verify_update()
-        if updated:
-            print("[OTA] Update staged; reboot deferred to main loop")
-        else:
-            print("[OTA] No update required")
+        _report(download_and_verify_update())
     except Exception as e:
         print("[OTA] FAILED:", e)
+    finally:
+        # Don't hold the TLS session to the repo host until the next check
+        beebox_http.close_all()
+
+# -------------------------------------------------
+# The same for the uasyncio runtime (beebox_async): downloads run over
+# non-blocking connections, yielding between chunks. A compressed file is
+# spooled to flash as it arrives and inflated into place afterwards.
+# -------------------------------------------------
+
+async def afetch_json(url):
+    import io
+    cached = _json_cache.get(url)
+    r = await beebox_http.aget(url, cached is not None)
+    if r is None:
+        return cached
+    try:
+        body = await r.readall()
+    finally:
+        r.close()
+    if r.encoding:
+        body = beebox_http.inflate(io.BytesIO(body), r.encoding).read()
+    return _json_doc(url, r, body)
+
+async def afetch_file(url, dest):
+    import uasyncio as asyncio
+    ensure_dir("/".join(dest.split("/")[:-1]))
+    r = await beebox_http.aget(url)
+    spool = dest + ".z" if r.encoding else dest
+    try:
+        with open(spool, "wb") as f:
+            while True:
+                chunk = await r.read(512)
+                if not chunk:
+                    break
+                f.write(chunk)
+    finally:
+        r.close()
+    if not r.encoding:
+        return
+    with open(spool, "rb") as src, open(dest, "wb") as f:
+        body = beebox_http.inflate(src, r.encoding)
+        while True:
+            chunk = body.read(512)
+            if not chunk:
+                break
+            f.write(chunk)
+            await asyncio.sleep_ms(0)
+    os.remove(spool)
+
+async def adownload_and_verify_update():
+    import uasyncio as asyncio
+    cfg, repo = _begin()
+    remote = await afetch_json(repo + "config.json")
+    _stage_config(remote)
+
+    manifest = await afetch_json(repo + "file_list.json")
+    todo = _plan(manifest, cfg.get("version"), remote.get("version"))
+    if todo is None:
+        return False
+
+    for entry in todo:
+        tmp = _staging(entry)
+        await afetch_file(repo + entry["path"], tmp)
+        _verify(tmp, entry)
+        await asyncio.sleep_ms(0)
+
+    _stage_reboot(cfg, remote.get("version"))
+    return True
+
+async def asafe_ota():
+    try:
+        _report(await adownload_and_verify_update())
+    except Exception as e:
+        print("[OTA] FAILED:", e)
+    finally:
+        beebox_http.aclose_all()
 
 # -------------------------------------------------
 # Step 2: Apply update at boot
@@ -243,6 +360,8 @@ def apply_update():
         for name in files:
             src = root + "/" + name
             dst = src.replace(UPDATE_DIR + "/", "")
+            if dst == CONFIG_FILE:
+                continue   # merged below, keeping the device's runtime keys
 
             ensure_dir("/".join(dst.split("/")[:-1]))
 
@@ -10,6 +10,8 @@ DEFAULT_SETTINGS = {
     "update_period": 300,         # Background update period (seconds)
     "brightness": 100,            # LCD backlight brightness (0–100%)
     "units": "C",                 # 'C' or 'F' for temperature
+    "transitions": True,          # Slide between hives using hardware scroll
+    "async_runtime": False,       # uasyncio tasks instead of the fetch thread
     "wifi_auto_reconnect": True   # Attempt Wi-Fi reconnect automatically
 }
 
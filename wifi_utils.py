@@ -2,6 +2,7 @@
 
 import network
 import time
+import beebox_metrics
 from wifi_encryption import decrypt
 from wifi_storage import load_wifi_credentials
 
@@ -29,6 +30,20 @@ def note_network_failure():
         machine.reset()
 
 
+def _link_checked(online):
+    if online:
+        WIFI_STATE["failures"] = 0   # the site failed, not the network
+        return
+    WIFI_STATE["healthy"] = False    # ensure_wifi re-checks before the next fetch
+    note_network_failure()
+
+def note_fetch_failure():
+    """Every due source failed. Count it towards the reboot only if Wi-Fi
+    is down or the probe fails: an HTTP error or a refused connection
+    while the link is fine is left to the fetch scheduler's backoff."""
+    wlan = network.WLAN(network.STA_IF)
+    _link_checked(wlan.isconnected() and has_internet())
+
 def has_internet(timeout=3):
     try:
         import socket
@@ -54,34 +69,41 @@ def _load_wifi_credentials():
         print("Wi-Fi config load failed:", e)
         return None, None
     
-def ensure_wifi():
-    """
-    Ensure Wi-Fi is connected and internet-capable.
-    Latches healthy state once confirmed.
-    """
-    global WIFI_STATE
+# The steps ensure_wifi() and aensure_wifi() share; only the waiting differs
+def _join():
+    """Bring the interface up and start associating -> (wlan, join), or
+    None without credentials. join is None if already associated, else what
+    _joined() needs."""
     wlan = network.WLAN(network.STA_IF)
-
-    if WIFI_STATE["healthy"]:
-        return True  # 🔒 trust latched state
-
     wlan.active(True)
 
     ssid, password = load_wifi_credentials()
     if not ssid:
+        return None
+
+    if wlan.isconnected():
+        return wlan, None
+    t = beebox_metrics.start()
+    wlan.connect(ssid, password)
+    return wlan, (t, time.time())
+
+def _joined(wlan, join):
+    """True once associated, False after 20 s, None while still trying."""
+    t, start = join
+    if wlan.isconnected():
+        beebox_metrics.stop("wifi", t)
+        return True
+    if time.time() - start > 20:
+        WIFI_STATE["failures"] += 1
+        beebox_metrics.stop("wifi", t)
+        beebox_metrics.retry("wifi")
         return False
+    return None
 
-    if not wlan.isconnected():
-        wlan.connect(ssid, password)
-        start = time.time()
-        while not wlan.isconnected():
-            if time.time() - start > 20:
-                WIFI_STATE["failures"] += 1
-                return False
-            time.sleep(1)
-
-    # Now test actual internet
-    if has_internet():
+def _probed(t, online):
+    """Record the internet probe started at t; latch healthy if it passed."""
+    beebox_metrics.stop("probe", t)
+    if online:
         WIFI_STATE.update({
             "connected": True,
             "internet_ok": True,
@@ -93,8 +115,70 @@ def ensure_wifi():
         return True
 
     WIFI_STATE["failures"] += 1
+    beebox_metrics.retry("probe")
     return False
 
+def ensure_wifi():
+    """
+    Ensure Wi-Fi is connected and internet-capable.
+    Latches healthy state once confirmed.
+    """
+    if WIFI_STATE["healthy"]:
+        return True  # 🔒 trust latched state
+
+    joining = _join()
+    if joining is None:
+        return False
+    wlan, join = joining
+    if join is not None:
+        joined = _joined(wlan, join)
+        while joined is None:
+            time.sleep(1)
+            joined = _joined(wlan, join)
+        if not joined:
+            return False
+
+    # Now test actual internet
+    t = beebox_metrics.start()
+    return _probed(t, has_internet())
+
+
+async def ahas_internet(timeout=3):
+    """has_internet() for the uasyncio runtime."""
+    import uasyncio as asyncio
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection("8.8.8.8", 53), timeout)
+        writer.close()
+        return True
+    except Exception:
+        return False
+
+async def aensure_wifi():
+    """ensure_wifi() for the uasyncio runtime: association and the probe are
+    waited for without blocking other tasks."""
+    import uasyncio as asyncio
+    if WIFI_STATE["healthy"]:
+        return True
+
+    joining = _join()
+    if joining is None:
+        return False
+    wlan, join = joining
+    if join is not None:
+        joined = _joined(wlan, join)
+        while joined is None:
+            await asyncio.sleep_ms(250)
+            joined = _joined(wlan, join)
+        if not joined:
+            return False
+
+    t = beebox_metrics.start()
+    return _probed(t, await ahas_internet())
+
+async def anote_fetch_failure():
+    """note_fetch_failure() for the uasyncio runtime."""
+    wlan = network.WLAN(network.STA_IF)
+    _link_checked(wlan.isconnected() and await ahas_internet())
 
 def is_connected():
     """Return True if Wi-Fi is connected and active."""